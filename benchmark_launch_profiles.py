@@ -0,0 +1,108 @@
+import sys
+import os
+import asyncio
+import argparse
+import statistics
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Launches local Chromium with each launch profile from config/settings.py and
+# reports per-profile launch/navigation/screenshot latency and the RSS of the
+# browser's whole process tree (browser, renderers, GPU and utility processes).
+#
+#   python benchmark_launch_profiles.py --url https://example.com --runs 3
+#   python benchmark_launch_profiles.py --profiles headless-lean headless-fidelity
+
+DEFAULT_URLS = ["https://example.com", "https://news.ycombinator.com"]
+
+def tree_rss_mb(pids):
+    """Summed RSS of the given processes in MB"""
+    import psutil
+    total = 0
+    for pid in pids:
+        try:
+            total += psutil.Process(pid).memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total / 1024 / 1024
+
+async def run_profile(profile: str, urls, runs: int):
+    from backends.playwright_backend import PlaywrightBackend
+
+    backend = PlaywrightBackend(profile=profile)
+    samples = {"launch": [], "navigate": [], "screenshot": [], "rss": [], "processes": []}
+
+    for run in range(runs):
+        start = time.perf_counter()
+        session = await backend.launch(f"bench-{profile}-{run}")
+        try:
+            page = await session.new_page()
+            samples["launch"].append(time.perf_counter() - start)
+
+            for url in urls:
+                start = time.perf_counter()
+                await page.goto(url, timeout_ms=30000)
+                samples["navigate"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await page.screenshot()
+                samples["screenshot"].append(time.perf_counter() - start)
+
+            # Measure with every page of the run still loaded
+            pids = session.process_ids()
+            samples["rss"].append(tree_rss_mb(pids))
+            samples["processes"].append(len(pids))
+        finally:
+            await session.close()
+
+    return samples
+
+def ms(values):
+    return f"{statistics.median(values) * 1000:.0f}ms" if values else "-"
+
+async def main():
+    from config.settings import LAUNCH_PROFILES
+
+    parser = argparse.ArgumentParser(description="Benchmark Chromium launch profiles")
+    parser.add_argument("--profiles", nargs="+", choices=list(LAUNCH_PROFILES), default=list(LAUNCH_PROFILES),
+                        help="Profiles to benchmark")
+    parser.add_argument("--url", dest="urls", action="append", help="URL to load (repeatable)")
+    parser.add_argument("--runs", type=int, default=3, help="Browser launches per profile")
+    args = parser.parse_args()
+    urls = args.urls or DEFAULT_URLS
+
+    table = Table(title=f"Launch profiles ({args.runs} runs, {len(urls)} URLs per run, medians)")
+    for column in ("Profile", "Launch", "Navigate", "Screenshot", "Tree RSS", "Processes"):
+        table.add_column(column)
+
+    for profile in args.profiles:
+        if not LAUNCH_PROFILES[profile].headless and not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+            console.print(f"[yellow]⚠️ Skipping {profile}: it needs a display (set DISPLAY or run under Xvfb)[/yellow]")
+            continue
+
+        console.print(f"[cyan]🚀 Benchmarking {profile}...[/cyan]")
+        try:
+            samples = await run_profile(profile, urls, args.runs)
+        except Exception as e:
+            console.print(f"[red]❌ {profile} failed: {e}[/red]")
+            continue
+
+        table.add_row(
+            profile,
+            ms(samples["launch"]),
+            ms(samples["navigate"]),
+            ms(samples["screenshot"]),
+            f"{statistics.median(samples['rss']):.0f}MB" if samples["rss"] else "-",
+            f"{statistics.median(samples['processes']):.0f}" if samples["processes"] else "-"
+        )
+
+    console.print(table)
+
+if __name__ == "__main__":
+    asyncio.run(main())
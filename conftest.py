@@ -0,0 +1,39 @@
+import sys
+import os
+
+import pytest
+
+# Shared setup for the test modules: import the packages under src/, and give
+# Settings the API key it requires (no test calls the model).
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+class ScriptedModel:
+    """Stand-in chat model: returns the queued replies in order, then a final answer"""
+
+    def __init__(self):
+        self.replies = []
+        self.calls = []  # the messages of each call
+
+    def bind_tools(self, tools):
+        return self
+
+    async def ainvoke(self, messages):
+        from langchain_core.messages import AIMessage
+        self.calls.append(messages)
+        if self.replies:
+            reply = self.replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+        return AIMessage(content="Done")
+
+@pytest.fixture
+def scripted_model(monkeypatch):
+    """Build agents on a ScriptedModel instead of the OpenAI client"""
+    from agents import factory
+    model = ScriptedModel()
+    monkeypatch.setattr(factory, "build_model", lambda model_name, temperature: model)
+    factory.clear_compiled_agents()
+    yield model
+    factory.clear_compiled_agents()
@@ -5,15 +5,9 @@ import argparse
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from bedrock_agentcore.tools.browser_client import BrowserClient
-from langchain_aws import ChatBedrockConverse
-from langchain_openai import ChatOpenAI
 from rich.console import Console
 from rich.panel import Panel
-from contextlib import suppress
 from agents.browser_agent import BrowserAutomationAgent
-from config.settings import settings
-from boto3.session import Session
 
 console = Console()
 
@@ -22,24 +16,33 @@ class AgentCoreLiveDemo:
     
     def __init__(self, region="us-west-2"):
         self.region = region
-        self.client = None
+        self.pool = None
         self.agent = None
         
     async def setup_browser_client(self):
-        """Initialize the AgentCore browser client"""
+        """Start a warm AgentCore browser and attach to it over CDP"""
         console.print("[cyan]🔄 Initializing AgentCore Browser Client...[/cyan]")
         
         try:
-            # Create and start browser client
-            self.client = BrowserClient(self.region)
-            self.client.start()
+            from backends.agentcore_pool import AgentCoreSessionPool
+            from backends.agentcore_backend import AgentCoreBackend
+            from backends.base import register_backend
+            
+            # The pool starts the remote browser off the event loop and opens
+            # its CDP WebSocket; the agent's tools then reuse that connection
+            self.pool = AgentCoreSessionPool([self.region], warm_per_region=1)
+            await self.pool.warm_up()
+            register_backend("agentcore", AgentCoreBackend(self.pool))
             
             console.print("[green]✅ AgentCore Browser Client started[/green]")
             
             # Get WebSocket URL and headers
-            ws_url, headers = self.client.generate_ws_headers()
+            remote = self.pool.regions[self.region].warm[0]
+            ws_url, headers = remote.ws_endpoint()
             
             console.print(f"[cyan]🌐 WebSocket URL: {ws_url}[/cyan]")
+            if remote.connected:
+                console.print(f"[cyan]🔌 CDP connected in {remote.connect_seconds:.2f}s[/cyan]")
             
             return ws_url, headers
             
@@ -66,7 +69,7 @@ class AgentCoreLiveDemo:
         
         try:
             with console.status("[bold green]Running automation...[/bold green]", spinner="dots"):
-                result = await self.agent.run_task(task, session_id=session_id)
+                result = await self.agent.run_task(task, session_id=session_id, backend="agentcore")
             
             if result.get("messages"):
                 last_message = result["messages"][-1]
@@ -108,13 +111,15 @@ class AgentCoreLiveDemo:
         """Run a predefined task"""
         await self.run_task(task)
     
-    def cleanup(self):
+    async def cleanup(self):
         """Clean up resources"""
         console.print("\n[yellow]🧹 Cleaning up...[/yellow]")
         
-        if self.client:
+        if self.pool:
             try:
-                self.client.stop()
+                from tools.sessions import close_all_sessions
+                await close_all_sessions()
+                await self.pool.close()
                 console.print("[green]✅ Browser client stopped[/green]")
             except Exception as e:
                 console.print(f"[red]❌ Error stopping client: {e}[/red]")
@@ -182,7 +187,7 @@ async def main():
         import traceback
         traceback.print_exc()
     finally:
-        demo.cleanup()
+        await demo.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
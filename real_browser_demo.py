@@ -22,7 +22,7 @@ class RealBrowserDemo:
         console.print("[cyan]🌐 Setting up Real Browser Agent...[/cyan]")
         
         try:
-            self.agent = RealBrowserAutomationAgent()
+            self.agent = RealBrowserAutomationAgent(keep_history=True)
             console.print("[green]✅ Real Browser Agent initialized[/green]")
             console.print("[yellow]📌 Chrome browser will open when first task starts[/yellow]")
             
@@ -6,7 +6,7 @@ import argparse
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from agents.browser_agent import BrowserAutomationAgent
-from config.settings import settings
+from config.settings import get_settings
 from rich.console import Console
 from rich.panel import Panel
 
@@ -119,7 +119,7 @@ async def main():
         demo.setup_agent()
         
         console.print(f"\n[green]🎉 Demo ready![/green]")
-        console.print(f"[cyan]Model: {settings.model_name}[/cyan]")
+        console.print(f"[cyan]Model: {get_settings().model_name}[/cyan]")
         console.print(f"[cyan]Using: Mock browser tools[/cyan]")
         
         if args.interactive:
@@ -0,0 +1,109 @@
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+from agents.state import BrowserAgentState
+from agents.factory import get_compiled_agent
+
+# Shared handle logic of the browser agents. Subclasses provide the tools and
+# the system prompt; the compiled graph, model and checkpointer come from
+# agents.factory and are shared by every handle of one model configuration.
+#
+# The checkpointer outlives the handles, so a conversation thread that is not
+# deleted stays in it for good. By default each run_task call gets its own
+# thread, deleted when the call returns. With keep_history=True a handle keeps
+# one thread per session so later tasks see the earlier ones, until
+# release_session() or release() drops it.
+
+class BaseBrowserAgent(ABC):
+    """LangGraph-powered browser automation agent handle"""
+
+    display_name = "Browser Automation Agent"
+
+    def __init__(self, model_name: Optional[str] = None, temperature: Optional[float] = None,
+                 keep_history: bool = False):
+        print(f"🤖 Initializing {self.display_name}...")
+        compiled = get_compiled_agent(type(self), model_name, temperature)
+        self.compiled = compiled
+        self.tools = compiled.tools
+        self.model = compiled.model
+        self.app = compiled.app
+        self.keep_history = keep_history
+        self.handle_id = uuid.uuid4().hex[:8]
+        self._threads: Dict[str, str] = {}  # session -> kept thread id
+        print(f"✅ {self.display_name} initialized!")
+
+    @staticmethod
+    @abstractmethod
+    def load_tools() -> List[Any]:
+        """Tools the agent can call"""
+
+    @staticmethod
+    @abstractmethod
+    def build_system_prompt(state: BrowserAgentState) -> str:
+        """System prompt for the main agent reasoning node"""
+
+    def _thread_id(self, session_id: Optional[str]) -> str:
+        # The checkpointer is shared, so namespace conversation threads per handle
+        thread_id = f"{self.handle_id}:{session_id or 'default_thread'}"
+        if not self.keep_history:
+            # run_task deletes it again, even when the run fails or is cancelled
+            return f"{thread_id}:{uuid.uuid4().hex[:8]}"
+        self._threads[session_id or "default_thread"] = thread_id
+        return thread_id
+
+    async def run_task(self, task: str, session_id: str = None, backend: str = None,
+                       max_steps: Optional[int] = None, storage_profile: str = None):
+        """Execute a browser automation task
+
+        storage_profile restores a saved login and backend picks the browser
+        backend ('playwright', 'agentcore' or 'fake') if the session is new.
+        max_steps caps the agent -> tools round trips.
+        """
+        print(f"🎯 Running task: {task}")
+
+        if storage_profile or backend:
+            from tools.sessions import configure_session
+            configure_session(session_id or "default", storage_profile=storage_profile, backend=backend)
+
+        from langchain_core.messages import HumanMessage
+
+        thread_id = self._thread_id(session_id)
+        config = {
+            "configurable": {
+                "thread_id": thread_id
+            }
+        }
+        if max_steps:
+            # Each step is an agent node plus a tools node; LangGraph raises
+            # GraphRecursionError once the limit is hit
+            config["recursion_limit"] = 2 * max_steps + 1
+
+        initial_state = {
+            "messages": [HumanMessage(content=task)],
+            "browser_session_id": session_id or "default",
+            "current_url": None,
+            "task_context": {"task": task},
+            "completed_actions": []
+        }
+
+        try:
+            result = await self.app.ainvoke(initial_state, config)
+        finally:
+            if not self.keep_history:
+                self.compiled.release_thread(thread_id)
+            # Memories are written behind; make sure this task's are stored
+            from memory.write_behind import flush_memory_writes
+            await flush_memory_writes(session_id or "default")
+        return result
+
+    def release_session(self, session_id: Optional[str] = None):
+        """Forget the conversation history of one session (e.g. after a cancelled run)"""
+        thread_id = self._threads.pop(session_id or "default_thread", None)
+        if thread_id:
+            self.compiled.release_thread(thread_id)
+
+    def release(self):
+        """Forget this handle's conversation history in the shared checkpointer"""
+        for thread_id in self._threads.values():
+            self.compiled.release_thread(thread_id)
+        self._threads.clear()
@@ -0,0 +1,247 @@
+import asyncio
+import threading
+from typing import Dict, Any, List, Tuple, Optional, Callable
+from agents.state import BrowserAgentState
+
+# Building an agent means creating the ToolNode, a ChatOpenAI client, running
+# bind_tools and compiling the StateGraph. None of that depends on the task, so
+# it is done once per (agent class, model configuration) and shared by every
+# agent handle. Model clients share connection-pooled HTTP clients instead of
+# each opening their own pool. The async client's connections are pooled per
+# event loop, since a compiled agent outlives the asyncio.run() that built it.
+#
+# Tool results pass through tools.output_budget before they join the
+# conversation, and every model call records how many of its prompt tokens
+# came from each tool. Screenshots a tool queued for the model (tools.vision)
+# are attached as a user message after the tool results. With speculative
+# prefetch enabled (tools.prefetch), likely next pages start loading in
+# background tabs while the model works out its next step. With pipelined
+# observations (tools.observation), the page state gathered right after the
+# tool actions is folded into the next model call.
+
+_compiled_agents: Dict[Tuple, "CompiledAgent"] = {}
+_http_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+class CompiledAgent:
+    """Tools, bound model and compiled graph shared by all handles of one configuration"""
+    
+    def __init__(self, tools: List[Any], model: Any, app: Any, checkpointer: Any):
+        self.tools = tools
+        self.model = model
+        self.app = app
+        self.checkpointer = checkpointer
+    
+    def release_thread(self, thread_id: str):
+        """Drop checkpointed conversation state for a finished thread"""
+        delete_thread = getattr(self.checkpointer, "delete_thread", None)
+        if delete_thread:
+            delete_thread(thread_id)
+
+class LoopLocalTransport:
+    """httpx async transport that keeps one connection pool per event loop
+
+    An httpx pool belongs to the loop that opened its connections, while the
+    shared model client is used from every loop that runs an agent. (Duck-typed
+    rather than subclassing httpx.AsyncBaseTransport so importing an agent
+    does not load httpx.)
+    """
+
+    def __init__(self, make_pool: Callable[[], Any]):
+        self.make_pool = make_pool
+        self._pools: Dict[Any, Any] = {}  # event loop -> pool
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+            if pool is None:
+                # A closed loop's connections went with it
+                for old_loop in [l for l in self._pools if l.is_closed()]:
+                    del self._pools[old_loop]
+                pool = self._pools[loop] = self.make_pool()
+        return pool
+
+    async def handle_async_request(self, request):
+        return await self._pool().handle_async_request(request)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the running loop's pool; the transport stays usable"""
+        with self._lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+def get_http_clients() -> Tuple[Any, Any]:
+    """Shared sync and async HTTP clients with connection pooling for the model API"""
+    import httpx
+    from config.settings import get_settings
+    
+    with _lock:
+        if not _http_clients:
+            settings = get_settings()
+            limits = httpx.Limits(
+                max_connections=settings.model_http_max_connections,
+                max_keepalive_connections=settings.model_http_max_keepalive,
+                keepalive_expiry=30.0
+            )
+            timeout = httpx.Timeout(settings.model_http_timeout_seconds)
+            transport = LoopLocalTransport(lambda: httpx.AsyncHTTPTransport(limits=limits))
+            _http_clients['sync'] = httpx.Client(limits=limits, timeout=timeout)
+            _http_clients['async'] = httpx.AsyncClient(transport=transport, timeout=timeout)
+            _http_clients['transport'] = transport
+        return _http_clients['sync'], _http_clients['async']
+
+async def close_http_clients():
+    """Close the running event loop's model API connections (call before the loop ends)
+
+    Other loops keep their own connections, and the shared clients stay
+    usable: a later call from this loop opens a new pool.
+    """
+    with _lock:
+        transport = _http_clients.get('transport')
+    if transport is not None:
+        await transport.aclose()
+
+def should_continue(state: BrowserAgentState):
+    """Determine if we should continue with tools or end"""
+    last_message = state["messages"][-1]
+    
+    # Check if the last message has tool calls
+    if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
+        print(f"🔧 Agent is calling {len(last_message.tool_calls)} tools")
+        return "tools"
+    
+    print("🏁 No more tool calls - ending workflow")
+    return "end"
+
+def acted_sessions(state: BrowserAgentState) -> List[str]:
+    """Sessions the latest tool calls ran on"""
+    last_call = next((m for m in reversed(state["messages"]) if getattr(m, "type", None) == "ai"), None)
+    # A call without session_id ran on the tools' own default, whatever the graph's session is
+    return [(call["args"].get("session_id") or "default")
+            for call in getattr(last_call, "tool_calls", None) or []]
+
+def build_model(model_name: str, temperature: float) -> Any:
+    """Chat model on the pooled HTTP clients (tests swap in a scripted model here)"""
+    from langchain_openai import ChatOpenAI
+    from config.settings import get_settings
+    
+    http_client, http_async_client = get_http_clients()
+    return ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        api_key=get_settings().openai_api_key,
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+
+def _build_compiled_agent(agent_cls, model_name: str, temperature: float) -> CompiledAgent:
+    """Load tools, bind them to a pooled model client and compile the workflow"""
+    from langchain_core.messages import SystemMessage, HumanMessage
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph import StateGraph
+    from langgraph.prebuilt import ToolNode
+    from langgraph.checkpoint.memory import MemorySaver
+    from tools.output_budget import budget_tool_messages, token_ledger
+    from tools.vision import take_pending_images, image_message_content
+    from tools.prefetch import schedule_prefetch
+    from tools.observation import take_observations, observation_message_content
+    
+    tools = agent_cls.load_tools()
+    tool_node = ToolNode(tools)
+    print(f"🔧 Loaded {len(tools)} browser tools")
+    
+    # Bind tools to the model so it can call them
+    model = build_model(model_name, temperature).bind_tools(tools)
+    print("🔧 Model configured with tools")
+    
+    async def agent_node(state: BrowserAgentState):
+        """Main agent reasoning node"""
+        token_ledger.record_prompt(state.get("browser_session_id") or "default", state["messages"])
+        messages = [
+            SystemMessage(content=agent_cls.build_system_prompt(state))
+        ] + state["messages"]
+        
+        # Page state gathered while the tools finished; shown to this call only
+        observations = await take_observations(acted_sessions(state))
+        if observations:
+            messages.append(HumanMessage(content=observation_message_content(observations)))
+        
+        response = await model.ainvoke(messages)
+        
+        return {"messages": [response]}
+    
+    async def tools_node(state: BrowserAgentState, config: RunnableConfig):
+        """Run the requested tools and fit their results to each tool's token budget"""
+        result = await tool_node.ainvoke(state, config)
+        budget_tool_messages(result["messages"])
+        
+        session_ids = acted_sessions(state)
+        images = take_pending_images(session_ids)
+        if images:
+            result["messages"].append(HumanMessage(content=image_message_content(images)))
+        
+        task = next((m.content for m in state["messages"] if getattr(m, "type", None) == "human"
+                     and isinstance(m.content, str)), "")
+        schedule_prefetch(session_ids, task)
+        return result
+    
+    workflow = StateGraph(BrowserAgentState)
+    
+    # Add nodes
+    workflow.add_node("agent", agent_node)
+    workflow.add_node("tools", tools_node)
+    
+    # Define edges
+    workflow.add_conditional_edges(
+        "agent",
+        should_continue,
+        {
+            "tools": "tools",
+            "end": "__end__"
+        }
+    )
+    workflow.add_edge("tools", "agent")
+    
+    # Set entry point
+    workflow.set_entry_point("agent")
+    
+    # Add memory persistence
+    checkpointer = MemorySaver()
+    app = workflow.compile(checkpointer=checkpointer)
+    print("📊 LangGraph workflow configured")
+    
+    return CompiledAgent(tools, model, app, checkpointer)
+
+def get_compiled_agent(agent_cls, model_name: Optional[str] = None,
+                       temperature: Optional[float] = None) -> CompiledAgent:
+    """Return the shared compiled agent for a class and model configuration, building it once"""
+    from config.settings import get_settings
+    
+    settings = get_settings()
+    model_name = model_name or settings.model_name
+    temperature = settings.model_temperature if temperature is None else temperature
+    key = (agent_cls.__module__, agent_cls.__qualname__, model_name, temperature)
+    
+    compiled = _compiled_agents.get(key)
+    if compiled is None:
+        with _build_lock:
+            compiled = _compiled_agents.get(key)
+            if compiled is None:
+                compiled = _build_compiled_agent(agent_cls, model_name, temperature)
+                _compiled_agents[key] = compiled
+    return compiled
+
+def clear_compiled_agents():
+    """Forget cached graphs, e.g. after changing settings in tests"""
+    with _build_lock:
+        _compiled_agents.clear()
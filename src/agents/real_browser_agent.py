@@ -2,106 +2,69 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from typing import Dict, Any, List, Optional, Annotated
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, add_messages
-from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
-from config.settings import settings
-from tools.real_browser_tools import (
-    navigate_to_url, take_screenshot, smart_click, smart_fill, 
-    get_page_elements, close_browser
-)
-import json
-from typing_extensions import TypedDict
+from typing import Dict, Any, List, Optional
+from agents.state import BrowserAgentState
+from agents.base_agent import BaseBrowserAgent
 
-class BrowserAgentState(TypedDict):
-    """Enhanced state with browser session tracking"""
-    messages: Annotated[list, add_messages]
-    browser_session_id: Optional[str]
-    current_url: Optional[str]
-    task_context: Dict[str, Any]
-    completed_actions: List[str]
+# Heavy dependencies (langchain_openai, langgraph, the tool modules and the
+# settings object) are imported inside the methods that need them so that
+# importing this module stays cheap for short-lived entry points.
 
-class RealBrowserAutomationAgent:
-    """LangGraph-powered browser automation agent using Smart Tools"""
+class RealBrowserAutomationAgent(BaseBrowserAgent):
+    """LangGraph-powered browser automation agent using Smart Tools
     
-    def __init__(self):
-        print("🤖 Initializing Smart Browser Automation Agent...")
-        self.setup_tools()
-        self.setup_model()
-        self.setup_graph()
-        print("✅ Smart Browser Automation Agent initialized!")
+    Instances are cheap handles: the tools, bound model and compiled graph are
+    built once per model configuration by agents.factory and shared.
+    """
     
-    def setup_tools(self):
+    display_name = "Smart Browser Automation Agent"
+    
+    @staticmethod
+    def load_tools() -> List[Any]:
         """Define smart browser automation tools"""
-        self.tools = [
+        from tools.real_browser_tools import (
+            navigate_to_url, take_screenshot, smart_click, smart_fill, smart_fill_form,
+            get_page_elements, extract_structured_data, visit_pages_in_parallel,
+            save_login_profile, close_browser
+        )
+        
+        return [
             navigate_to_url,
             take_screenshot,
             smart_click,
             smart_fill,
+            smart_fill_form,
             get_page_elements,
+            extract_structured_data,
+            visit_pages_in_parallel,
+            save_login_profile,
             close_browser
         ]
-        self.tool_node = ToolNode(self.tools)
-        print(f"🔧 Loaded {len(self.tools)} smart browser tools")
-    
-    def setup_model(self):
-        """Setup the model with tools bound"""
-        base_model = ChatOpenAI(
-            model=settings.model_name,
-            temperature=settings.model_temperature,
-            api_key=settings.openai_api_key
-        )
-        self.model = base_model.bind_tools(self.tools)
-        print("🔧 Model configured with smart browser tools")
-    
-    def setup_graph(self):
-        """Create LangGraph workflow"""
-        workflow = StateGraph(BrowserAgentState)
-        
-        # Add nodes
-        workflow.add_node("agent", self.agent_node)
-        workflow.add_node("tools", self.tool_node)
-        
-        # Define edges
-        workflow.add_conditional_edges(
-            "agent",
-            self.should_continue,
-            {
-                "tools": "tools",
-                "end": "__end__"
-            }
-        )
-        workflow.add_edge("tools", "agent")
-        
-        # Set entry point
-        workflow.set_entry_point("agent")
-        
-        # Add memory persistence
-        memory = MemorySaver()
-        self.app = workflow.compile(checkpointer=memory)
-        print("📊 LangGraph workflow configured")
     
-    async def agent_node(self, state: BrowserAgentState):
-        """Main agent reasoning node"""
+    @staticmethod
+    def build_system_prompt(state: BrowserAgentState) -> str:
+        """System prompt for the main agent reasoning node"""
         system_prompt = """You are a smart browser automation agent that can understand and interact with web pages intelligently.
 
 Available tools:
 - navigate_to_url: Navigate to any website
-- take_screenshot: Capture what's currently on screen
+- take_screenshot: Capture what's currently on screen (view=True to look at it yourself, selector to capture one element)
 - smart_click: Click on elements by describing them (e.g., "search button", "login link", "submit button")
 - smart_fill: Fill input fields by describing them (e.g., "search box", "email field", "name field")
+- smart_fill_form: Fill several fields of a form at once from a mapping of field descriptions to values
 - get_page_elements: Analyze the page to see what elements are available to interact with
+- extract_structured_data: Pull a whole table or list (products, results, rows) into records in one call, following pagination with max_pages
+- visit_pages_in_parallel: Check several URLs at once in parallel tabs and get a summary of each
+- save_login_profile: Save the logged-in state under a profile name after a successful login
 - close_browser: Close the browser when done
 
 IMPORTANT INSTRUCTIONS:
 1. You can click on things by describing what they are - just say "click the search button" or "click the login link"
 2. You can fill fields by describing them - just say "fill the search box with 'hello'" or "fill the email field with 'test@example.com'"
-3. If you're not sure what's on the page, use get_page_elements to see what's available
-4. Always take screenshots to show progress
-5. Be conversational and natural - you don't need exact CSS selectors
+3. When a form has more than one field to fill, use smart_fill_form once instead of calling smart_fill for each field
+4. Clicks and fills report what changed on the page (new elements, URL, text, dialogs); if you're still not sure what's on the page, use get_page_elements to see what's available
+5. Always take screenshots to show progress
+6. Be conversational and natural - you don't need exact CSS selectors
 
 Current session: {session_id}
 Current URL: {current_url}
@@ -109,50 +72,23 @@ Current URL: {current_url}
 Break down tasks naturally and accomplish them step by step.
 """
         
-        messages = [
-            SystemMessage(content=system_prompt.format(
-                session_id=state.get("browser_session_id", "default"),
-                current_url=state.get("current_url", "None")
-            ))
-        ] + state["messages"]
-        
-        response = await self.model.ainvoke(messages)
-        
-        return {"messages": [response]}
-    
-    def should_continue(self, state: BrowserAgentState):
-        """Determine if we should continue with tools or end"""
-        last_message = state["messages"][-1]
-        
-        if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-            print(f"🔧 Agent is calling {len(last_message.tool_calls)} tools")
-            return "tools"
-        
-        print("🏁 No more tool calls - ending workflow")
-        return "end"
+        return system_prompt.format(
+            session_id=state.get("browser_session_id", "default"),
+            current_url=state.get("current_url", "None")
+        )
     
-    async def run_task(self, task: str, session_id: str = None):
-        """Execute a browser automation task"""
-        print(f"🎯 Running smart browser task: {task}")
-        
-        config = {
-            "configurable": {
-                "thread_id": session_id or "default_thread"
-            }
-        }
-        
-        initial_state = {
-            "messages": [HumanMessage(content=task)],
-            "browser_session_id": session_id or "default",
-            "current_url": None,
-            "task_context": {"task": task},
-            "completed_actions": []
-        }
-        
-        result = await self.app.ainvoke(initial_state, config)
-        return result
+    async def run_task(self, task: str, session_id: str = None, storage_profile: str = None,
+                       backend: str = None, max_steps: Optional[int] = None):
+        """Execute a browser automation task
+
+        storage_profile restores a saved login and backend picks the browser
+        backend ('playwright', 'agentcore' or 'fake') if the session is new.
+        max_steps caps the agent -> tools round trips.
+        """
+        return await super().run_task(task, session_id, backend=backend, max_steps=max_steps,
+                                      storage_profile=storage_profile)
     
     async def cleanup(self, session_id: str = None):
         """Clean up browser sessions"""
-        from tools.real_browser_tools import close_browser_session
+        from tools.sessions import close_browser_session
         await close_browser_session(session_id or "default")
@@ -0,0 +1,15 @@
+from typing import Dict, Any, List, Optional, Annotated
+from typing_extensions import TypedDict
+
+def add_messages(left, right):
+    """LangGraph's message reducer, imported on first use to keep agent imports light"""
+    from langgraph.graph import add_messages as langgraph_add_messages
+    return langgraph_add_messages(left, right)
+
+class BrowserAgentState(TypedDict):
+    """Enhanced state with browser session tracking"""
+    messages: Annotated[list, add_messages]
+    browser_session_id: Optional[str]
+    current_url: Optional[str]
+    task_context: Dict[str, Any]
+    completed_actions: List[str]
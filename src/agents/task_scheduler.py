@@ -0,0 +1,268 @@
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+# Runs agent tasks with priorities, deadlines and per-task limits. Queued tasks
+# start in order of priority class, then earliest deadline, then arrival, with
+# at most max_concurrent running at once. Each run is capped in steps (agent ->
+# tools round trips, via LangGraph's recursion limit) and wall time. A run that
+# is cancelled, times out or is preempted is cancelled mid-graph: its browser
+# session is closed and its checkpointed conversation dropped, so the next run
+# on that session starts clean. When every slot is busy, a new task preempts
+# the lowest-priority running task that it outranks; the preempted task goes
+# back in the queue and starts over later.
+#
+# With settings.adaptive_concurrency_enabled, a ConcurrencyController adjusts
+# max_concurrent from host and browser saturation.
+
+PRIORITIES = {"interactive": 0, "normal": 1, "background": 2}
+
+# How often one task may be preempted before it is allowed to finish
+MAX_PREEMPTIONS = 3
+
+class TaskAborted(Exception):
+    """A scheduled task did not complete; status says why"""
+
+    def __init__(self, task_id: str, status: str, message: str = ""):
+        super().__init__(f"Task {task_id} {status}" + (f": {message}" if message else ""))
+        self.task_id = task_id
+        self.status = status
+
+class ScheduledTask:
+    """Handle for a submitted task; await wait() for the agent's result"""
+
+    def __init__(self, agent: Any, task: str, session_id: str, priority: str,
+                 deadline: Optional[float], max_steps: int, max_wall_seconds: float,
+                 run_kwargs: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:8]
+        self.agent = agent
+        self.task = task
+        self.session_id = session_id
+        self.priority = priority
+        self.deadline = deadline  # time.monotonic() by which the task must finish
+        self.max_steps = max_steps
+        self.max_wall_seconds = max_wall_seconds
+        self.run_kwargs = run_kwargs
+        self.status = "queued"
+        self.preemptions = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._done = asyncio.get_running_loop().create_future()
+        self._runner: Optional[asyncio.Task] = None
+        self._abort_reason: Optional[str] = None
+
+    @property
+    def rank(self) -> int:
+        return PRIORITIES[self.priority]
+
+    @property
+    def done(self) -> bool:
+        return self._done.done()
+
+    async def wait(self) -> Any:
+        """Wait for the task to finish; raises TaskAborted if it did not complete"""
+        return await asyncio.shield(self._done)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+        if not self._done.done():
+            if error is not None:
+                self._done.set_exception(error)
+            else:
+                self._done.set_result(result)
+
+class TaskScheduler:
+    """Priority queue of agent tasks with deadlines, limits, cancellation and preemption"""
+
+    def __init__(self, max_concurrent: int = 4, max_steps: int = 25, max_wall_seconds: float = 300.0):
+        self.max_concurrent = max_concurrent
+        self.max_steps = max_steps
+        self.max_wall_seconds = max_wall_seconds
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self.running: Dict[str, ScheduledTask] = {}
+        self._queue: List[Any] = []
+        self._order = itertools.count()
+        self._settling: Set[asyncio.Task] = set()  # clean-ups of interrupted runs
+        self.controller = None
+        self.stats: Dict[str, int] = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0,
+                                      "timed_out": 0, "step_limit": 0, "expired": 0, "preempted": 0}
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for s in self.tasks.values() if s.status == "queued")
+
+    def set_max_concurrent(self, max_concurrent: int):
+        """Change how many tasks may run at once; running tasks are never stopped to shrink"""
+        self.max_concurrent = max_concurrent
+        self._dispatch()
+
+    def submit(self, agent: Any, task: str, session_id: str = "default", priority: str = "normal",
+               deadline_seconds: Optional[float] = None, max_steps: Optional[int] = None,
+               max_wall_seconds: Optional[float] = None, **run_kwargs) -> ScheduledTask:
+        """Queue agent.run_task(task, session_id, ...) and return its handle"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Available: {', '.join(PRIORITIES)}")
+
+        deadline = time.monotonic() + deadline_seconds if deadline_seconds is not None else None
+        scheduled = ScheduledTask(agent, task, session_id, priority, deadline,
+                                  max_steps or self.max_steps, max_wall_seconds or self.max_wall_seconds,
+                                  run_kwargs)
+        self.tasks[scheduled.id] = scheduled
+        self.stats["submitted"] += 1
+        self._enqueue(scheduled)
+
+        if len(self.running) >= self.max_concurrent:
+            self._preempt_for(scheduled)
+        self._dispatch()
+        return scheduled
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a queued or running task; returns False if it already finished"""
+        scheduled = self.tasks.get(task_id)
+        if scheduled is None or scheduled.done:
+            return False
+        if scheduled._runner is not None:
+            scheduled._abort_reason = "cancelled"
+            scheduled._runner.cancel()
+        else:
+            self._abort(scheduled, "cancelled")  # dropped from the queue lazily
+        return True
+
+    async def shutdown(self):
+        """Cancel everything and wait for running tasks to clean up"""
+        if self.controller:
+            await self.controller.stop()
+        runners = [s._runner for s in self.running.values() if s._runner]
+        for task_id in list(self.tasks):
+            self.cancel(task_id)
+        await asyncio.gather(*runners, return_exceptions=True)
+        await asyncio.gather(*self._settling, return_exceptions=True)
+
+    def _enqueue(self, scheduled: ScheduledTask):
+        deadline = scheduled.deadline if scheduled.deadline is not None else float("inf")
+        heapq.heappush(self._queue, (scheduled.rank, deadline, next(self._order), scheduled))
+
+    def _preempt_for(self, scheduled: ScheduledTask):
+        victims = [r for r in self.running.values()
+                   if r.rank > scheduled.rank and r._abort_reason is None and r.preemptions < MAX_PREEMPTIONS]
+        if victims:
+            # Lowest priority first, then the one that has made the least progress
+            victim = max(victims, key=lambda r: (r.rank, r.started_at))
+            print(f"⏸️ Preempting {victim.priority} task {victim.id} for {scheduled.priority} task {scheduled.id}")
+            victim._abort_reason = "preempted"
+            victim._runner.cancel()
+
+    def _dispatch(self):
+        while self._queue and len(self.running) < self.max_concurrent:
+            scheduled = heapq.heappop(self._queue)[-1]
+            if scheduled.done:
+                continue  # cancelled while queued
+            if scheduled.deadline is not None and scheduled.deadline <= time.monotonic():
+                self._abort(scheduled, "expired", "deadline passed before the task could start")
+                continue
+            scheduled.status = "running"
+            scheduled.started_at = time.monotonic()
+            self.running[scheduled.id] = scheduled
+            scheduled._runner = asyncio.create_task(self._run(scheduled))
+            # A callback, not code after the await in _run: a runner cancelled
+            # before its first step never runs its coroutine at all
+            scheduled._runner.add_done_callback(lambda runner, s=scheduled: self._run_done(s, runner))
+
+    def _abort(self, scheduled: ScheduledTask, status: str, message: str = ""):
+        self.stats[status] += 1
+        self.tasks.pop(scheduled.id, None)
+        scheduled._finish(status, error=TaskAborted(scheduled.id, status, message))
+
+    async def _run(self, scheduled: ScheduledTask) -> Tuple[str, str, Any]:
+        """Run the agent once; returns (outcome, message, result). Cancellation is left to _run_done"""
+        from langgraph.errors import GraphRecursionError
+
+        wall = scheduled.max_wall_seconds
+        if scheduled.deadline is not None:
+            wall = min(wall, scheduled.deadline - time.monotonic())
+
+        try:
+            result = await asyncio.wait_for(
+                scheduled.agent.run_task(scheduled.task, session_id=scheduled.session_id,
+                                         max_steps=scheduled.max_steps, **scheduled.run_kwargs),
+                timeout=wall
+            )
+        except asyncio.TimeoutError:
+            return "timed_out", f"exceeded {wall:.1f}s of wall time", None
+        except GraphRecursionError:
+            return "step_limit", f"exceeded {scheduled.max_steps} steps", None
+        except Exception as e:
+            return "failed", str(e), None
+        return "completed", "", result
+
+    def _run_done(self, scheduled: ScheduledTask, runner: asyncio.Task):
+        """Free the slot of a finished runner, including one cancelled before it got to start"""
+        self.running.pop(scheduled.id, None)
+        scheduled._runner = None
+        if runner.cancelled():
+            outcome, message, result = scheduled._abort_reason or "cancelled", "", None
+        else:
+            outcome, message, result = runner.result()
+
+        if outcome == "completed":
+            self.stats["completed"] += 1
+            self.tasks.pop(scheduled.id, None)
+            scheduled._finish("completed", result)
+            self._dispatch()
+            return
+        settling = asyncio.get_running_loop().create_task(self._settle(scheduled, outcome, message))
+        self._settling.add(settling)
+        settling.add_done_callback(self._settling.discard)
+
+    async def _settle(self, scheduled: ScheduledTask, outcome: str, message: str):
+        """Clean up an interrupted run, then requeue it (preempted) or fail its handle"""
+        await self._clean_up(scheduled)
+        if outcome == "preempted":
+            self.stats["preempted"] += 1
+            scheduled.preemptions += 1
+            scheduled.status = "queued"
+            scheduled._abort_reason = None
+            self._enqueue(scheduled)
+        else:
+            print(f"🛑 Task {scheduled.id} {outcome}" + (f": {message}" if message else ""))
+            self._abort(scheduled, outcome, message)
+        self._dispatch()
+
+    async def _clean_up(self, scheduled: ScheduledTask):
+        """Close the interrupted run's browser session and drop its half-finished conversation"""
+        from tools.sessions import close_browser_session
+        try:
+            await close_browser_session(scheduled.session_id)
+        except Exception as e:
+            print(f"⚠️ Error closing session {scheduled.session_id}: {e}")
+        release_session = getattr(scheduled.agent, "release_session", None)
+        if release_session:
+            release_session(scheduled.session_id)
+
+_schedulers: Dict[Any, TaskScheduler] = {}  # event loop -> scheduler
+
+def get_task_scheduler() -> TaskScheduler:
+    """The task scheduler for the running event loop, configured from settings"""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        from config.settings import get_settings
+        settings = get_settings()
+        scheduler = TaskScheduler(settings.max_concurrent_tasks, settings.task_max_steps,
+                                  settings.task_max_wall_seconds)
+        if settings.adaptive_concurrency_enabled:
+            from tools.concurrency_controller import ConcurrencyController
+            scheduler.controller = ConcurrencyController.from_settings(scheduler)
+            scheduler.controller.start()
+        for old_loop in [l for l in _schedulers if l.is_closed()]:
+            del _schedulers[old_loop]
+        _schedulers[loop] = scheduler
+    return scheduler
@@ -0,0 +1,60 @@
+from typing import Optional, Dict, Any
+from backends.base import BrowserBackend
+from backends.playwright_backend import PlaywrightSession, PlaywrightPage
+from backends.agentcore_pool import AgentCoreSessionPool, RemoteBrowser, get_agentcore_pool
+
+class AgentCoreSession(PlaywrightSession):
+    """PlaywrightSession on a pooled remote browser's persistent CDP connection"""
+    
+    def __init__(self, remote: RemoteBrowser, context, pool: AgentCoreSessionPool):
+        async def release_remote():
+            await pool.release(remote)
+        
+        super().__init__(None, remote.cdp_browser, context, on_close=release_remote)
+        self.remote = remote
+    
+    async def new_page(self) -> PlaywrightPage:
+        if not self.remote.connected:
+            # The WebSocket dropped - reattach to the same remote browser
+            self.browser = await self.remote.connect()
+            self.context = self.browser.contexts[0] if self.browser.contexts else await self.browser.new_context()
+        return await super().new_page()
+
+class AgentCoreBackend(BrowserBackend):
+    """Remote AgentCore Browser sessions driven over CDP with Playwright
+    
+    Remote browsers are leased from an AgentCoreSessionPool (warm sessions,
+    started off the event loop, spread across regions). Each one keeps a single
+    CDP WebSocket, opened with connect_over_cdp from the signed URL and headers
+    of BrowserClient.generate_ws_headers(), and every navigate, click, fill and
+    screenshot of the session goes over it.
+    """
+    
+    name = "agentcore"
+    
+    def __init__(self, pool: Optional[AgentCoreSessionPool] = None):
+        self._pool = pool
+    
+    @property
+    def pool(self) -> AgentCoreSessionPool:
+        if self._pool is None:
+            self._pool = get_agentcore_pool()
+        return self._pool
+    
+    async def launch(self, session_id: str, storage_state: Optional[Dict[str, Any]] = None) -> AgentCoreSession:
+        remote = await self.pool.acquire()
+        print(f"☁️ AgentCore browser session {session_id} leased in {remote.region}")
+        
+        try:
+            browser = await remote.connect()
+            context = browser.contexts[0] if browser.contexts else await browser.new_context()
+            
+            # The remote context already exists, so storage_state can only be
+            # replayed as cookies
+            if storage_state and storage_state.get('cookies'):
+                await context.add_cookies(storage_state['cookies'])
+        except BaseException:
+            await self.pool.release(remote)
+            raise
+        
+        return AgentCoreSession(remote, context, self.pool)
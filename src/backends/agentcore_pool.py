@@ -0,0 +1,207 @@
+import asyncio
+import itertools
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+# Pool of remote AgentCore browser sessions. BrowserClient.start() is a
+# blocking remote call that takes seconds, so it always runs in a worker thread
+# and the pool keeps a few started sessions warm in each configured region.
+# Leases go to the region with the fewest sessions in use. Released sessions
+# are stopped rather than handed to the next caller (they carry the previous
+# task's cookies and history); the pool refills its warm set in the background.
+#
+# Each remote browser keeps one CDP WebSocket (Playwright connect_over_cdp on a
+# shared driver) for its whole life. Warm sessions connect while they wait, so
+# a lease hands out an attached browser and every tab and action of the task
+# is multiplexed over that one connection.
+
+def default_client_factory(region: str):
+    from bedrock_agentcore.tools.browser_client import BrowserClient
+    return BrowserClient(region)
+
+class RemoteBrowser:
+    """One started AgentCore browser session"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, region: str, client: Any):
+        self.id = next(self._ids)
+        self.region = region
+        self.client = client
+        self.cdp_browser = None
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self._connecting: Optional[asyncio.Future] = None
+
+    def ws_endpoint(self):
+        """Signed CDP WebSocket URL and headers for this remote browser"""
+        return self.client.generate_ws_headers()
+
+    @property
+    def connected(self) -> bool:
+        return self.cdp_browser is not None and self.cdp_browser.is_connected()
+
+    async def connect(self):
+        """Return the CDP-attached Playwright Browser, (re)connecting if needed"""
+        if self.connected:
+            return self.cdp_browser
+        if self._connecting is None or self._connecting.done():
+            self._connecting = asyncio.ensure_future(self._connect())
+        return await asyncio.shield(self._connecting)
+
+    async def _connect(self):
+        from backends.playwright_backend import get_shared_playwright
+
+        playwright = await get_shared_playwright()
+        # Headers are signed, so generate fresh ones for every (re)connect
+        ws_url, headers = self.ws_endpoint()
+        start = time.perf_counter()
+        self.cdp_browser = await playwright.chromium.connect_over_cdp(ws_url, headers=headers)
+        self.connect_seconds += time.perf_counter() - start
+        self.connects += 1
+        if self.connects > 1:
+            print(f"🔌 Reconnected CDP to AgentCore session {self.id} in {self.region}")
+        return self.cdp_browser
+
+    async def disconnect(self):
+        browser, self.cdp_browser = self.cdp_browser, None
+        if browser is not None:
+            try:
+                await browser.close()  # for CDP-attached browsers this only disconnects
+            except Exception:
+                pass
+
+class RegionState:
+    def __init__(self, region: str, max_sessions: int):
+        self.region = region
+        self.warm: List[RemoteBrowser] = []
+        self.in_use = 0
+        self.starting = 0
+        self.slots = asyncio.Semaphore(max_sessions)
+
+    @property
+    def load(self) -> int:
+        return self.in_use + self.starting
+
+class AgentCoreSessionPool:
+    """Async-safe pool of warm AgentCore browser sessions across regions"""
+
+    def __init__(self, regions: List[str], warm_per_region: int = 1, max_per_region: int = 10,
+                 client_factory: Optional[Callable[[str], Any]] = None, preconnect: bool = True):
+        if not regions:
+            raise ValueError("AgentCoreSessionPool needs at least one region")
+        self.warm_per_region = warm_per_region
+        self.preconnect = preconnect
+        self.client_factory = client_factory or default_client_factory
+        self.regions: Dict[str, RegionState] = {
+            region: RegionState(region, max_per_region) for region in regions
+        }
+        self._refills: set = set()
+        self._round_robin = itertools.count()
+        self.stats: Dict[str, int] = {"started": 0, "stopped": 0, "warm_hits": 0, "cold_starts": 0}
+
+    async def _start(self, state: RegionState) -> RemoteBrowser:
+        state.starting += 1
+        try:
+            client = self.client_factory(state.region)
+            # Blocking remote call - keep it off the event loop
+            await asyncio.to_thread(client.start)
+            self.stats["started"] += 1
+            return RemoteBrowser(state.region, client)
+        finally:
+            state.starting -= 1
+
+    async def _stop(self, remote: RemoteBrowser):
+        await remote.disconnect()
+        try:
+            await asyncio.to_thread(remote.client.stop)
+            self.stats["stopped"] += 1
+        except Exception as e:
+            print(f"⚠️ Failed to stop AgentCore session in {remote.region}: {e}")
+
+    def _pick_region(self) -> RegionState:
+        states = list(self.regions.values())
+        offset = next(self._round_robin) % len(states)
+        rotated = states[offset:] + states[:offset]  # round-robin among equally loaded regions
+        return min(rotated, key=lambda s: (not s.warm, s.load))
+
+    async def acquire(self, region: Optional[str] = None) -> RemoteBrowser:
+        """Lease a started remote browser, preferring warm sessions and idle regions"""
+        state = self.regions[region] if region else self._pick_region()
+        await state.slots.acquire()
+        try:
+            if state.warm:
+                remote = state.warm.pop()
+                self.stats["warm_hits"] += 1
+            else:
+                remote = await self._start(state)
+                self.stats["cold_starts"] += 1
+        except BaseException:
+            state.slots.release()
+            raise
+
+        state.in_use += 1
+        self._schedule_refill(state)
+        return remote
+
+    async def release(self, remote: RemoteBrowser):
+        """Return a lease; the remote session is stopped and the warm set refilled"""
+        state = self.regions[remote.region]
+        state.in_use -= 1
+        state.slots.release()
+        await self._stop(remote)
+        self._schedule_refill(state)
+
+    def _schedule_refill(self, state: RegionState):
+        if len(state.warm) + state.starting >= self.warm_per_region:
+            return
+        task = asyncio.create_task(self._refill(state))
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+
+    async def _refill(self, state: RegionState):
+        while len(state.warm) + state.starting < self.warm_per_region:
+            try:
+                remote = await self._start(state)
+            except Exception as e:
+                print(f"⚠️ Could not warm AgentCore session in {state.region}: {e}")
+                return
+            if self.preconnect:
+                state.starting += 1  # still counts as starting while it attaches
+                try:
+                    await remote.connect()
+                except Exception as e:
+                    # Still usable - the lease will connect on demand
+                    print(f"⚠️ Could not pre-connect CDP in {state.region}: {e}")
+                finally:
+                    state.starting -= 1
+            state.warm.append(remote)
+
+    async def warm_up(self):
+        """Start warm sessions in every region and wait for them"""
+        await asyncio.gather(*(self._refill(state) for state in self.regions.values()))
+
+    async def close(self):
+        """Stop all warm sessions (leased sessions are stopped when released)"""
+        for task in list(self._refills):
+            task.cancel()
+        await asyncio.gather(*self._refills, return_exceptions=True)
+        warm = [remote for state in self.regions.values() for remote in state.warm]
+        for state in self.regions.values():
+            state.warm.clear()
+        await asyncio.gather(*(self._stop(remote) for remote in warm))
+
+_pool: Optional[AgentCoreSessionPool] = None
+
+def get_agentcore_pool() -> AgentCoreSessionPool:
+    """Shared pool configured from settings"""
+    global _pool
+    if _pool is None:
+        from config.settings import get_settings
+        settings = get_settings()
+        _pool = AgentCoreSessionPool(
+            regions=settings.agentcore_browser_regions or [settings.agentcore_browser_region],
+            warm_per_region=settings.agentcore_warm_sessions_per_region,
+            max_per_region=settings.agentcore_max_sessions_per_region
+        )
+    return _pool
@@ -0,0 +1,273 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List
+
+# A browser backend launches sessions; a session owns one browser context and
+# hands out pages. The tools only talk to these interfaces, so the same tool
+# code drives local Playwright, a remote AgentCore browser over CDP, or the
+# in-memory fake DOM used for tests and load tests.
+
+# Subtrees left out of main-content text, and the elements that start a new line
+CONTENT_BOILERPLATE = (
+    'nav, header, footer, aside, script, style, noscript, template, svg, iframe, '
+    '[role="navigation"], [role="banner"], [role="contentinfo"], [role="complementary"], '
+    '[aria-hidden="true"], [hidden]'
+)
+CONTENT_BLOCK_TAGS = {
+    "address", "article", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "figure",
+    "form", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "li", "main", "ol", "p", "pre",
+    "section", "table", "td", "th", "tr", "ul"
+}
+
+# Minimum number of same-shaped siblings that count as a list of records
+MIN_REPEATED_ITEMS = 3
+
+# Page snapshots (for diffing page state between actions): the controls and
+# open dialogs they list, and how much of each is kept
+SNAPSHOT_CONTROLS = 'a[href], button, input, textarea, select, [role="button"], [role="link"]'
+SNAPSHOT_DIALOGS = 'dialog[open], [role="dialog"], [role="alertdialog"], [aria-modal="true"]'
+SNAPSHOT_MAX_ELEMENTS = 150
+SNAPSHOT_TEXT_CHARS = 20000
+SNAPSHOT_LABEL_CHARS = 80
+SNAPSHOT_DIALOG_CHARS = 200
+
+# Characters of link/form text kept by navigation_targets
+TARGET_TEXT_CHARS = 120
+
+# What describe_elements lists, by kind
+DESCRIBE_SELECTORS = {
+    "button": 'button, input[type="submit"], input[type="button"]',
+    "link": 'a[href]',
+    "input": 'input[type="text"], input[type="email"], input[type="search"], input[type="tel"], textarea'
+}
+
+# Form-field matching for fill_form: words ignored in field descriptions, and
+# description words that also match these attribute/label words
+FIELD_STOPWORDS = ["a", "an", "the", "your", "my", "field", "box", "input", "of", "for", "in", "to", "enter"]
+FIELD_SYNONYMS = {
+    "email": ["mail"],
+    "phone": ["tel", "telephone", "mobile"],
+    "telephone": ["tel", "phone"],
+    "name": ["fullname", "custname"],
+    "comments": ["comment", "message", "notes"],
+    "message": ["comments", "comment", "body"],
+    "zip": ["postal", "postcode"],
+    "password": ["pass", "pwd"],
+    "username": ["user", "login"],
+    "search": ["q", "query"]
+}
+
+class BackendPage(ABC):
+    """One tab in a backend session"""
+    
+    @property
+    @abstractmethod
+    def url(self) -> str:
+        """Current URL of the page"""
+    
+    @abstractmethod
+    async def goto(self, url: str, timeout_ms: int = 30000) -> None:
+        """Navigate to a URL and wait for DOMContentLoaded"""
+    
+    @abstractmethod
+    async def title(self) -> str:
+        """Document title"""
+    
+    @abstractmethod
+    async def is_visible(self, selector: str) -> bool:
+        """Whether the first element matching selector exists and is visible"""
+    
+    @abstractmethod
+    async def click(self, selector: str, timeout_ms: int = 5000) -> None:
+        """Click the first element matching selector"""
+    
+    @abstractmethod
+    async def fill(self, selector: str, text: str) -> None:
+        """Replace the value of the first input matching selector"""
+    
+    @abstractmethod
+    async def text_content(self, selector: Optional[str] = None) -> str:
+        """Text of the first element matching selector, or of the whole body"""
+    
+    async def main_content(self, offset: int = 0, max_chars: int = 4000,
+                           selector: Optional[str] = None) -> Dict[str, Any]:
+        """One chunk of the page's main-content text (see chunk_text for the result)
+        
+        Backends that can run code in the page override this to strip
+        boilerplate and cut the chunk before anything is transferred; this
+        fallback reads the whole text and chunks it locally.
+        """
+        return chunk_text(await self.text_content(selector), offset, max_chars)
+    
+    @abstractmethod
+    async def fill_form(self, fields: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Resolve every field description to a form control in one pass and fill them all
+        
+        Text inputs, textareas, selects, radio groups and checkboxes are
+        supported. Returns one outcome per field with 'field', 'value',
+        'status' ('filled', 'not_found' or 'no_matching_option') and 'target'
+        (a selector for the control that was used).
+        """
+    
+    @abstractmethod
+    async def extract_records(self, selector: Optional[str] = None,
+                              max_records: int = 500) -> Optional[Dict[str, Any]]:
+        """Detect the main table or repeated-item list (inside selector, if given) and extract it
+        
+        Returns 'kind' ('table' or 'list'), 'columns', 'records' (flat dicts
+        keyed by column), 'total_found' and 'next_page' (URL of a "next"
+        pagination link, if any), or None when nothing repeated was found.
+        """
+    
+    @abstractmethod
+    async def navigation_targets(self, limit: int = 200) -> List[Dict[str, Any]]:
+        """Where the page can lead: visible links and GET forms
+        
+        Returns dicts with 'kind' ('link' or 'form'), 'text' (link text, or
+        the form's label/text) and 'url' (absolute href or form action).
+        """
+    
+    async def transfer_size(self) -> int:
+        """Bytes transferred to load the current page and its resources (0 if unknown)"""
+        return 0
+    
+    async def snapshot(self) -> Dict[str, Any]:
+        """Compact page state for diffing between actions
+        
+        Returns 'url', 'title', 'elements' (visible controls as [label, value]
+        pairs, e.g. ["button: Search", None] or ["email: custemail", "a@b.c"]),
+        'text' (main-content lines) and 'dialogs' (text of open dialogs and
+        of JavaScript alerts/confirms since the last snapshot). This fallback
+        builds it from describe_elements and main_content.
+        """
+        elements = []
+        for element in await self.describe_elements(limit=SNAPSHOT_MAX_ELEMENTS):
+            name = element.get("text") or element.get("name") or element.get("placeholder") or ""
+            elements.append([f"{element['kind']}: {name[:SNAPSHOT_LABEL_CHARS]}", None])
+        content = await self.main_content(max_chars=SNAPSHOT_TEXT_CHARS)
+        return {
+            "url": self.url,
+            "title": await self.title(),
+            "elements": elements,
+            "text": [line for line in content["text"].split("\n") if line],
+            "dialogs": []
+        }
+    
+    @abstractmethod
+    async def wait_for_selector(self, selector: str, timeout_ms: int = 5000) -> None:
+        """Wait until an element matching selector is attached and visible"""
+    
+    @abstractmethod
+    async def describe_elements(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Summaries of the first buttons, links and text inputs on the page
+        
+        Each entry has a 'kind' ('button', 'link' or 'input') plus 'text',
+        'name', 'placeholder' and 'type' where they apply.
+        """
+    
+    def handle_count(self) -> int:
+        """Remote element/JS handles this page is holding (0 for backends without them)
+        
+        Backend methods should resolve elements through locators or in-page
+        scripts so that this stays flat however many actions a session runs.
+        """
+        return 0
+    
+    @abstractmethod
+    async def screenshot(self, path: Optional[str] = None, full_page: bool = False,
+                         selector: Optional[str] = None) -> bytes:
+        """Capture a PNG of the viewport, the full page or the first element matching selector
+        
+        The image is optionally also written to path.
+        """
+    
+    async def settle(self, seconds: float) -> None:
+        """Give the page time to settle after an action (no-op for instant backends)"""
+        await asyncio.sleep(seconds)
+    
+    @abstractmethod
+    async def close(self) -> None:
+        """Close the tab"""
+
+def chunk_text(text: str, offset: int = 0, max_chars: int = 4000) -> Dict[str, Any]:
+    """Cut text[offset:] to at most max_chars, preferring a line or word boundary
+    
+    Returns 'text', 'offset', 'next_offset' (None on the last chunk) and
+    'total_chars'. The same rule is implemented in the browser by
+    backends.playwright_backend.MAIN_CONTENT_JS.
+    """
+    total = len(text)
+    offset = max(0, min(offset, total))
+    end = min(offset + max_chars, total)
+    if end < total:
+        # Back off to a newline or space in the last fifth of the chunk
+        floor = offset + int(max_chars * 0.8)
+        cut = max(text.rfind("\n", floor, end), text.rfind(" ", floor, end))
+        if cut > offset:
+            end = cut + 1
+    return {
+        "text": text[offset:end].strip(),
+        "offset": offset,
+        "next_offset": end if end < total else None,
+        "total_chars": total
+    }
+
+class BackendSession(ABC):
+    """A browser context owned by one agent session"""
+    
+    @abstractmethod
+    async def new_page(self) -> BackendPage:
+        """Open a new tab in this context"""
+    
+    @abstractmethod
+    async def storage_state(self) -> Dict[str, Any]:
+        """Cookies and localStorage in Playwright's storage_state format"""
+    
+    def process_ids(self) -> List[int]:
+        """Local OS processes backing this session (empty for remote or in-memory backends)"""
+        return []
+    
+    @abstractmethod
+    async def close(self) -> None:
+        """Tear down the context and anything the backend started for it"""
+
+class BrowserBackend(ABC):
+    """Factory for backend sessions"""
+    
+    name: str = "base"
+    
+    @abstractmethod
+    async def launch(self, session_id: str, storage_state: Optional[Dict[str, Any]] = None) -> BackendSession:
+        """Start a new session, restoring storage_state when given"""
+
+_backends: Dict[str, BrowserBackend] = {}
+
+def get_backend(name: Optional[str] = None) -> BrowserBackend:
+    """Return the shared backend instance by name ('playwright', 'agentcore' or 'fake')
+    
+    Defaults to settings.browser_backend. Implementations are imported on
+    first use so that unused backends cost nothing at startup.
+    """
+    if name is None:
+        from config.settings import get_settings
+        name = get_settings().browser_backend
+    
+    backend = _backends.get(name)
+    if backend is None:
+        if name == "playwright":
+            from backends.playwright_backend import PlaywrightBackend
+            backend = PlaywrightBackend()
+        elif name == "agentcore":
+            from backends.agentcore_backend import AgentCoreBackend
+            backend = AgentCoreBackend()
+        elif name == "fake":
+            from backends.fake_backend import FakeBackend
+            backend = FakeBackend()
+        else:
+            raise ValueError(f"Unknown browser backend: {name}")
+        _backends[name] = backend
+    return backend
+
+def register_backend(name: str, backend: BrowserBackend):
+    """Install a backend instance under a name (e.g. a FakeBackend with a custom site)"""
+    _backends[name] = backend
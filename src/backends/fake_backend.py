@@ -0,0 +1,841 @@
+import re
+import time
+from collections import deque
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Optional, Dict, Any, List, Callable, Deque, Tuple
+from urllib.parse import urljoin, urlencode, urlparse
+from backends.base import (
+    BrowserBackend, BackendSession, BackendPage, CONTENT_BOILERPLATE, CONTENT_BLOCK_TAGS,
+    MIN_REPEATED_ITEMS, FIELD_STOPWORDS, FIELD_SYNONYMS, SNAPSHOT_CONTROLS, SNAPSHOT_DIALOGS,
+    SNAPSHOT_MAX_ELEMENTS, SNAPSHOT_TEXT_CHARS, SNAPSHOT_LABEL_CHARS, SNAPSHOT_DIALOG_CHARS, TARGET_TEXT_CHARS,
+    DESCRIBE_SELECTORS, chunk_text
+)
+
+# An in-process browser stand-in. Pages are small HTML documents parsed with
+# the standard library into a DOM tree, and the handful of selector forms the
+# tools use (tag, #id, .class, [attr], [attr="v"], [attr*="v"], :has-text(),
+# :visible, text="...", comma lists) are matched in Python. Nothing sleeps, so
+# the agent loop can be driven at thousands of steps per second.
+
+# 1x1 transparent PNG returned for screenshots
+BLANK_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000005000100e2212bc0"
+    "0000000049454e44ae426082"
+)
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "param", "source", "track", "wbr"}
+INVISIBLE_TAGS = {"head", "script", "style", "template", "title", "noscript"}
+
+# Compiled selectors kept (generated selectors would otherwise grow the cache
+# for the life of the process)
+SELECTOR_CACHE_SIZE = 1024
+# Recent entries kept in FakePage.actions and FakeSession.history for tests
+# to inspect; long load runs would otherwise keep every step
+ACTION_LOG_SIZE = 1000
+
+class FakeNode:
+    """Element in the fake DOM"""
+
+    __slots__ = ("tag", "attrs", "children", "parent", "value")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["FakeNode"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Any] = []  # FakeNode or str
+        self.parent = parent
+        self.value = attrs.get("value", "")
+
+    def text(self) -> str:
+        """Text content of the node and its descendants"""
+        if self.tag in ("script", "style"):
+            return ""
+        parts = []
+        for child in self.children:
+            parts.append(child if isinstance(child, str) else child.text())
+        return "".join(parts)
+
+    def iter(self):
+        """This node and all descendant elements, in document order"""
+        yield self
+        for child in self.children:
+            if isinstance(child, FakeNode):
+                yield from child.iter()
+
+    def hides_itself(self) -> bool:
+        """Whether this element (regardless of its ancestors) is not rendered"""
+        if self.tag in INVISIBLE_TAGS or "hidden" in self.attrs or self.attrs.get("type") == "hidden":
+            return True
+        style = self.attrs.get("style", "").replace(" ", "").lower()
+        return "display:none" in style or "visibility:hidden" in style
+
+    def is_visible(self) -> bool:
+        node = self
+        while node is not None:
+            if node.hides_itself():
+                return False
+            node = node.parent
+        return True
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = FakeNode("#document", {})
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = FakeNode(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = FakeNode(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+def parse_html(html: str) -> FakeNode:
+    """Parse HTML into a fake DOM tree rooted at a #document node"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+# --- Selector matching -----------------------------------------------------
+
+_COMPOUND_RE = re.compile(
+    r'#(?P<id>[\w-]+)'
+    r'|\.(?P<cls>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:(?P<op>\*?=)"(?P<val>[^"]*)")?\]'
+    r'|:has-text\("(?P<has_text>[^"]*)"\)'
+    r'|:(?P<pseudo>visible)'
+)
+_TAG_RE = re.compile(r'^(\*|[a-zA-Z][\w-]*)')
+
+def _split_selector_list(selector: str) -> List[str]:
+    """Split on top-level commas, ignoring commas inside quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(selector):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return [p for p in parts if p]
+
+def _compile_compound(selector: str) -> Callable[[FakeNode], bool]:
+    if selector.startswith("text="):
+        expected = selector[len("text="):].strip().strip('"')
+        return lambda node: node.tag not in ("#document", "html", "body") and node.text().strip() == expected
+
+    checks = []
+    rest = selector
+    tag_match = _TAG_RE.match(rest)
+    if tag_match:
+        tag = tag_match.group(1).lower()
+        if tag != "*":
+            checks.append(lambda node, tag=tag: node.tag == tag)
+        rest = rest[tag_match.end():]
+
+    pos = 0
+    while pos < len(rest):
+        m = _COMPOUND_RE.match(rest, pos)
+        if not m:
+            raise ValueError(f"Unsupported selector for fake backend: {selector}")
+        if m.group("id"):
+            checks.append(lambda node, v=m.group("id"): node.attrs.get("id") == v)
+        elif m.group("cls"):
+            checks.append(lambda node, v=m.group("cls"): v in node.attrs.get("class", "").split())
+        elif m.group("attr"):
+            attr, op, val = m.group("attr"), m.group("op"), m.group("val")
+            if not op:
+                checks.append(lambda node, a=attr: a in node.attrs)
+            elif op == "=":
+                checks.append(lambda node, a=attr, v=val: node.attrs.get(a) == v)
+            else:
+                checks.append(lambda node, a=attr, v=val: v in node.attrs.get(a, ""))
+        elif m.group("has_text") is not None:
+            needle = m.group("has_text").lower()
+            checks.append(lambda node, v=needle: v in node.text().lower())
+        elif m.group("pseudo") == "visible":
+            checks.append(lambda node: node.is_visible())
+        pos = m.end()
+
+    return lambda node: node.tag != "#document" and all(check(node) for check in checks)
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def compile_selector(selector: str) -> Tuple[Callable[[FakeNode], bool], ...]:
+    return tuple(_compile_compound(part) for part in _split_selector_list(selector))
+
+def query_all(root: FakeNode, selector: str) -> List[FakeNode]:
+    predicates = compile_selector(selector)
+    return [node for node in root.iter() if any(p(node) for p in predicates)]
+
+def query(root: FakeNode, selector: str) -> Optional[FakeNode]:
+    predicates = compile_selector(selector)
+    for node in root.iter():
+        if any(p(node) for p in predicates):
+            return node
+    return None
+
+def main_content_text(root: FakeNode) -> str:
+    """Rendered-like text of root without boilerplate or hidden subtrees"""
+    boilerplate = compile_selector(CONTENT_BOILERPLATE)
+    parts: List[str] = []
+
+    def walk(node: FakeNode):
+        for child in node.children:
+            if isinstance(child, str):
+                parts.append(re.sub(r'\s+', ' ', child))
+            elif not child.hides_itself() and not any(p(child) for p in boilerplate):
+                block = child.tag in CONTENT_BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                walk(child)
+                if block:
+                    parts.append("\n")
+
+    walk(root)
+    text = re.sub(r' *\n\s*', '\n', "".join(parts))
+    return re.sub(r'  +', ' ', text).strip()
+
+# --- Structured extraction ----------------------------------------------------
+
+NEXT_LINK_TEXT_RE = re.compile(r'^(next( page)?)?\s*[›→>]?$')
+
+def _clean(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip()
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+def _own_text(node: FakeNode) -> str:
+    return _clean(" ".join(child for child in node.children if isinstance(child, str)))
+
+def _key_of(node: FakeNode) -> str:
+    for cls in node.attrs.get("class", "").split():
+        if _slug(cls):
+            return _slug(cls)
+    if node.tag == "a":
+        return "link"
+    if node.tag == "img":
+        return "image"
+    return "title" if re.fullmatch(r'h[1-6]', node.tag) else node.tag
+
+def _put(record: Dict[str, Any], key: str, value: Optional[str]):
+    if not value:
+        return
+    candidate, n = key, 2
+    while candidate in record:
+        candidate, n = f"{key}_{n}", n + 1
+    record[candidate] = value
+
+def _element_children(node: FakeNode) -> List[FakeNode]:
+    return [child for child in node.children if isinstance(child, FakeNode)]
+
+def _item_record(item: FakeNode, base_url: str) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+
+    def walk(node: FakeNode, in_field: bool):
+        for child in _element_children(node):
+            if child.tag in ("script", "style", "noscript", "template") or child.hides_itself():
+                continue
+            field = in_field
+            if not in_field and _own_text(child):
+                _put(record, _key_of(child), _clean(child.text()))
+                field = True
+            if child.tag == "a" and child.attrs.get("href"):
+                _put(record, _key_of(child) + "_url", urljoin(base_url, child.attrs["href"]))
+            if child.tag == "img" and child.attrs.get("src"):
+                _put(record, _key_of(child), urljoin(base_url, child.attrs["src"]))
+            walk(child, field)
+
+    _put(record, "text", _own_text(item))
+    if item.tag == "a" and item.attrs.get("href"):
+        _put(record, "url", urljoin(base_url, item.attrs["href"]))
+    walk(item, False)
+    return record
+
+def _table_records(table: FakeNode, base_url: str) -> List[Dict[str, Any]]:
+    rows = [row for row in query_all(table, "tr") if row.is_visible()]
+    if len(rows) < 2:
+        return []
+    first = [cell for cell in _element_children(rows[0]) if cell.tag in ("th", "td")]
+    has_header = query(table, "thead") is not None or all(cell.tag == "th" for cell in first)
+    columns = [(has_header and _slug(_clean(cell.text()))) or f"column_{i + 1}" for i, cell in enumerate(first)]
+
+    records = []
+    for row in (rows[1:] if has_header else rows):
+        record: Dict[str, Any] = {}
+        cells = [cell for cell in _element_children(row) if cell.tag in ("th", "td")]
+        for i, cell in enumerate(cells):
+            key = columns[i] if i < len(columns) else f"column_{i + 1}"
+            _put(record, key, _clean(cell.text()))
+            link = query(cell, "a[href]")
+            if link is not None and link is not cell:
+                _put(record, key + "_url", urljoin(base_url, link.attrs["href"]))
+        if record:
+            records.append(record)
+    return records
+
+def extract_records_from(document: FakeNode, base_url: str, selector: Optional[str] = None,
+                         max_records: int = 500) -> Optional[Dict[str, Any]]:
+    """Python twin of backends.playwright_backend.EXTRACT_RECORDS_JS"""
+    scope = query(document, selector) if selector else query(document, "body")
+    if scope is None:
+        return None
+    boilerplate = compile_selector(CONTENT_BOILERPLATE)
+
+    def in_boilerplate(node: FakeNode) -> bool:
+        while node is not None and not selector:
+            if any(p(node) for p in boilerplate):
+                return True
+            node = node.parent
+        return False
+
+    best: Optional[Dict[str, Any]] = None
+    for table in query_all(scope, "table"):
+        if not table.is_visible() or in_boilerplate(table):
+            continue
+        records = _table_records(table, base_url)
+        header_cells = [c for c in _element_children(query(table, "tr")) if c.tag in ("th", "td")]
+        score = len(records) * len(header_cells)
+        if records and (best is None or score > best["score"]):
+            best = {"kind": "table", "records": records, "score": score}
+
+    for parent in scope.iter():
+        children = _element_children(parent)
+        if len(children) < MIN_REPEATED_ITEMS:
+            continue
+        if parent.tag in ("table", "thead", "tbody", "tfoot", "tr", "select", "head") \
+                or in_boilerplate(parent) or not parent.is_visible():
+            continue
+        groups: Dict[str, List[FakeNode]] = {}
+        for child in children:
+            if child.tag in ("script", "style", "br", "hr", "option", "meta", "link") or child.hides_itself():
+                continue
+            signature = child.tag + "." + ".".join(sorted(child.attrs.get("class", "").split()))
+            groups.setdefault(signature, []).append(child)
+        for items in groups.values():
+            if len(items) < MIN_REPEATED_ITEMS:
+                continue
+            # Score on a sample; only the winner is extracted in full
+            sample = [len(_item_record(item, base_url)) for item in items[:MIN_REPEATED_ITEMS]]
+            fields = sum(sample) / len(sample)
+            score = len(items) * min(fields, 10)
+            if fields > 0 and (best is None or score > best["score"]):
+                best = {"kind": "list", "items": items, "score": score}
+
+    if best is None:
+        return None
+
+    if best["kind"] == "table":
+        found = best["records"]
+    else:
+        found = [record for record in (_item_record(item, base_url) for item in best["items"]) if record]
+    kept = found[:max_records]
+    columns: List[str] = []
+    for record in kept:
+        for key in record:
+            if key not in columns:
+                columns.append(key)
+
+    next_link = query(document, 'a[rel="next"][href]')
+    if next_link is None:
+        for link in query_all(document, "a[href]"):
+            text = _clean(link.text()).lower()
+            if (text and NEXT_LINK_TEXT_RE.match(text)) or "next" in link.attrs.get("aria-label", "").lower():
+                next_link = link
+                break
+    return {
+        "kind": best["kind"],
+        "columns": columns,
+        "records": [{column: record.get(column) for column in columns} for record in kept],
+        "total_found": len(found),
+        "next_page": urljoin(base_url, next_link.attrs["href"]) if next_link is not None else None
+    }
+
+# --- Form filling ---------------------------------------------------------------
+
+TRUE_WORDS = {"yes", "true", "on", "checked", "1"}
+FALSE_WORDS = {"no", "false", "off", "unchecked", "0"}
+
+def _words(text: str) -> List[str]:
+    return [w for w in re.split(r'[^a-z0-9]+', _clean(text or "").lower()) if w and w not in FIELD_STOPWORDS]
+
+def _near(a: str, b: str) -> bool:
+    return a == b or (len(a) >= 3 and len(b) >= 3 and (a.startswith(b) or b.startswith(a)))
+
+def _hit(token: str, words: List[str]) -> float:
+    if token in words:
+        return 1
+    return 0.5 if any(_near(token, w) for w in words) else 0
+
+def _label_of(document: FakeNode, node: FakeNode) -> str:
+    parts = []
+    if node.attrs.get("id"):
+        parts.extend(label.text() for label in query_all(document, f'label[for="{node.attrs["id"]}"]'))
+    ancestor = node.parent
+    while ancestor is not None:
+        if ancestor.tag == "label":
+            parts.append(ancestor.text())
+            break
+        ancestor = ancestor.parent
+    parts.extend(node.attrs.get(a, "") for a in ("aria-label", "placeholder", "title"))
+    return " ".join(parts)
+
+def _describe(node: FakeNode) -> str:
+    if node.attrs.get("name"):
+        return f'{node.tag}[name="{node.attrs["name"]}"]'
+    return f'#{node.attrs["id"]}' if node.attrs.get("id") else node.tag
+
+def _option_score(value: str, texts: List[str]) -> int:
+    v = _clean(value).lower()
+    texts = [t for t in (_clean(t or "").lower() for t in texts) if t]
+    if v in texts:
+        return 2
+    return 1 if v and any(v in t for t in texts) else 0
+
+def _set_checked(node: FakeNode, checked: bool, group: List[FakeNode]):
+    if checked and node.attrs.get("type") == "radio":
+        for other in group:
+            other.attrs.pop("checked", None)
+    if checked:
+        node.attrs["checked"] = ""
+    else:
+        node.attrs.pop("checked", None)
+
+def fill_form_in(document: FakeNode, fields: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Python twin of backends.playwright_backend.FILL_FORM_JS"""
+    candidates: List[Dict[str, Any]] = []
+    groups: Dict[str, Dict[str, Any]] = {}
+    for node in query_all(document, "input, textarea, select"):
+        kind = node.attrs.get("type", "text").lower() if node.tag == "input" else node.tag
+        if kind in ("hidden", "submit", "button", "reset", "image", "file") or "disabled" in node.attrs \
+                or not node.is_visible():
+            continue
+        name = node.attrs.get("name", "")
+        if kind in ("radio", "checkbox") and name:
+            group = groups.get(f"{kind}:{name}")
+            if group is None:
+                fieldset = node.parent
+                while fieldset is not None and fieldset.tag != "fieldset":
+                    fieldset = fieldset.parent
+                legend = query(fieldset, "legend") if fieldset is not None else None
+                group = {"type": kind, "elements": [], "keys": _words(name),
+                         "labels": _words(legend.text() if legend else "")}
+                groups[f"{kind}:{name}"] = group
+                candidates.append(group)
+            group["elements"].append(node)
+            group["labels"].extend(_words(_label_of(document, node)))
+        else:
+            candidates.append({"type": kind, "elements": [node],
+                               "keys": _words(f"{name} {node.attrs.get('id', '')}"),
+                               "labels": _words(_label_of(document, node))})
+
+    def score(description: str, candidate: Dict[str, Any]) -> float:
+        total = 0.0
+        for token in _words(description):
+            total += max(
+                3 * _hit(t, candidate["keys"]) + 2 * _hit(t, candidate["labels"]) + (2 if t == candidate["type"] else 0)
+                for t in [token] + FIELD_SYNONYMS.get(token, [])
+            )
+        return total
+
+    items = list(fields.items())
+    pairs = [(score(description, candidate), f, c)
+             for f, (description, _) in enumerate(items) for c, candidate in enumerate(candidates)]
+    pairs = sorted((p for p in pairs if p[0] > 0), key=lambda p: (-p[0], p[1], p[2]))
+    assigned: Dict[int, int] = {}
+    used = set()
+    for _, f, c in pairs:
+        if f not in assigned and c not in used:
+            assigned[f] = c
+            used.add(c)
+
+    results = []
+    for f, (description, value) in enumerate(items):
+        result = {"field": description, "value": value, "status": "not_found", "target": None}
+        results.append(result)
+        if f not in assigned:
+            continue
+        candidate = candidates[assigned[f]]
+        elements = candidate["elements"]
+        first = elements[0]
+        result["target"] = _describe(first)
+        v = _clean(str(value)).lower()
+
+        if candidate["type"] == "select":
+            options = query_all(first, "option")
+            scores = [_option_score(value, [o.attrs.get("value", o.text()), o.text()]) for o in options]
+            if not scores or max(scores) == 0:
+                result["status"] = "no_matching_option"
+                continue
+            option = options[scores.index(max(scores))]
+            first.value = option.attrs.get("value", option.text().strip())
+        elif candidate["type"] == "radio":
+            scores = [_option_score(value, [el.attrs.get("value", ""), _label_of(document, el)]) for el in elements]
+            if max(scores) == 0:
+                result["status"] = "no_matching_option"
+                continue
+            chosen = elements[scores.index(max(scores))]
+            _set_checked(chosen, True, elements)
+            result["target"] = _describe(chosen) + f'[value="{chosen.attrs.get("value", "")}"]'
+        elif candidate["type"] == "checkbox":
+            if v in TRUE_WORDS or v in FALSE_WORDS:
+                description_words = _words(description)
+                named = [el for el in elements
+                         if any(_near(t, w) for w in _words(_label_of(document, el) + " " + el.attrs.get("value", ""))
+                                for t in description_words)]
+                for el in (elements if len(elements) == 1 else named):
+                    _set_checked(el, v in TRUE_WORDS, elements)
+                if len(elements) > 1 and not named:
+                    result["status"] = "no_matching_option"
+                    continue
+            else:
+                wanted = [w.strip() for w in str(value).split(",") if w.strip()]
+                chosen = [el for el in elements
+                          if any(_option_score(w, [el.attrs.get("value", ""), _label_of(document, el)]) > 0 for w in wanted)]
+                if not chosen:
+                    result["status"] = "no_matching_option"
+                    continue
+                for el in chosen:
+                    _set_checked(el, True, elements)
+        else:
+            first.value = str(value)
+        result["status"] = "filled"
+    return results
+
+# --- Site ---------------------------------------------------------------------
+
+DEFAULT_TEMPLATE = """<html><head><title>{title}</title></head>
+<body>
+<nav><a href="/">Home</a> <a href="/login">Login</a> <a href="/about">About</a></nav>
+<main>
+<h1>{title}</h1>
+<p>Fake content for {url}.</p>
+<form action="/search" method="get">
+  <input type="search" name="q" placeholder="Search">
+  <button type="submit">Search</button>
+</form>
+<ul>{items}</ul>
+</main>
+<footer><a href="/contact">Contact</a></footer>
+</body></html>"""
+
+# --- Page snapshots -------------------------------------------------------------
+
+def _selected_text(select: FakeNode) -> str:
+    options = query_all(select, "option")
+    chosen = next((o for o in options if select.value and o.attrs.get("value", _clean(o.text())) == select.value), None)
+    chosen = chosen or next((o for o in options if "selected" in o.attrs), options[0] if options else None)
+    return _clean(chosen.text()) if chosen is not None else ""
+
+def snapshot_of(document: FakeNode) -> Dict[str, Any]:
+    """Visible controls as [label, value] pairs and open dialogs (Python twin of SNAPSHOT_JS)"""
+    elements: List[List[Any]] = []
+    for node in query_all(document, SNAPSHOT_CONTROLS):
+        if len(elements) >= SNAPSHOT_MAX_ELEMENTS:
+            break
+        kind_attr = node.attrs.get("type", "").lower()
+        role = node.attrs.get("role")
+        if kind_attr == "hidden" or not node.is_visible():
+            continue
+        value = None
+        if node.tag == "a" or role == "link":
+            kind = "link"
+            name = _clean(node.text()) or _clean(node.attrs.get("aria-label", ""))
+        elif node.tag == "button" or role == "button" or (node.tag == "input" and kind_attr in ("submit", "button", "reset")):
+            kind = "button"
+            name = _clean(node.text()) or _clean(node.attrs.get("value", "")) or _clean(node.attrs.get("aria-label", ""))
+        else:
+            kind = (kind_attr or "text") if node.tag == "input" else node.tag
+            name = (node.attrs.get("name") or node.attrs.get("id") or node.attrs.get("placeholder")
+                    or _clean(node.attrs.get("aria-label", "")))
+            if kind_attr in ("checkbox", "radio"):
+                value = "checked" if "checked" in node.attrs else "unchecked"
+            elif node.tag == "select":
+                value = _selected_text(node)
+            else:
+                value = node.value
+        if name:
+            elements.append([f"{kind}: {name}"[:SNAPSHOT_LABEL_CHARS], value])
+
+    dialogs = [_clean(main_content_text(node))[:SNAPSHOT_DIALOG_CHARS]
+               for node in query_all(document, SNAPSHOT_DIALOGS) if node.is_visible()]
+    return {"elements": elements, "dialogs": dialogs}
+
+def targets_of(document: FakeNode, url: str, limit: int = 200) -> List[Dict[str, Any]]:
+    """Visible links and GET forms with absolute URLs (Python twin of NAVIGATION_TARGETS_JS)"""
+    targets: List[Dict[str, Any]] = []
+    for link in query_all(document, "a[href]"):
+        if len(targets) >= limit:
+            break
+        if link.is_visible():
+            text = _clean(link.text()) or _clean(link.attrs.get("aria-label", ""))
+            targets.append({"kind": "link", "text": text[:TARGET_TEXT_CHARS], "url": urljoin(url, link.attrs["href"])})
+    for form in query_all(document, "form"):
+        if form.attrs.get("method", "get").lower() != "get" or not form.is_visible():
+            continue
+        text = _clean(form.attrs.get("aria-label", "")) or _clean(main_content_text(form))
+        targets.append({"kind": "form", "text": text[:TARGET_TEXT_CHARS], "url": urljoin(url, form.attrs.get("action", url))})
+    return targets
+
+class FakeSite:
+    """URL -> HTML mapping served by the fake backend
+
+    Registered pages are served as-is; any other URL gets a generated page
+    with navigation links, a search form and a short item list so that
+    arbitrary agent runs have something to interact with.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None, items_per_page: int = 5):
+        self.pages: Dict[str, str] = dict(pages or {})
+        self.items_per_page = items_per_page
+
+    def add_page(self, url: str, html: str):
+        self.pages[url] = html
+
+    def render(self, url: str) -> str:
+        html = self.pages.get(url)
+        if html is not None:
+            return html
+        path = urlparse(url).path.strip("/") or "home"
+        items = "".join(
+            f'<li><a href="/{path}/item-{i}">Item {i}</a></li>'
+            for i in range(1, self.items_per_page + 1)
+        )
+        return DEFAULT_TEMPLATE.format(title=f"Fake {path}", url=url, items=items)
+
+# --- Backend ------------------------------------------------------------------
+
+class FakePage(BackendPage):
+    """BackendPage over a parsed fake DOM"""
+
+    def __init__(self, session: "FakeSession"):
+        self.session = session
+        self._url = "about:blank"
+        self.document = parse_html("<html><head><title></title></head><body></body></html>")
+        self.actions: Deque[Dict[str, Any]] = deque(maxlen=ACTION_LOG_SIZE)
+        self._size = 0
+        self.js_dialogs: List[str] = []  # tests push "alert: ..." here to simulate JavaScript dialogs
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    async def goto(self, url: str, timeout_ms: int = 30000) -> None:
+        self._load(url)
+
+    def _load(self, url: str):
+        self._url = url
+        html = self.session.site.render(url)
+        self._size = len(html.encode())
+        self.document = parse_html(html)
+        self.session.history.append(url)
+
+    async def title(self) -> str:
+        node = query(self.document, "title")
+        return node.text().strip() if node else ""
+
+    def _first(self, selector: str) -> FakeNode:
+        node = query(self.document, selector)
+        if node is None:
+            raise TimeoutError(f"No element matches selector: {selector}")
+        return node
+
+    async def is_visible(self, selector: str) -> bool:
+        node = query(self.document, selector)
+        return node is not None and node.is_visible()
+
+    async def click(self, selector: str, timeout_ms: int = 5000) -> None:
+        node = self._first(selector)
+        if not node.is_visible():
+            raise TimeoutError(f"Element not visible: {selector}")
+        self.actions.append({"action": "click", "selector": selector})
+
+        # Follow links and submit forms like a browser would
+        target = node
+        while target is not None and target.tag != "a":
+            target = target.parent
+        if target is not None and target.attrs.get("href"):
+            self._load(urljoin(self._url, target.attrs["href"]))
+            return
+
+        is_submit = (node.tag == "button" and node.attrs.get("type", "submit") == "submit") or \
+                    (node.tag == "input" and node.attrs.get("type") == "submit")
+        if is_submit:
+            form = node.parent
+            while form is not None and form.tag != "form":
+                form = form.parent
+            if form is not None:
+                fields = [
+                    (field.attrs["name"], self._field_value(field))
+                    for field in form.iter()
+                    if field.tag in ("input", "textarea", "select") and field.attrs.get("name")
+                    and field.attrs.get("type") not in ("submit", "button")
+                    and (field.attrs.get("type") not in ("radio", "checkbox") or "checked" in field.attrs)
+                ]
+                action = urljoin(self._url, form.attrs.get("action", self._url))
+                if form.attrs.get("method", "get").lower() == "get" and fields:
+                    action = f"{action}?{urlencode(fields)}"
+                self._load(action)
+
+    @staticmethod
+    def _field_value(field: FakeNode) -> str:
+        if field.tag == "select" and not field.value:
+            options = query_all(field, "option")
+            selected = next((o for o in options if "selected" in o.attrs), options[0] if options else None)
+            return selected.attrs.get("value", selected.text().strip()) if selected is not None else ""
+        if field.attrs.get("type") in ("radio", "checkbox"):
+            return field.attrs.get("value", "on")
+        return field.value
+
+    async def fill_form(self, fields: Dict[str, str]) -> List[Dict[str, Any]]:
+        results = fill_form_in(self.document, fields)
+        self.actions.append({"action": "fill_form", "fields": list(fields)})
+        return results
+
+    async def fill(self, selector: str, text: str) -> None:
+        node = self._first(selector)
+        if node.tag not in ("input", "textarea", "select"):
+            raise ValueError(f"Element is not an input: {selector}")
+        node.value = text
+        self.actions.append({"action": "fill", "selector": selector})
+
+    async def text_content(self, selector: Optional[str] = None) -> str:
+        if selector:
+            return self._first(selector).text()
+        body = query(self.document, "body") or self.document
+        return re.sub(r'\s+', ' ', body.text()).strip()
+
+    async def main_content(self, offset: int = 0, max_chars: int = 4000,
+                           selector: Optional[str] = None) -> Dict[str, Any]:
+        if selector:
+            root = query(self.document, selector)
+        else:
+            root = query(self.document, 'main, [role="main"], article') or query(self.document, "body")
+        if root is None:
+            return chunk_text("", 0, max_chars)
+        return chunk_text(main_content_text(root), offset, max_chars)
+
+    async def extract_records(self, selector: Optional[str] = None,
+                              max_records: int = 500) -> Optional[Dict[str, Any]]:
+        return extract_records_from(self.document, self._url, selector, max_records)
+
+    async def navigation_targets(self, limit: int = 200) -> List[Dict[str, Any]]:
+        return targets_of(self.document, self._url, limit)
+
+    async def transfer_size(self) -> int:
+        return self._size
+
+    async def snapshot(self) -> Dict[str, Any]:
+        state = snapshot_of(self.document)
+        content = await self.main_content(max_chars=SNAPSHOT_TEXT_CHARS)
+        dialogs, self.js_dialogs = state["dialogs"] + self.js_dialogs, []
+        return {
+            "url": self._url,
+            "title": await self.title(),
+            "elements": state["elements"],
+            "text": [line for line in content["text"].split("\n") if line],
+            "dialogs": dialogs
+        }
+
+    async def wait_for_selector(self, selector: str, timeout_ms: int = 5000) -> None:
+        node = self._first(selector)
+        if not node.is_visible():
+            raise TimeoutError(f"Element not visible: {selector}")
+
+    async def describe_elements(self, limit: int = 10) -> List[Dict[str, Any]]:
+        buttons = query_all(self.document, DESCRIBE_SELECTORS["button"])
+        links = query_all(self.document, DESCRIBE_SELECTORS["link"])
+        inputs = query_all(self.document, DESCRIBE_SELECTORS["input"])
+
+        elements = []
+        for node in buttons[:limit]:
+            text = node.text().strip() or node.attrs.get("value", "")
+            if text:
+                elements.append({"kind": "button", "text": text})
+        for node in links[:limit]:
+            text = node.text().strip()
+            if text:
+                elements.append({"kind": "link", "text": text})
+        for node in inputs[:limit]:
+            elements.append({
+                "kind": "input",
+                "name": node.attrs.get("name"),
+                "placeholder": node.attrs.get("placeholder"),
+                "type": node.attrs.get("type")
+            })
+        return elements
+
+    async def screenshot(self, path: Optional[str] = None, full_page: bool = False,
+                         selector: Optional[str] = None) -> bytes:
+        if selector:
+            self._first(selector)
+        if path:
+            with open(path, "wb") as f:
+                f.write(BLANK_PNG)
+        return BLANK_PNG
+
+    async def settle(self, seconds: float) -> None:
+        # The fake DOM is always settled
+        return None
+
+    async def close(self) -> None:
+        if self in self.session.pages:
+            self.session.pages.remove(self)
+
+class FakeSession(BackendSession):
+    """In-memory browser context"""
+
+    def __init__(self, site: FakeSite, storage_state: Optional[Dict[str, Any]] = None):
+        self.site = site
+        self.pages: List[FakePage] = []
+        self.history: Deque[str] = deque(maxlen=ACTION_LOG_SIZE)
+        self.cookies: List[Dict[str, Any]] = list((storage_state or {}).get("cookies", []))
+        self.origins: List[Dict[str, Any]] = list((storage_state or {}).get("origins", []))
+        self.created_at = time.time()
+        self.closed = False
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def storage_state(self) -> Dict[str, Any]:
+        return {"cookies": list(self.cookies), "origins": list(self.origins)}
+
+    async def close(self) -> None:
+        self.pages.clear()
+        self.closed = True
+
+class FakeBackend(BrowserBackend):
+    """Instant in-memory backend for tests and agent-loop load tests"""
+
+    name = "fake"
+
+    def __init__(self, site: Optional[FakeSite] = None):
+        self.site = site or FakeSite()
+
+    async def launch(self, session_id: str, storage_state: Optional[Dict[str, Any]] = None) -> FakeSession:
+        return FakeSession(self.site, storage_state)
@@ -0,0 +1,638 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+from backends.base import (
+    BrowserBackend, BackendSession, BackendPage, CONTENT_BOILERPLATE, CONTENT_BLOCK_TAGS, MIN_REPEATED_ITEMS,
+    FIELD_STOPWORDS, FIELD_SYNONYMS, SNAPSHOT_CONTROLS, SNAPSHOT_DIALOGS, SNAPSHOT_MAX_ELEMENTS,
+    SNAPSHOT_TEXT_CHARS, SNAPSHOT_LABEL_CHARS, SNAPSHOT_DIALOG_CHARS, TARGET_TEXT_CHARS, DESCRIBE_SELECTORS
+)
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Runs in the page: pick the main-content root (or the given selector), walk it
+# skipping boilerplate and hidden subtrees, and return only the requested
+# chunk, cut like backends.base.chunk_text, so large pages never cross the wire
+MAIN_CONTENT_JS = r"""
+([offset, maxChars, selector, boilerplate, blockTags]) => {
+    const root = selector ? document.querySelector(selector)
+        : (document.querySelector('main, [role="main"], article') || document.body);
+    if (!root) return {text: '', offset: 0, next_offset: null, total_chars: 0};
+    const blocks = new Set(blockTags);
+    const parts = [];
+    const walk = (node) => {
+        for (let child = node.firstChild; child; child = child.nextSibling) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                parts.push(child.data.replace(/\s+/g, ' '));
+            } else if (child.nodeType === Node.ELEMENT_NODE) {
+                if (child.matches(boilerplate)) continue;
+                if (child.checkVisibility && !child.checkVisibility()) continue;
+                const block = blocks.has(child.tagName.toLowerCase());
+                if (block) parts.push('\n');
+                walk(child);
+                if (block) parts.push('\n');
+            }
+        }
+    };
+    walk(root);
+    const text = parts.join('').replace(/ *\n\s*/g, '\n').replace(/  +/g, ' ').trim();
+    const total = text.length;
+    offset = Math.max(0, Math.min(offset, total));
+    let end = Math.min(offset + maxChars, total);
+    if (end < total) {
+        const floor = offset + Math.floor(maxChars * 0.8);
+        const tail = text.slice(floor, end);
+        const cut = Math.max(tail.lastIndexOf('\n'), tail.lastIndexOf(' '));
+        if (cut >= 0) end = floor + cut + 1;
+    }
+    return {
+        text: text.slice(offset, end).trim(),
+        offset: offset,
+        next_offset: end < total ? end : null,
+        total_chars: total
+    };
+}
+"""
+
+# Runs in the page: visible controls as [label, value] pairs and the text of
+# open dialogs, for BackendPage.snapshot. Mirrors
+# backends.fake_backend.snapshot_of.
+SNAPSHOT_JS = r"""
+([controls, dialogSelector, maxElements, labelChars, dialogChars]) => {
+    const visible = (el) => el.checkVisibility ? el.checkVisibility()
+        : !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const clean = (s) => (s || '').replace(/\s+/g, ' ').trim();
+    const elements = [];
+    for (const el of document.querySelectorAll(controls)) {
+        if (elements.length >= maxElements) break;
+        const tag = el.tagName.toLowerCase();
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        const role = el.getAttribute('role');
+        if (type === 'hidden' || !visible(el)) continue;
+        let kind, name, value = null;
+        if (tag === 'a' || role === 'link') {
+            kind = 'link';
+            name = clean(el.textContent) || clean(el.getAttribute('aria-label'));
+        } else if (tag === 'button' || role === 'button' || (tag === 'input' && ['submit', 'button', 'reset'].includes(type))) {
+            kind = 'button';
+            name = clean(el.textContent) || clean(el.getAttribute('value')) || clean(el.getAttribute('aria-label'));
+        } else {
+            kind = tag === 'input' ? (type || 'text') : tag;
+            name = el.getAttribute('name') || el.id || el.getAttribute('placeholder') || clean(el.getAttribute('aria-label'));
+            if (type === 'checkbox' || type === 'radio') {
+                value = el.checked ? 'checked' : 'unchecked';
+            } else if (tag === 'select') {
+                const option = el.options[el.selectedIndex];
+                value = option ? clean(option.textContent) : '';
+            } else {
+                value = el.value;
+            }
+        }
+        if (!name) continue;
+        elements.push([(kind + ': ' + name).slice(0, labelChars), value]);
+    }
+    const dialogs = [];
+    for (const el of document.querySelectorAll(dialogSelector)) {
+        if (visible(el)) dialogs.push(clean(el.innerText || el.textContent).slice(0, dialogChars));
+    }
+    return {title: document.title, elements: elements, dialogs: dialogs};
+}
+"""
+
+# Runs in the page: summaries of the first buttons, links and text inputs, for
+# BackendPage.describe_elements. Reading them in one script instead of through
+# query_selector_all leaves no element handles behind. Mirrors
+# FakePage.describe_elements.
+DESCRIBE_ELEMENTS_JS = r"""
+([selectors, limit]) => {
+    const first = (selector) => Array.from(document.querySelectorAll(selector)).slice(0, limit);
+    const elements = [];
+    for (const el of first(selectors.button)) {
+        const text = (el.textContent || '').trim() || el.getAttribute('value') || '';
+        if (text) elements.push({kind: 'button', text: text});
+    }
+    for (const el of first(selectors.link)) {
+        const text = (el.textContent || '').trim();
+        if (text) elements.push({kind: 'link', text: text});
+    }
+    for (const el of first(selectors.input)) {
+        elements.push({
+            kind: 'input',
+            name: el.getAttribute('name'),
+            placeholder: el.getAttribute('placeholder'),
+            type: el.getAttribute('type')
+        });
+    }
+    return elements;
+}
+"""
+
+# Runs in the page: visible links and GET forms with absolute URLs, for
+# BackendPage.navigation_targets. Mirrors backends.fake_backend.targets_of.
+NAVIGATION_TARGETS_JS = r"""
+([limit, textChars]) => {
+    const visible = (el) => el.checkVisibility ? el.checkVisibility()
+        : !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const clean = (s) => (s || '').replace(/\s+/g, ' ').trim();
+    const targets = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+        if (targets.length >= limit) break;
+        if (!visible(a)) continue;
+        const text = clean(a.textContent) || clean(a.getAttribute('aria-label'));
+        targets.push({kind: 'link', text: text.slice(0, textChars), url: a.href});
+    }
+    for (const form of document.forms) {
+        if ((form.getAttribute('method') || 'get').toLowerCase() !== 'get' || !visible(form)) continue;
+        const text = clean(form.getAttribute('aria-label')) || clean(form.innerText || form.textContent);
+        targets.push({kind: 'form', text: text.slice(0, textChars), url: form.action});
+    }
+    return targets;
+}
+"""
+
+# Runs in the page: bytes transferred for the document and its subresources
+TRANSFER_SIZE_JS = "() => performance.getEntries().reduce((total, e) => total + (e.transferSize || 0), 0)"
+
+# Runs in the page: find the best table or group of same-shaped siblings
+# (scored by rows x fields) and turn it into flat records in a single pass.
+# Mirrors backends.fake_backend.extract_records_from.
+EXTRACT_RECORDS_JS = r"""
+([selector, maxRecords, boilerplate, minItems]) => {
+    const scope = selector ? document.querySelector(selector) : document.body;
+    if (!scope) return null;
+    const clean = (s) => (s || '').replace(/\s+/g, ' ').trim();
+    const visible = (el) => !el.checkVisibility || el.checkVisibility();
+    const slug = (s) => s.toLowerCase().replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '');
+    const ownText = (el) => clean(Array.from(el.childNodes)
+        .filter((n) => n.nodeType === Node.TEXT_NODE).map((n) => n.data).join(' '));
+    const keyOf = (el) => {
+        const cls = Array.from(el.classList).map(slug).find(Boolean);
+        if (cls) return cls;
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'a') return 'link';
+        if (tag === 'img') return 'image';
+        return /^h[1-6]$/.test(tag) ? 'title' : tag;
+    };
+    const put = (rec, key, value) => {
+        if (!value) return;
+        let k = key;
+        for (let n = 2; k in rec; n++) k = key + '_' + n;
+        rec[k] = value;
+    };
+    const inBoilerplate = (el) => !selector && el.closest(boilerplate) !== null;
+
+    const itemRecord = (item) => {
+        const rec = {};
+        const walk = (el, inField) => {
+            for (const child of el.children) {
+                if (child.matches('script, style, noscript, template') || !visible(child)) continue;
+                let field = inField;
+                if (!inField && ownText(child)) {
+                    put(rec, keyOf(child), clean(child.textContent));
+                    field = true;
+                }
+                if (child.tagName === 'A' && child.getAttribute('href')) put(rec, keyOf(child) + '_url', child.href);
+                if (child.tagName === 'IMG' && child.getAttribute('src')) put(rec, keyOf(child), child.src);
+                walk(child, field);
+            }
+        };
+        put(rec, 'text', ownText(item));
+        if (item.tagName === 'A' && item.getAttribute('href')) put(rec, 'url', item.href);
+        walk(item, false);
+        return rec;
+    };
+
+    const tableRecords = (table) => {
+        const rows = Array.from(table.rows).filter(visible);
+        if (rows.length < 2) return [];
+        const first = Array.from(rows[0].cells);
+        const hasHeader = table.tHead !== null || first.every((c) => c.tagName === 'TH');
+        const columns = first.map((c, i) => (hasHeader && slug(clean(c.textContent))) || 'column_' + (i + 1));
+        return (hasHeader ? rows.slice(1) : rows).map((row) => {
+            const rec = {};
+            Array.from(row.cells).forEach((cell, i) => {
+                const key = columns[i] || 'column_' + (i + 1);
+                put(rec, key, clean(cell.textContent));
+                const link = cell.querySelector('a[href]');
+                if (link) put(rec, key + '_url', link.href);
+            });
+            return rec;
+        }).filter((rec) => Object.keys(rec).length);
+    };
+
+    let best = null;
+    const consider = (candidate) => {
+        if (!best || candidate.score > best.score) best = candidate;
+    };
+    const tables = scope.tagName === 'TABLE' ? [scope] : Array.from(scope.querySelectorAll('table'));
+    for (const table of tables) {
+        if (!visible(table) || inBoilerplate(table)) continue;
+        const records = tableRecords(table);
+        if (records.length) consider({kind: 'table', records, score: records.length * table.rows[0].cells.length});
+    }
+    for (const parent of [scope, ...scope.querySelectorAll('*')]) {
+        if (parent.children.length < minItems) continue;
+        if (parent.matches('table, thead, tbody, tfoot, tr, select, head') || inBoilerplate(parent) || !visible(parent)) continue;
+        const groups = new Map();
+        for (const child of parent.children) {
+            if (child.matches('script, style, br, hr, option, meta, link') || !visible(child)) continue;
+            const sig = child.tagName + '.' + Array.from(child.classList).sort().join('.');
+            if (!groups.has(sig)) groups.set(sig, []);
+            groups.get(sig).push(child);
+        }
+        for (const items of groups.values()) {
+            if (items.length < minItems) continue;
+            // Score on a sample; only the winner is extracted in full
+            const sample = items.slice(0, minItems).map((item) => Object.keys(itemRecord(item)).length);
+            const fields = sample.reduce((a, b) => a + b, 0) / sample.length;
+            if (fields > 0) consider({kind: 'list', items, score: items.length * Math.min(fields, 10)});
+        }
+    }
+    if (!best) return null;
+
+    const all = best.kind === 'table' ? best.records
+        : best.items.map(itemRecord).filter((rec) => Object.keys(rec).length);
+    const kept = all.slice(0, maxRecords);
+    const columns = [];
+    const seen = new Set();
+    for (const rec of kept) for (const key of Object.keys(rec)) {
+        if (!seen.has(key)) { seen.add(key); columns.push(key); }
+    }
+    const next = document.querySelector('a[rel~="next"][href]') || Array.from(document.querySelectorAll('a[href]'))
+        .find((a) => {
+            const text = clean(a.textContent).toLowerCase();
+            return (text && /^(next( page)?)?\s*[›→>]?$/.test(text)) || /next/i.test(a.getAttribute('aria-label') || '');
+        });
+    return {
+        kind: best.kind,
+        columns,
+        records: kept.map((rec) => Object.fromEntries(columns.map((c) => [c, c in rec ? rec[c] : null]))),
+        total_found: all.length,
+        next_page: next ? next.href : null
+    };
+}
+"""
+
+# Runs in the page: score every visible form control (radio and checkbox
+# groups count as one) against each field description using its name, id,
+# labels, placeholder and type, assign fields to controls greedily by score,
+# then set all values with the native setters and input/change events so
+# framework-bound forms see them. Mirrors backends.fake_backend.fill_form_in.
+FILL_FORM_JS = r"""
+([fields, stopwords, synonyms]) => {
+    const lower = (s) => (s || '').replace(/\s+/g, ' ').trim().toLowerCase();
+    const stop = new Set(stopwords);
+    const words = (s) => lower(s).split(/[^a-z0-9]+/).filter((w) => w && !stop.has(w));
+    const near = (a, b) => a === b || (a.length >= 3 && b.length >= 3 && (a.startsWith(b) || b.startsWith(a)));
+    const hit = (token, list) => list.includes(token) ? 1 : (list.some((w) => near(token, w)) ? 0.5 : 0);
+    const visible = (el) => !el.checkVisibility || el.checkVisibility();
+    const labelOf = (el) => [
+        ...Array.from(el.labels || []).map((l) => l.textContent),
+        el.getAttribute('aria-label'), el.getAttribute('placeholder'), el.getAttribute('title')
+    ].join(' ');
+    const describe = (el) => el.name ? `${el.tagName.toLowerCase()}[name="${el.name}"]`
+        : (el.id ? `#${el.id}` : el.tagName.toLowerCase());
+
+    const candidates = [];
+    const groups = new Map();
+    for (const el of document.querySelectorAll('input, textarea, select')) {
+        const type = el.tagName === 'INPUT' ? (el.getAttribute('type') || 'text').toLowerCase() : el.tagName.toLowerCase();
+        if (['hidden', 'submit', 'button', 'reset', 'image', 'file'].includes(type) || el.disabled || !visible(el)) continue;
+        if ((type === 'radio' || type === 'checkbox') && el.name) {
+            const key = type + ':' + el.name;
+            let group = groups.get(key);
+            if (!group) {
+                const legend = el.closest('fieldset') && el.closest('fieldset').querySelector('legend');
+                group = {type, elements: [], keys: words(el.name), labels: words(legend ? legend.textContent : '')};
+                groups.set(key, group);
+                candidates.push(group);
+            }
+            group.elements.push(el);
+            group.labels.push(...words(labelOf(el)));  // option labels, e.g. 'Extra cheese'
+        } else {
+            candidates.push({type, elements: [el], keys: words(`${el.name} ${el.id}`), labels: words(labelOf(el))});
+        }
+    }
+
+    const score = (description, candidate) => {
+        let total = 0;
+        for (const token of words(description)) {
+            const alternatives = [token, ...(synonyms[token] || [])];
+            total += Math.max(...alternatives.map((t) =>
+                3 * hit(t, candidate.keys) + 2 * hit(t, candidate.labels) + (t === candidate.type ? 2 : 0)));
+        }
+        return total;
+    };
+    const pairs = [];
+    fields.forEach(([description], f) => candidates.forEach((candidate, c) => {
+        const s = score(description, candidate);
+        if (s > 0) pairs.push([s, f, c]);
+    }));
+    pairs.sort((a, b) => b[0] - a[0] || a[1] - b[1] || a[2] - b[2]);
+    const assigned = new Map();
+    const used = new Set();
+    for (const [, f, c] of pairs) {
+        if (!assigned.has(f) && !used.has(c)) { assigned.set(f, c); used.add(c); }
+    }
+
+    const optionScore = (value, texts) => {
+        const v = lower(value);
+        const ts = texts.map(lower).filter(Boolean);
+        return ts.includes(v) ? 2 : (v && ts.some((t) => t.includes(v)) ? 1 : 0);
+    };
+    const setValue = (el, value) => {
+        const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype
+            : (el.tagName === 'SELECT' ? HTMLSelectElement.prototype : HTMLInputElement.prototype);
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    };
+    const setChecked = (el, checked) => { if (el.checked !== checked) el.click(); };
+    const TRUE = ['yes', 'true', 'on', 'checked', '1'];
+    const FALSE = ['no', 'false', 'off', 'unchecked', '0'];
+
+    return fields.map(([description, value], f) => {
+        const result = {field: description, value, status: 'not_found', target: null};
+        if (!assigned.has(f)) return result;
+        const candidate = candidates[assigned.get(f)];
+        const first = candidate.elements[0];
+        result.target = describe(first);
+        const v = lower(String(value));
+        if (candidate.type === 'select') {
+            const options = Array.from(first.options);
+            const scores = options.map((o) => optionScore(value, [o.value, o.textContent]));
+            const best = scores.indexOf(Math.max(...scores));
+            if (best < 0 || scores[best] === 0) { result.status = 'no_matching_option'; return result; }
+            setValue(first, options[best].value);
+        } else if (candidate.type === 'radio') {
+            const scores = candidate.elements.map((el) => optionScore(value, [el.value, labelOf(el)]));
+            const best = scores.indexOf(Math.max(...scores));
+            if (scores[best] === 0) { result.status = 'no_matching_option'; return result; }
+            setChecked(candidate.elements[best], true);
+            result.target = describe(candidate.elements[best]) + `[value="${candidate.elements[best].value}"]`;
+        } else if (candidate.type === 'checkbox') {
+            const boxes = candidate.elements;
+            if (TRUE.includes(v) || FALSE.includes(v)) {
+                const named = boxes.filter((el) => words(labelOf(el) + ' ' + el.value).some((w) => words(description).some((t) => near(t, w))));
+                for (const el of (boxes.length === 1 ? boxes : named)) setChecked(el, TRUE.includes(v));
+                if (boxes.length > 1 && !named.length) { result.status = 'no_matching_option'; return result; }
+            } else {
+                const wanted = String(value).split(',').map((x) => x.trim()).filter(Boolean);
+                const chosen = boxes.filter((el) => wanted.some((w) => optionScore(w, [el.value, labelOf(el)]) > 0));
+                if (!chosen.length) { result.status = 'no_matching_option'; return result; }
+                chosen.forEach((el) => setChecked(el, true));
+            }
+        } else {
+            setValue(first, String(value));
+        }
+        result.status = 'filled';
+        return result;
+    });
+}
+"""
+
+class PlaywrightPage(BackendPage):
+    """BackendPage over a Playwright Page"""
+    
+    def __init__(self, page):
+        self.page = page
+        self.js_dialogs: List[str] = []
+        self._live_handles = 0
+        page.on("dialog", self._on_dialog)
+    
+    async def _on_dialog(self, dialog):
+        # Record alerts/confirms for the next snapshot; dismissing them is what
+        # Playwright does when nobody listens
+        self.js_dialogs.append(f"{dialog.type}: {dialog.message}"[:SNAPSHOT_DIALOG_CHARS])
+        await dialog.dismiss()
+    
+    @property
+    def url(self) -> str:
+        return self.page.url
+    
+    async def goto(self, url: str, timeout_ms: int = 30000) -> None:
+        await self.page.goto(url, wait_until='domcontentloaded', timeout=timeout_ms)
+    
+    async def title(self) -> str:
+        return await self.page.title()
+    
+    async def is_visible(self, selector: str) -> bool:
+        # A locator resolves the element for this one check; no handle outlives it
+        return await self.page.locator(selector).first.is_visible()
+    
+    async def click(self, selector: str, timeout_ms: int = 5000) -> None:
+        await self.page.click(selector, timeout=timeout_ms)
+    
+    async def fill(self, selector: str, text: str) -> None:
+        await self.page.fill(selector, "")  # Clear first
+        await self.page.fill(selector, text)
+    
+    async def text_content(self, selector: Optional[str] = None) -> str:
+        if selector:
+            return await self.page.text_content(selector) or ""
+        return await self.page.inner_text('body')
+    
+    async def main_content(self, offset: int = 0, max_chars: int = 4000,
+                           selector: Optional[str] = None) -> Dict[str, Any]:
+        return await self.page.evaluate(
+            MAIN_CONTENT_JS,
+            [offset, max_chars, selector, CONTENT_BOILERPLATE, sorted(CONTENT_BLOCK_TAGS)]
+        )
+    
+    async def fill_form(self, fields: Dict[str, str]) -> List[Dict[str, Any]]:
+        return await self.page.evaluate(
+            FILL_FORM_JS, [list(fields.items()), FIELD_STOPWORDS, FIELD_SYNONYMS]
+        )
+    
+    async def extract_records(self, selector: Optional[str] = None,
+                              max_records: int = 500) -> Optional[Dict[str, Any]]:
+        return await self.page.evaluate(
+            EXTRACT_RECORDS_JS, [selector, max_records, CONTENT_BOILERPLATE, MIN_REPEATED_ITEMS]
+        )
+    
+    async def navigation_targets(self, limit: int = 200) -> List[Dict[str, Any]]:
+        return await self.page.evaluate(NAVIGATION_TARGETS_JS, [limit, TARGET_TEXT_CHARS])
+    
+    async def transfer_size(self) -> int:
+        return int(await self.page.evaluate(TRANSFER_SIZE_JS))
+    
+    async def snapshot(self) -> Dict[str, Any]:
+        state = await self.page.evaluate(
+            SNAPSHOT_JS,
+            [SNAPSHOT_CONTROLS, SNAPSHOT_DIALOGS, SNAPSHOT_MAX_ELEMENTS, SNAPSHOT_LABEL_CHARS, SNAPSHOT_DIALOG_CHARS]
+        )
+        content = await self.main_content(max_chars=SNAPSHOT_TEXT_CHARS)
+        dialogs, self.js_dialogs = state["dialogs"] + self.js_dialogs, []
+        return {
+            "url": self.page.url,
+            "title": state["title"],
+            "elements": state["elements"],
+            "text": [line for line in content["text"].split("\n") if line],
+            "dialogs": dialogs
+        }
+    
+    async def wait_for_selector(self, selector: str, timeout_ms: int = 5000) -> None:
+        await self.page.wait_for_selector(selector, timeout=timeout_ms)
+    
+    async def describe_elements(self, limit: int = 10) -> List[Dict[str, Any]]:
+        return await self.page.evaluate(DESCRIBE_ELEMENTS_JS, [DESCRIBE_SELECTORS, limit])
+    
+    @asynccontextmanager
+    async def element_handles(self, selector: str):
+        """Element handles for a selector, disposed when the block exits
+        
+        For the rare call that needs handles rather than a locator or an
+        in-page script; handle_count() counts the ones still open.
+        """
+        handles = await self.page.query_selector_all(selector)
+        self._live_handles += len(handles)
+        try:
+            yield handles
+        finally:
+            for handle in handles:
+                try:
+                    await handle.dispose()
+                except Exception:
+                    pass  # the page or its frame is already gone
+            self._live_handles -= len(handles)
+    
+    def handle_count(self) -> int:
+        return self._live_handles
+    
+    async def screenshot(self, path: Optional[str] = None, full_page: bool = False,
+                         selector: Optional[str] = None) -> bytes:
+        if selector:
+            return await self.page.locator(selector).first.screenshot(path=path)
+        return await self.page.screenshot(path=path, full_page=full_page)
+    
+    async def close(self) -> None:
+        await self.page.close()
+
+# Chromium ignores unknown switches, so each launch is tagged with one to find
+# its browser process (and through it the renderer/GPU children) with psutil
+SESSION_MARKER_FLAG = "--browser-automation-session"
+
+def find_marked_process(marker: str):
+    """Return the psutil.Process whose command line carries marker, if any"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    for proc in psutil.process_iter(['cmdline']):
+        cmdline = proc.info.get('cmdline') or []
+        if marker in cmdline:
+            return proc
+    return None
+
+_shared_playwright: Dict[Any, Any] = {}  # event loop -> started Playwright driver
+
+async def get_shared_playwright():
+    """One Playwright driver per event loop, shared by CDP-attached sessions
+    
+    Starting a driver spawns a Node process, so remote sessions reuse one
+    instead of each starting their own.
+    """
+    from playwright.async_api import async_playwright
+    
+    loop = asyncio.get_running_loop()
+    entry = _shared_playwright.get(loop)
+    if entry is None:
+        entry = _shared_playwright[loop] = asyncio.ensure_future(async_playwright().start())
+    try:
+        return await asyncio.shield(entry)
+    except BaseException:
+        if entry.done() and _shared_playwright.get(loop) is entry:
+            del _shared_playwright[loop]
+        raise
+
+async def stop_shared_playwright():
+    """Stop the shared driver for the running event loop"""
+    entry = _shared_playwright.pop(asyncio.get_running_loop(), None)
+    if entry is not None and entry.done() and not entry.exception():
+        await entry.result().stop()
+
+class PlaywrightSession(BackendSession):
+    """BackendSession over a Playwright BrowserContext
+    
+    When playwright is None the browser is owned elsewhere (e.g. a pooled CDP
+    connection) and close() only runs the on_close callback.
+    """
+    
+    def __init__(self, playwright, browser, context,
+                 on_close: Optional[Callable[[], Awaitable[None]]] = None,
+                 process_marker: Optional[str] = None):
+        self.playwright = playwright
+        self.browser = browser
+        self.context = context
+        self._on_close = on_close
+        self._process_marker = process_marker
+        self._root_process = None
+    
+    def process_ids(self) -> List[int]:
+        if not self._process_marker:
+            return []
+        if self._root_process is None or not self._root_process.is_running():
+            self._root_process = find_marked_process(self._process_marker)
+            if self._root_process is None:
+                return []
+        try:
+            children = self._root_process.children(recursive=True)
+        except Exception:
+            return [self._root_process.pid]
+        return [self._root_process.pid] + [child.pid for child in children]
+    
+    async def new_page(self) -> PlaywrightPage:
+        return PlaywrightPage(await self.context.new_page())
+    
+    async def storage_state(self) -> Dict[str, Any]:
+        return await self.context.storage_state()
+    
+    async def close(self) -> None:
+        try:
+            if self.playwright is not None:
+                try:
+                    await self.browser.close()
+                finally:
+                    await self.playwright.stop()
+        finally:
+            if self._on_close:
+                await self._on_close()
+
+class PlaywrightBackend(BrowserBackend):
+    """Local Chromium launched through Playwright
+    
+    How Chromium is launched (headless, viewport, scale factor, switches) comes
+    from a launch profile in config.settings; profile=None follows
+    settings.browser_launch_profile.
+    """
+    
+    name = "playwright"
+    
+    def __init__(self, profile: Optional[str] = None):
+        self.profile = profile
+    
+    async def launch(self, session_id: str, storage_state: Optional[Dict[str, Any]] = None) -> PlaywrightSession:
+        from playwright.async_api import async_playwright
+        from config.settings import get_launch_profile
+        
+        profile = get_launch_profile(self.profile)
+        print(f"🌐 Creating new Chrome browser session: {session_id}"
+              f"{' (headless)' if profile.headless else ''}")
+        marker = f"{SESSION_MARKER_FLAG}={uuid.uuid4().hex}"
+        playwright = await async_playwright().start()
+        try:
+            browser = await playwright.chromium.launch(
+                headless=profile.headless,
+                args=profile.args + [marker]
+            )
+            context = await browser.new_context(
+                viewport={'width': profile.viewport_width, 'height': profile.viewport_height},
+                device_scale_factor=profile.device_scale_factor,
+                user_agent=USER_AGENT,
+                storage_state=storage_state
+            )
+        except BaseException:
+            await playwright.stop()
+            raise
+        
+        return PlaywrightSession(playwright, browser, context, process_marker=marker)
@@ -1,97 +1,31 @@
 import os
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from .settings import settings
+from .settings import get_settings
 
-# For now, we'll create a mock AgentCore config since bedrock-agentcore might not be fully available yet
-class MockBrowserClient:
-    def __init__(self, **kwargs):
-        self.config = kwargs
-    
-    def create_session(self, session_id=None):
-        return MockBrowserSession(session_id)
-
-class MockBrowserSession:
-    def __init__(self, session_id):
-        self.session_id = session_id
-    
-    async def navigate(self, url):
-        print(f"🌐 Mock: Navigating to {url}")
-        return {"title": f"Mock Page Title for {url}", "timestamp": "2024-01-01T00:00:00Z"}
-    
-    async def screenshot(self, full_page=False):
-        print(f"📸 Mock: Taking screenshot (full_page={full_page})")
-        return {"url": "mock_screenshot_url.png", "timestamp": "2024-01-01T00:00:00Z"}
-    
-    async def click(self, selector):
-        print(f"👆 Mock: Clicking element {selector}")
-        return {"success": True}
-    
-    async def fill(self, selector, text):
-        print(f"✏️  Mock: Filling {selector} with text")
-        return {"success": True}
-    
-    async def get_content(self, selector=None):
-        print(f"📄 Mock: Getting content from {selector or 'page'}")
-        return f"Mock content from {selector or 'the page'}"
-    
-    async def wait_for_selector(self, selector, timeout=5000):
-        print(f"⏱️  Mock: Waiting for {selector}")
-        return {"found": True}
-
-class MockMemoryClient:
-    def __init__(self, **kwargs):
-        self.config = kwargs
-        self.memory_store = {}
-    
-    def store(self, session_id, content, metadata=None):
-        key = f"{session_id}_{len(self.memory_store)}"
-        self.memory_store[key] = {
-            "content": content,
-            "metadata": metadata or {},
-            "id": key
-        }
-        print(f"💾 Mock: Stored memory {key}")
-        return {"id": key}
-    
-    def retrieve(self, session_id, query=None, limit=5):
-        print(f"🔍 Mock: Retrieving memories for session {session_id}")
-        return [{"content": "Mock memory content", "metadata": {}}]
+# Browser sessions live in tools.sessions on top of the backends package;
+# memory is served by the local BM25 engine in memory.local_memory.
 
 class AgentCoreConfig:
     """Configuration and management for AgentCore services"""
     
     def __init__(self):
-        self.browser_client: Optional[MockBrowserClient] = None
-        self.memory_client: Optional[MockMemoryClient] = None
+        self.memory_client = None
         self.setup_services()
     
     def setup_services(self) -> None:
         """Initialize AgentCore services based on configuration"""
-        
-        # Initialize Browser Tool if enabled
-        if settings.agentcore_browser_enabled:
-            self.browser_client = MockBrowserClient(
-                session_timeout=3600,
-                viewport_size=(1920, 1080),
-                enable_observability=settings.agentcore_observability_enabled,
-                sandbox_enabled=True
-            )
-            print("✅ Mock Browser client initialized")
+        settings = get_settings()
         
         # Initialize Memory if enabled
         if settings.agentcore_memory_enabled:
-            self.memory_client = MockMemoryClient(
+            from memory.local_memory import LocalMemoryClient
+            self.memory_client = LocalMemoryClient(
                 memory_type="semantic",
                 ttl_seconds=86400,
                 enable_compression=True
             )
-            print("✅ Mock Memory client initialized")
-    
-    def get_browser_session(self, session_id: Optional[str] = None):
-        """Get or create browser session"""
-        if not self.browser_client:
-            raise RuntimeError("Browser client not initialized")
-        return self.browser_client.create_session(session_id=session_id)
+            print("✅ Local memory client initialized")
     
     def store_memory(self, session_id: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         """Store information in AgentCore Memory"""
@@ -103,6 +37,18 @@ class AgentCoreConfig:
             metadata=metadata or {}
         )
     
+    async def queue_memory(self, session_id: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """Store information in memory without waiting for the backend (write-behind)"""
+        if not self.memory_client:
+            raise RuntimeError("Memory client not initialized")
+        from memory.write_behind import get_memory_write_queue
+        await get_memory_write_queue(self.memory_client).put(session_id, content, metadata)
+    
+    async def flush_memory(self, session_id: Optional[str] = None):
+        """Wait until queued memory writes are stored"""
+        from memory.write_behind import flush_memory_writes
+        await flush_memory_writes(session_id)
+    
     def retrieve_memory(self, session_id: str, query: Optional[str] = None, limit: int = 5):
         """Retrieve relevant memories"""
         if not self.memory_client:
@@ -129,5 +75,13 @@ class MockApp:
     def health_check(self, func):
         return func
 
-# Global AgentCore configuration instance
-agentcore_config = AgentCoreConfig()
+@lru_cache(maxsize=None)
+def get_agentcore_config() -> AgentCoreConfig:
+    """Create the global AgentCore configuration on first use"""
+    return AgentCoreConfig()
+
+def __getattr__(name: str):
+    # Backwards compatible lazy access to the old `agentcore_config` global
+    if name == "agentcore_config":
+        return get_agentcore_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,67 @@
+from functools import lru_cache
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, List, Dict
+
+class LaunchProfile(BaseModel):
+    """How the local Chromium is launched for a session"""
+    headless: bool
+    viewport_width: int
+    viewport_height: int
+    device_scale_factor: float = 1.0
+    args: List[str] = []
+
+_COMMON_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+]
+
+LAUNCH_PROFILES: Dict[str, LaunchProfile] = {
+    # Visible, maximised window for watching the agent work on a desktop
+    "interactive": LaunchProfile(
+        headless=False,
+        viewport_width=1920,
+        viewport_height=1080,
+        args=_COMMON_ARGS + ['--start-maximized'],
+    ),
+    # Headless workers: small viewport, no GPU/compositing extras, renderers
+    # shared per site and capped, background services off, smaller V8 heap.
+    # Site isolation is relaxed to save processes - only use on trusted tasks.
+    "headless-lean": LaunchProfile(
+        headless=True,
+        viewport_width=1280,
+        viewport_height=720,
+        args=_COMMON_ARGS + [
+            '--disable-gpu',
+            '--disable-accelerated-2d-canvas',
+            '--disable-gpu-compositing',
+            '--disable-dev-shm-usage',
+            '--process-per-site',
+            '--renderer-process-limit=2',
+            '--disable-site-isolation-trials',
+            '--disable-features=Translate,MediaRouter,OptimizationHints,BackForwardCache,AudioServiceOutOfProcess',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--disable-default-apps',
+            '--disable-sync',
+            '--no-first-run',
+            '--mute-audio',
+            '--enable-low-end-device-mode',
+            '--js-flags=--max-old-space-size=256',
+        ],
+    ),
+    # Headless but rendering like a desktop browser (screenshots for vision models)
+    "headless-fidelity": LaunchProfile(
+        headless=True,
+        viewport_width=1920,
+        viewport_height=1080,
+        args=_COMMON_ARGS + [
+            '--disable-dev-shm-usage',
+            '--force-color-profile=srgb',
+            '--hide-scrollbars',
+        ],
+    ),
+}
 
 class Settings(BaseSettings):
     # AWS Configuration
@@ -13,6 +75,84 @@ class Settings(BaseSettings):
     agentcore_memory_enabled: bool = True
     agentcore_observability_enabled: bool = True
     
+    # Write-behind memory writes: batched per session, flushed by size or age
+    memory_write_batch_size: int = 32
+    memory_write_flush_interval_seconds: float = 0.5
+    memory_write_max_pending: int = 1000  # callers wait once this many writes are queued
+    
+    # Browser backend: "playwright" (local Chromium), "agentcore" (remote, over CDP) or "fake" (in-memory)
+    browser_backend: str = "playwright"
+    agentcore_browser_region: str = "us-west-2"
+    agentcore_browser_regions: Optional[List[str]] = None  # spread sessions across these; defaults to the region above
+    agentcore_warm_sessions_per_region: int = 1
+    agentcore_max_sessions_per_region: int = 10
+    
+    # Local Chromium launch profile: one of LAUNCH_PROFILES
+    browser_launch_profile: str = "interactive"
+    
+    # Session reaper: recycle idle, old or oversized browser sessions
+    session_reaper_enabled: bool = True
+    session_reaper_interval_seconds: float = 30.0
+    session_idle_ttl_seconds: float = 600.0
+    session_max_age_seconds: float = 3600.0
+    session_max_rss_mb: Optional[float] = 2048.0
+    session_max_cpu_percent: Optional[float] = None
+    
+    # Extra tabs a session may have open at once (fan-out tools)
+    max_tabs_per_session: int = 5
+    
+    # Per-domain navigation limits shared by all sessions in the process
+    domain_max_concurrency: int = 4
+    domain_rate_per_second: Optional[float] = 2.0  # None disables rate limiting
+    domain_burst: int = 4
+    domain_limits: Dict[str, Dict[str, float]] = {}  # per-domain overrides, e.g. {"example.com": {"rate_per_second": 0.5}}
+    
+    # Agent task scheduler: concurrent runs and default per-task limits
+    max_concurrent_tasks: int = 4
+    task_max_steps: int = 25  # agent -> tools round trips
+    task_max_wall_seconds: float = 300.0
+    
+    # Adaptive concurrency (AIMD) for the task scheduler: grows the number of
+    # concurrent tasks while the host keeps up, shrinks it under pressure
+    adaptive_concurrency_enabled: bool = False
+    adaptive_concurrency_min: int = 1
+    adaptive_concurrency_max: int = 16
+    adaptive_concurrency_interval_seconds: float = 5.0
+    max_event_loop_lag_seconds: float = 0.1
+    max_host_memory_percent: float = 85.0
+    max_browser_rss_mb: Optional[float] = None  # all sessions together; None disables the check
+    step_latency_slowdown: float = 2.0  # back off when actions get this much slower than baseline
+    
+    # Tool retry/timeout policies and the per-domain circuit breaker
+    tool_policy_overrides: Dict[str, Dict[str, float]] = {}  # e.g. {"navigate_to_url": {"attempts": 5}}
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+    
+    # Token budgets for tool results (see tools/output_budget.py)
+    tool_token_budgets: Dict[str, int] = {}  # per-tool overrides
+    tokenizer_encoding: str = "o200k_base"
+    
+    # Screenshots shown to the model (take_screenshot with view=True)
+    vision_enabled: Optional[bool] = None  # None: decide from model_name
+    vision_image_max_tokens: int = 765
+    vision_image_format: str = "jpeg"  # or "webp"
+    vision_image_quality: int = 70
+    
+    # Speculative prefetch: while the model thinks, load the likeliest next
+    # pages in background tabs so navigate_to_url can adopt them
+    prefetch_enabled: bool = False
+    prefetch_max_pages: int = 2  # warm tabs kept per session
+    prefetch_ttl_seconds: float = 60.0
+    prefetch_max_bytes_per_minute: int = 5_000_000  # per session
+    
+    # Pipelined observations: gather page state right after each action and
+    # fold it into the next model call (see tools/observation.py)
+    observation_pipelining: bool = False
+    observation_screenshot: bool = False  # also attach a small screenshot (vision models only)
+    observation_image_max_tokens: int = 255
+    observation_token_budget: int = 400
+    observation_wait_seconds: float = 2.0
+    
     # Authentication
     oauth_discovery_url: Optional[str] = None
     oauth_client_id: Optional[str] = None
@@ -23,11 +163,20 @@ class Settings(BaseSettings):
     model_name: str = "gpt-4o"
     model_temperature: float = 0.1
     
+    # Pooled HTTP clients shared by every model instance
+    model_http_max_connections: int = 20
+    model_http_max_keepalive: int = 10
+    model_http_timeout_seconds: float = 60.0
+    
     # LangSmith (Optional)
     langchain_api_key: Optional[str] = None
     langchain_tracing_v2: bool = False
     langchain_project: str = "AgentCore-Browser-Agent"
     
+    # Browser storage state profiles (saved logins)
+    storage_state_dir: str = "storage_states"
+    storage_state_ttl_seconds: int = 43200
+    
     # Development
     debug: bool = False
     log_level: str = "INFO"
@@ -36,5 +185,22 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Build the global settings on first use (reads the environment and .env)"""
+    return Settings()
+
+def get_launch_profile(name: Optional[str] = None) -> LaunchProfile:
+    """Launch profile by name, defaulting to settings.browser_launch_profile"""
+    name = name or get_settings().browser_launch_profile
+    try:
+        return LAUNCH_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown launch profile: {name} (choose from {', '.join(LAUNCH_PROFILES)})")
+
+def __getattr__(name: str):
+    # Keep `from config.settings import settings` working without reading
+    # the environment at import time
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,276 @@
+import math
+import re
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
+
+# Local memory engine behind AgentCoreConfig.store_memory/retrieve_memory.
+#
+# Memories are partitioned per session. Each partition keeps an inverted index
+# (term -> NumPy arrays of doc ids and term frequencies) and ranks with BM25:
+# candidates are drawn from the postings of the query's rarer terms, every
+# term's contribution is added with a vectorised lookup (np.searchsorted)
+# and the top k is picked with np.argpartition. Common terms ("navigated",
+# "https") never enumerate their postings, so retrieval cost follows the
+# rare terms' postings rather than the partition size. Doc ids grow
+# monotonically and postings are sorted by id, which makes TTL eviction a
+# prefix cut (np.searchsorted) instead of a scan. Once evicted memories
+# outnumber live ones, the dead prefix is cut out of the postings and the
+# per-doc arrays, so a long-lived partition holds O(live) entries. Content is
+# zlib-compressed at rest when enable_compression is set.
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Contents shorter than this are stored raw - zlib would only grow them
+COMPRESS_MIN_BYTES = 64
+
+# A query term is common, and only looked up for candidates found through
+# rarer terms, when it is in more than this many live memories (and this
+# fraction of them). Below that every posting is scored, so small partitions
+# rank exactly.
+COMMON_MIN_DF = 2048
+COMMON_DF_FRACTION = 0.01
+# Newest postings scored when every query term is common
+COMMON_FALLBACK = 512
+
+# Evicted memories kept in place before a compaction is worth its copying
+COMPACT_MIN_DEAD = 64
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class _Postings:
+    """Growable (doc id, term frequency) arrays for one term"""
+
+    __slots__ = ("ids", "tfs", "size")
+
+    def __init__(self):
+        self.ids = np.empty(4, dtype=np.int64)
+        self.tfs = np.empty(4, dtype=np.float32)
+        self.size = 0
+
+    def append(self, doc_id: int, tf: int):
+        if self.size == len(self.ids):
+            self.ids = np.resize(self.ids, self.size * 2)
+            self.tfs = np.resize(self.tfs, self.size * 2)
+        self.ids[self.size] = doc_id
+        self.tfs[self.size] = tf
+        self.size += 1
+
+    def live(self, first_live_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        start = np.searchsorted(self.ids[:self.size], first_live_id) if first_live_id else 0
+        return self.ids[start:self.size], self.tfs[start:self.size]
+
+    def drop_before(self, first_live_id: int):
+        ids, tfs = self.live(first_live_id)
+        self.ids, self.tfs, self.size = ids.copy(), tfs.copy(), len(ids)
+
+class MemoryPartition:
+    """BM25-indexed memories of one session"""
+
+    def __init__(self, session_id: str, ttl_seconds: Optional[float], compress: bool):
+        self.session_id = session_id
+        self.ttl_seconds = ttl_seconds
+        self.compress = compress
+        self.lock = threading.Lock()
+        self.records: List[Optional[Tuple[Any, Dict[str, Any]]]] = []  # (content, metadata) from id base on
+        self.doc_len = np.empty(16, dtype=np.float32)
+        self.created = np.empty(16, dtype=np.float64)
+        self.postings: Dict[str, _Postings] = {}
+        self.base = 0  # id of records[0], doc_len[0] and created[0]
+        self.first_live = 0  # ids below this have been evicted
+        self.total_len = 0.0
+
+    @property
+    def next_id(self) -> int:
+        return self.base + len(self.records)
+
+    @property
+    def size(self) -> int:
+        return self.next_id - self.first_live
+
+    def _encode(self, content: str):
+        data = content.encode("utf-8")
+        if self.compress and len(data) >= COMPRESS_MIN_BYTES:
+            return zlib.compress(data, 1)
+        return content
+
+    @staticmethod
+    def _decode(stored) -> str:
+        return zlib.decompress(stored).decode("utf-8") if isinstance(stored, bytes) else stored
+
+    def add(self, content: str, metadata: Dict[str, Any], now: float) -> int:
+        doc_id = self.next_id
+        pos = len(self.records)
+        terms = tokenize(content)
+        if pos == len(self.doc_len):
+            self.doc_len = np.resize(self.doc_len, max(16, pos * 2))
+            self.created = np.resize(self.created, max(16, pos * 2))
+        self.doc_len[pos] = len(terms)
+        self.created[pos] = now
+        self.total_len += len(terms)
+        self.records.append((self._encode(content), metadata))
+
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = _Postings()
+            postings.append(doc_id, tf)
+        return doc_id
+
+    def evict_expired(self, now: float) -> int:
+        """Drop memories older than the TTL; returns how many were evicted"""
+        if not self.ttl_seconds or self.first_live >= self.next_id:
+            return 0
+        cutoff = now - self.ttl_seconds
+        start, end = self.first_live - self.base, len(self.records)
+        # created is non-decreasing, so expired memories form a prefix
+        new_start = int(np.searchsorted(self.created[start:end], cutoff, side="left")) + start
+        evicted = new_start - start
+        if not evicted:
+            return 0
+        self.total_len -= float(self.doc_len[start:new_start].sum())
+        for pos in range(start, new_start):
+            self.records[pos] = None
+        self.first_live = self.base + new_start
+
+        # Compacting resets the dead prefix, so it only recurs once the dead
+        # outnumber the live again: each memory is copied O(1) times on average
+        if new_start >= COMPACT_MIN_DEAD and new_start > self.size:
+            self._compact()
+        return evicted
+
+    def _compact(self):
+        """Cut evicted memories out of the postings and the per-doc arrays"""
+        dead = self.first_live - self.base
+        for term in list(self.postings):
+            postings = self.postings[term]
+            postings.drop_before(self.first_live)
+            if postings.size == 0:
+                del self.postings[term]
+        self.records = self.records[dead:]
+        self.doc_len = self.doc_len[dead:].copy()
+        self.created = self.created[dead:].copy()
+        self.base = self.first_live
+
+    def _record(self, doc_id: int, score: Optional[float]) -> Dict[str, Any]:
+        stored, metadata = self.records[doc_id - self.base]
+        result = {
+            "id": f"{self.session_id}:{doc_id}",
+            "content": self._decode(stored),
+            "metadata": metadata,
+            "timestamp": float(self.created[doc_id - self.base])
+        }
+        if score is not None:
+            result["score"] = score
+        return result
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        end = self.next_id
+        start = max(self.first_live, end - limit)
+        return [self._record(doc_id, None) for doc_id in range(end - 1, start - 1, -1)]
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        n_docs = self.size
+        if n_docs == 0:
+            return []
+        avg_len = self.total_len / n_docs if self.total_len else 1.0
+
+        terms = []
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            ids, tfs = postings.live(self.first_live)
+            if len(ids):
+                terms.append((ids, tfs))
+        if not terms:
+            return []
+
+        # Candidates come from the rare terms only; common terms add their
+        # (small) weight through lookups. If every term is common, only the
+        # newest postings of the rarest one compete - newer memories win ties
+        # anyway.
+        common_df = max(COMMON_MIN_DF, COMMON_DF_FRACTION * n_docs)
+        sources = [ids for ids, _ in terms if len(ids) <= common_df]
+        if not sources:
+            sources = [min((ids for ids, _ in terms), key=len)[-COMMON_FALLBACK:]]
+        candidates = sources[0] if len(sources) == 1 else np.unique(np.concatenate(sources))
+
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_len[candidates - self.base] / avg_len)
+        scores = np.zeros(len(candidates), dtype=np.float64)
+        for ids, tfs in terms:
+            df = len(ids)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            at = np.minimum(np.searchsorted(ids, candidates), df - 1)
+            tf = np.where(ids[at] == candidates, tfs[at], 0.0)
+            scores += idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+
+        k = min(limit, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        # Highest score first; newer memories win ties
+        top = top[np.lexsort((-candidates[top], -scores[top]))]
+        return [self._record(int(candidates[i]), float(scores[i])) for i in top]
+
+class LocalMemoryClient:
+    """In-process memory store with per-session BM25 retrieval, TTL and compression"""
+
+    def __init__(self, memory_type: str = "semantic", ttl_seconds: Optional[float] = 86400,
+                 enable_compression: bool = True, **kwargs):
+        self.config = {"memory_type": memory_type, "ttl_seconds": ttl_seconds,
+                       "enable_compression": enable_compression, **kwargs}
+        self.ttl_seconds = ttl_seconds
+        self.enable_compression = enable_compression
+        self.partitions: Dict[str, MemoryPartition] = {}
+        self._lock = threading.Lock()
+
+    def _partition(self, session_id: str, create: bool = True) -> Optional[MemoryPartition]:
+        partition = self.partitions.get(session_id)
+        if partition is None and create:
+            with self._lock:
+                partition = self.partitions.get(session_id)
+                if partition is None:
+                    partition = MemoryPartition(session_id, self.ttl_seconds, self.enable_compression)
+                    self.partitions[session_id] = partition
+        return partition
+
+    def store(self, session_id, content, metadata=None):
+        partition = self._partition(session_id)
+        now = time.time()
+        with partition.lock:
+            partition.evict_expired(now)
+            doc_id = partition.add(content, metadata or {}, now)
+        return {"id": f"{session_id}:{doc_id}"}
+
+    def store_batch(self, session_id, items: List[Tuple[str, Optional[Dict[str, Any]]]]):
+        """Store several (content, metadata) pairs under one lock acquisition"""
+        partition = self._partition(session_id)
+        now = time.time()
+        with partition.lock:
+            partition.evict_expired(now)
+            ids = [partition.add(content, metadata or {}, now) for content, metadata in items]
+        return [{"id": f"{session_id}:{doc_id}"} for doc_id in ids]
+
+    def retrieve(self, session_id, query=None, limit=5):
+        """Top memories for a query by BM25, or the most recent ones without a query"""
+        partition = self._partition(session_id, create=False)
+        if partition is None or limit <= 0:
+            return []
+        with partition.lock:
+            partition.evict_expired(time.time())
+            if query and query.strip():
+                return partition.search(query, limit)
+            return partition.recent(limit)
+
+    def clear(self, session_id: str):
+        """Forget every memory of a session"""
+        with self._lock:
+            self.partitions.pop(session_id, None)
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+# Write-behind queue for memory writes issued from tools. put() only appends to
+# a per-session buffer, so a tool never waits on the memory backend. Buffers
+# are written with one store_batch() call (in a worker thread) once they reach
+# the batch size, once the oldest entry has waited the flush interval, or when
+# flush() is called at the end of a task. If the backend falls behind and the
+# number of queued writes reaches max_pending, put() waits for a flush to make
+# room instead of letting the queue grow without bound. Each memory client
+# gets its own queue per event loop.
+
+class MemoryWriteQueue:
+    """Batches memory writes per session and stores them in the background"""
+
+    def __init__(self, client: Any, batch_size: int = 32, flush_interval_seconds: float = 0.5,
+                 max_pending: int = 1000):
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.pending = 0
+        self._buffers: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        self._oldest: Dict[str, float] = {}
+        self._flush_locks: Dict[str, asyncio.Lock] = {}
+        self._room = asyncio.Condition()
+        self._flushes: Dict[str, set] = {}  # session -> batches being stored
+        self._timer: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {"queued": 0, "stored": 0, "failed": 0, "batches": 0,
+                                      "backpressure_waits": 0, "store_seconds": 0.0}
+
+    async def put(self, session_id: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """Queue a memory write; only waits when the queue is full"""
+        if self.pending >= self.max_pending:
+            self.stats["backpressure_waits"] += 1
+        # Other writers woken by the same flush may take the room first
+        while self.pending >= self.max_pending:
+            for session_id_to_flush in list(self._oldest):
+                self._spawn_flush(session_id_to_flush)
+            async with self._room:
+                await self._room.wait_for(lambda: self.pending < self.max_pending)
+
+        buffer = self._buffers.setdefault(session_id, [])
+        if not buffer:
+            self._oldest[session_id] = time.monotonic()
+        buffer.append((content, metadata or {}))
+        self.pending += 1
+        self.stats["queued"] += 1
+
+        if len(buffer) >= self.batch_size:
+            self._spawn_flush(session_id)
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_when_due())
+
+    def _spawn_flush(self, session_id: str) -> Optional[asyncio.Task]:
+        # Detach the buffer now so later writes start a new batch
+        batch = self._buffers.pop(session_id, None)
+        self._oldest.pop(session_id, None)
+        if not batch:
+            return None
+        task = asyncio.create_task(self._store(session_id, batch))
+        self._flushes.setdefault(session_id, set()).add(task)
+        task.add_done_callback(lambda _: self._flush_done(session_id, task))
+        return task
+
+    def _flush_done(self, session_id: str, task: asyncio.Task):
+        tasks = self._flushes.get(session_id)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._flushes[session_id]
+
+    async def _flush_when_due(self):
+        while self._buffers:
+            now = time.monotonic()
+            due = [sid for sid, oldest in self._oldest.items()
+                   if now - oldest >= self.flush_interval_seconds]
+            for session_id in due:
+                self._spawn_flush(session_id)
+            next_due = min(self._oldest.values(), default=now) + self.flush_interval_seconds
+            await asyncio.sleep(max(next_due - now, 0.01))
+
+    async def _store(self, session_id: str, batch: List[Tuple[str, Dict[str, Any]]]):
+        # Batches of a session are stored one at a time, in the order they were cut
+        lock = self._flush_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._store_batch, session_id, batch)
+                self.stats["stored"] += len(batch)
+                self.stats["batches"] += 1
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                print(f"⚠️ Failed to store {len(batch)} memories for session {session_id}: {e}")
+            finally:
+                self.stats["store_seconds"] += time.perf_counter() - start
+                self.pending -= len(batch)
+                async with self._room:
+                    self._room.notify_all()
+
+    def _store_batch(self, session_id: str, batch: List[Tuple[str, Dict[str, Any]]]):
+        store_batch = getattr(self.client, "store_batch", None)
+        if store_batch is not None:
+            return store_batch(session_id, batch)
+        return [self.client.store(session_id=session_id, content=content, metadata=metadata)
+                for content, metadata in batch]
+
+    async def flush(self, session_id: Optional[str] = None):
+        """Store everything queued (for one session or all) and wait for it"""
+        for sid in ([session_id] if session_id else list(self._buffers)):
+            self._spawn_flush(sid)
+        # Also waits for batches of those sessions already being stored
+        if session_id:
+            in_flight = list(self._flushes.get(session_id, ()))
+        else:
+            in_flight = [task for tasks in self._flushes.values() for task in tasks]
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def close(self):
+        """Flush everything and stop the background timer"""
+        await self.flush()
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+
+_queues: Dict[Tuple[Any, int], MemoryWriteQueue] = {}  # (event loop, id(client)) -> queue
+
+def get_memory_write_queue(client: Any) -> MemoryWriteQueue:
+    """The write-behind queue of a memory client for the running event loop, configured from settings"""
+    loop = asyncio.get_running_loop()
+    # The queue holds its client, so the id is not reused while the entry lives
+    queue = _queues.get((loop, id(client)))
+    if queue is None:
+        from config.settings import get_settings
+        settings = get_settings()
+        queue = MemoryWriteQueue(
+            client,
+            batch_size=settings.memory_write_batch_size,
+            flush_interval_seconds=settings.memory_write_flush_interval_seconds,
+            max_pending=settings.memory_write_max_pending
+        )
+        # Drop queues of event loops that have finished (e.g. earlier asyncio.run calls)
+        for key in [k for k in _queues if k[0].is_closed()]:
+            del _queues[key]
+        _queues[(loop, id(client))] = queue
+    return queue
+
+async def flush_memory_writes(session_id: Optional[str] = None):
+    """Flush queued memory writes of every client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    queues = [queue for (queue_loop, _), queue in list(_queues.items()) if queue_loop is loop]
+    if queues:
+        await asyncio.gather(*(queue.flush(session_id) for queue in queues))
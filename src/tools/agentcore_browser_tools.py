@@ -1,55 +1,62 @@
-from typing import Optional, Dict, Any
+from typing import Optional
 from langchain_core.tools import tool
-from bedrock_agentcore.tools.browser_client import BrowserClient
+from tools.sessions import session_scope, close_all_sessions
+from tools.navigation_scheduler import navigation_slot
+from tools.resilience import call_with_policy
+from tools.vision import vision_enabled, capture_for_model
+from tools.page_diff import baseline, with_changes
+from tools.prefetch import adopt_prefetched
+from tools.content import read_content_chunk, DEFAULT_CHUNK_CHARS
 import asyncio
 import os
 from datetime import datetime
 
-# Global client management
-_browser_client: Optional[BrowserClient] = None
-_browser_sessions: Dict[str, Any] = {}
-
-def get_browser_client(region: str = "us-west-2") -> BrowserClient:
-    """Get or create browser client"""
-    global _browser_client
-    if _browser_client is None:
-        _browser_client = BrowserClient(region)
-        _browser_client.start()
-    return _browser_client
+# AgentCore tools share the session registry with the other tool modules;
+# sessions they create run on the AgentCore backend (remote browser over CDP).
+BACKEND = "agentcore"
 
 @tool
 async def agentcore_navigate(url: str, session_id: Optional[str] = None) -> str:
     """Navigate to a URL using AgentCore Browser"""
     try:
-        client = get_browser_client()
-        
-        # Use AgentCore browser navigation
-        result = await client.navigate(url, session_id=session_id)
-        
-        return f"✅ Navigated to {url}. Title: {result.get('title', 'Unknown')}"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            async def goto():
+                async with navigation_slot(url, session_id or "default"):
+                    await session['page'].goto(url)
+
+            if not await adopt_prefetched(session, url):
+                await call_with_policy("agentcore_navigate", goto, url=url)
+            title = await session['page'].title()
+            session['current_url'] = url
+
+            return f"✅ Navigated to {url}. Title: {title or 'Unknown'}"
     except Exception as e:
         return f"❌ Navigation failed: {str(e)}"
 
 @tool  
-async def agentcore_screenshot(session_id: Optional[str] = None, full_page: bool = False) -> str:
-    """Take screenshot using AgentCore Browser"""
+async def agentcore_screenshot(session_id: Optional[str] = None, full_page: bool = False, view: bool = False,
+                               selector: Optional[str] = None) -> str:
+    """Take screenshot using AgentCore Browser. Set view=True to look at it yourself (downscaled); selector limits it to one element"""
     try:
-        client = get_browser_client()
-        
-        # Create screenshots directory
-        os.makedirs("screenshots", exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshots/agentcore_{session_id or 'default'}_{timestamp}.png"
-        
-        # Take screenshot via AgentCore
-        result = await client.screenshot(
-            session_id=session_id,
-            full_page=full_page,
-            output_path=filename
-        )
-        
-        return f"📸 Screenshot saved: {filename}"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            if view and vision_enabled():
+                return await call_with_policy("agentcore_screenshot",
+                                              lambda: capture_for_model(page, session_id or "default", selector, full_page),
+                                              url=page.url)
+
+            # Create screenshots directory
+            os.makedirs("screenshots", exist_ok=True)
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"screenshots/agentcore_{session_id or 'default'}_{timestamp}.png"
+
+            await call_with_policy("agentcore_screenshot",
+                                   lambda: page.screenshot(path=filename, full_page=full_page, selector=selector),
+                                   url=page.url)
+
+            note = " (the configured model cannot view images)" if view else ""
+            return f"📸 Screenshot saved: {filename}{note}"
     except Exception as e:
         return f"❌ Screenshot failed: {str(e)}"
 
@@ -57,11 +64,12 @@ async def agentcore_screenshot(session_id: Optional[str] = None, full_page: bool
 async def agentcore_click(selector: str, session_id: Optional[str] = None) -> str:
     """Click element using AgentCore Browser"""
     try:
-        client = get_browser_client()
-        
-        result = await client.click(selector, session_id=session_id)
-        
-        return f"👆 Clicked: {selector}"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            before = await baseline(session)
+            await call_with_policy("agentcore_click", lambda: page.click(selector), url=page.url)
+
+            return await with_changes(session, before, f"👆 Clicked: {selector}")
     except Exception as e:
         return f"❌ Click failed: {str(e)}"
 
@@ -69,33 +77,28 @@ async def agentcore_click(selector: str, session_id: Optional[str] = None) -> st
 async def agentcore_fill(selector: str, text: str, session_id: Optional[str] = None) -> str:
     """Fill input using AgentCore Browser"""
     try:
-        client = get_browser_client()
-        
-        result = await client.fill(selector, text, session_id=session_id)
-        
-        return f"✏️ Filled {selector} with text"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            before = await baseline(session)
+            await call_with_policy("agentcore_fill", lambda: page.fill(selector, text), url=page.url)
+
+            return await with_changes(session, before, f"✏️ Filled {selector} with text")
     except Exception as e:
         return f"❌ Fill failed: {str(e)}"
 
 @tool
-async def agentcore_get_content(selector: Optional[str] = None, session_id: Optional[str] = None) -> str:
-    """Get page content using AgentCore Browser"""
+async def agentcore_get_content(selector: Optional[str] = None, session_id: Optional[str] = None,
+                                cursor: int = 0, max_chars: int = DEFAULT_CHUNK_CHARS) -> str:
+    """Get main page content using AgentCore Browser, one chunk at a time (pass cursor to continue)"""
     try:
-        client = get_browser_client()
-        
-        result = await client.get_text(selector=selector, session_id=session_id)
-        content = result.get('text', '')
-        
-        # Truncate for display
-        truncated = content[:500] + "..." if len(content) > 500 else content
-        
-        return f"📄 Content: {truncated}"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            return await call_with_policy("agentcore_get_content",
+                                          lambda: read_content_chunk(page, cursor, max_chars, selector),
+                                          url=page.url)
     except Exception as e:
         return f"❌ Get content failed: {str(e)}"
 
-def cleanup_browser_client():
-    """Clean up the browser client"""
-    global _browser_client
-    if _browser_client:
-        _browser_client.stop()
-        _browser_client = None
+async def cleanup_browser_sessions():
+    """Close all browser sessions, including remote AgentCore browsers"""
+    await close_all_sessions()
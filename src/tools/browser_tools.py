@@ -1,39 +1,76 @@
-from typing import Optional
+from typing import Optional, List
 from langchain_core.tools import tool
-from config.agentcore_config import agentcore_config
+from config.agentcore_config import get_agentcore_config
+from tools.sessions import session_scope
+from tools.navigation_scheduler import navigation_slot
+from tools.resilience import call_with_policy
+from tools.vision import vision_enabled, capture_for_model
+from tools.page_diff import baseline, with_changes
+from tools.prefetch import adopt_prefetched
+from tools.content import read_content_chunk, DEFAULT_CHUNK_CHARS
+from tools.extraction import extract_structured_data_from
+from tools.fanout import visit_pages
 import asyncio
+import os
+from datetime import datetime
+
+# These tools run on the in-memory fake backend unless a session is configured
+# otherwise with tools.sessions.configure_session(..., backend=...).
+BACKEND = "fake"
 
 @tool
 async def navigate_to_url(url: str, session_id: Optional[str] = None) -> str:
     """Navigate browser to a specific URL"""
     try:
-        session = agentcore_config.get_browser_session(session_id)
-        result = await session.navigate(url)
-        
-        # Store navigation in memory
+        agentcore_config = get_agentcore_config()
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            async def goto():
+                async with navigation_slot(url, session_id or "default"):
+                    await session['page'].goto(url)
+
+            if not await adopt_prefetched(session, url):
+                await call_with_policy("navigate_to_url", goto, url=url)
+            title = await session['page'].title()
+            session['current_url'] = url
+
+        # Queue the navigation for memory; it is stored in the background
         if agentcore_config.memory_client:
-            agentcore_config.store_memory(
+            await agentcore_config.queue_memory(
                 session_id=session_id or "default",
                 content=f"Navigated to {url}",
                 metadata={
                     "action": "navigate", 
                     "url": url,
-                    "timestamp": result.get("timestamp")
+                    "timestamp": datetime.now().isoformat()
                 }
             )
-        
-        return f"✅ Successfully navigated to {url}. Page title: {result.get('title', 'Unknown')}"
+
+        return f"✅ Successfully navigated to {url}. Page title: {title or 'Unknown'}"
     except Exception as e:
         return f"❌ Error navigating to {url}: {str(e)}"
 
 @tool
-async def take_screenshot(session_id: Optional[str] = None, full_page: bool = False) -> str:
-    """Take a screenshot of current page"""
+async def take_screenshot(session_id: Optional[str] = None, full_page: bool = False, view: bool = False,
+                          selector: Optional[str] = None) -> str:
+    """Take a screenshot of current page. Set view=True to look at it yourself (downscaled); selector limits it to one element"""
     try:
-        session = agentcore_config.get_browser_session(session_id)
-        screenshot = await session.screenshot(full_page=full_page)
-        
-        return f"📸 Screenshot captured successfully. Image URL: {screenshot.get('url')}"
+        session_id = session_id or "default"
+        async with session_scope(session_id, backend=BACKEND) as session:
+            page = session['page']
+            if view and vision_enabled():
+                return await call_with_policy("take_screenshot",
+                                              lambda: capture_for_model(page, session_id, selector, full_page),
+                                              url=page.url)
+
+            os.makedirs("screenshots", exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"screenshots/screenshot_{session_id}_{timestamp}.png"
+            await call_with_policy("take_screenshot",
+                                   lambda: page.screenshot(path=filename, full_page=full_page, selector=selector),
+                                   url=page.url)
+
+            note = " (the configured model cannot view images)" if view else ""
+            return f"📸 Screenshot captured successfully. Image URL: {filename}{note}"
     except Exception as e:
         return f"❌ Error taking screenshot: {str(e)}"
 
@@ -41,10 +78,12 @@ async def take_screenshot(session_id: Optional[str] = None, full_page: bool = Fa
 async def click_element(selector: str, session_id: Optional[str] = None) -> str:
     """Click on an element using CSS selector"""
     try:
-        session = agentcore_config.get_browser_session(session_id)
-        result = await session.click(selector)
-        
-        return f"👆 Successfully clicked element: {selector}"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            before = await baseline(session)
+            await call_with_policy("click_element", lambda: page.click(selector), url=page.url)
+
+            return await with_changes(session, before, f"👆 Successfully clicked element: {selector}")
     except Exception as e:
         return f"❌ Error clicking element {selector}: {str(e)}"
 
@@ -52,34 +91,68 @@ async def click_element(selector: str, session_id: Optional[str] = None) -> str:
 async def fill_input(selector: str, text: str, session_id: Optional[str] = None) -> str:
     """Fill an input field with text"""
     try:
-        session = agentcore_config.get_browser_session(session_id)
-        result = await session.fill(selector, text)
-        
-        return f"✏️ Successfully filled input {selector} with provided text"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            before = await baseline(session)
+            await call_with_policy("fill_input", lambda: page.fill(selector, text), url=page.url)
+
+            return await with_changes(session, before, f"✏️ Successfully filled input {selector} with provided text")
     except Exception as e:
         return f"❌ Error filling input {selector}: {str(e)}"
 
 @tool
-async def get_page_content(session_id: Optional[str] = None, selector: Optional[str] = None) -> str:
-    """Get text content from page or specific element"""
+async def get_page_content(session_id: Optional[str] = None, selector: Optional[str] = None,
+                           cursor: int = 0, max_chars: int = DEFAULT_CHUNK_CHARS) -> str:
+    """Get the main text content of the page (or of a specific element) in chunks
+
+    Navigation, headers, footers and hidden elements are left out. Long content
+    is returned one chunk at a time; pass the cursor from the previous result
+    to read the next chunk.
+    """
     try:
-        session = agentcore_config.get_browser_session(session_id)
-        content = await session.get_content(selector=selector)
-        
-        # Truncate content for response
-        truncated_content = content[:500] + "..." if len(content) > 500 else content
-        
-        return f"📄 Page content retrieved: {truncated_content}"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            return await call_with_policy("get_page_content",
+                                          lambda: read_content_chunk(page, cursor, max_chars, selector),
+                                          url=page.url)
     except Exception as e:
         return f"❌ Error getting page content: {str(e)}"
 
+@tool
+async def extract_structured_data(selector: Optional[str] = None, max_pages: int = 1, max_records: int = 500,
+                                  session_id: Optional[str] = None) -> str:
+    """Extract a table or repeated list on the page (products, search results, rows) into records in one call
+
+    Follows "next" pagination links for up to max_pages pages and saves all
+    records as JSONL; returns the columns, a few sample records and the file path.
+    Use selector to restrict extraction to part of the page.
+    """
+    try:
+        session_id = session_id or "default"
+        async with session_scope(session_id, backend=BACKEND) as session:
+            return await extract_structured_data_from(session, session_id, selector, max_pages, max_records)
+    except Exception as e:
+        return f"❌ Error extracting structured data: {str(e)}"
+
+@tool
+async def visit_pages_in_parallel(urls: List[str], extract: str = "content", session_id: Optional[str] = None) -> str:
+    """Open several URLs at once in parallel tabs and return a consolidated summary of each. extract is "content" (main text of each page), "records" (tables/lists on each page) or "title". Use this instead of navigating to many URLs one by one."""
+    try:
+        session_id = session_id or "default"
+        async with session_scope(session_id, backend=BACKEND) as session:
+            return await visit_pages(session, urls, extract, session_id)
+    except Exception as e:
+        return f"❌ Error visiting pages: {str(e)}"
+
 @tool
 async def wait_for_element(selector: str, timeout: int = 5000, session_id: Optional[str] = None) -> str:
     """Wait for an element to appear on the page"""
     try:
-        session = agentcore_config.get_browser_session(session_id)
-        result = await session.wait_for_selector(selector, timeout=timeout)
-        
-        return f"⏱️ Element {selector} appeared on page"
+        async with session_scope(session_id or "default", backend=BACKEND) as session:
+            page = session['page']
+            await call_with_policy("wait_for_element", lambda: page.wait_for_selector(selector, timeout_ms=timeout),
+                                   url=page.url)
+
+            return f"⏱️ Element {selector} appeared on page"
     except Exception as e:
         return f"❌ Element {selector} did not appear within {timeout}ms: {str(e)}"
@@ -0,0 +1,169 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+from tools.sessions import session_registry
+
+# AIMD controller for how many agent tasks run at once. Every interval it
+# samples event-loop lag, host memory, the RSS of every session's browser
+# process tree and the median duration of recent tool actions. If any of them
+# is over budget the limit is cut multiplicatively; otherwise, if tasks are
+# waiting for a slot, it grows by one. Each running task holds a browser
+# session, so this also bounds the number of active sessions. Limit changes
+# are printed and kept in decisions.
+
+LAG_PROBE_SECONDS = 0.05
+DECREASE_FACTOR = 0.7
+# Per-interval upward drift of the latency baseline, so it can recover after
+# the workload changes
+BASELINE_DRIFT = 1.05
+DECISION_HISTORY = 100
+
+class ConcurrencyController:
+    """Raise or lower a TaskScheduler's max_concurrent from host and browser saturation"""
+
+    def __init__(self, scheduler, registry=None, min_limit: int = 1, max_limit: int = 16,
+                 interval_seconds: float = 5.0, max_loop_lag_seconds: float = 0.1,
+                 max_host_memory_percent: float = 85.0, max_browser_rss_mb: Optional[float] = None,
+                 latency_slowdown: float = 2.0):
+        self.scheduler = scheduler
+        self.registry = registry or session_registry
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.interval_seconds = interval_seconds
+        self.max_loop_lag_seconds = max_loop_lag_seconds
+        self.max_host_memory_percent = max_host_memory_percent
+        self.max_browser_rss_mb = max_browser_rss_mb
+        self.latency_slowdown = latency_slowdown
+        self.limit = min(max(scheduler.max_concurrent, min_limit), max_limit)
+        self.baseline_latency: Optional[float] = None
+        self.decisions = deque(maxlen=DECISION_HISTORY)
+        self.stats: Dict[str, int] = {"samples": 0, "increases": 0, "decreases": 0}
+        self._max_lag = 0.0
+        self._tasks: List[asyncio.Task] = []
+        self._psutil = None
+        self._psutil_checked = False
+        scheduler.set_max_concurrent(self.limit)
+
+    @classmethod
+    def from_settings(cls, scheduler) -> "ConcurrencyController":
+        from config.settings import get_settings
+        settings = get_settings()
+        return cls(
+            scheduler,
+            min_limit=settings.adaptive_concurrency_min,
+            max_limit=settings.adaptive_concurrency_max,
+            interval_seconds=settings.adaptive_concurrency_interval_seconds,
+            max_loop_lag_seconds=settings.max_event_loop_lag_seconds,
+            max_host_memory_percent=settings.max_host_memory_percent,
+            max_browser_rss_mb=settings.max_browser_rss_mb,
+            latency_slowdown=settings.step_latency_slowdown
+        )
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        if not self.running:
+            self._tasks = [asyncio.create_task(self._probe_lag()), asyncio.create_task(self._run())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _probe_lag(self):
+        """Track how late short sleeps wake up; a busy loop wakes them late"""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(LAG_PROBE_SECONDS)
+            self._max_lag = max(self._max_lag, time.monotonic() - start - LAG_PROBE_SECONDS)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                self.step()
+            except Exception as e:
+                print(f"⚠️ Concurrency controller error: {e}")
+
+    def _get_psutil(self):
+        if not self._psutil_checked:
+            self._psutil_checked = True
+            try:
+                import psutil
+                self._psutil = psutil
+            except ImportError:
+                print("⚠️ psutil not installed - host memory and browser RSS are not monitored")
+        return self._psutil
+
+    def sample(self) -> Dict[str, Any]:
+        """Current saturation signals (None where a signal is unavailable)"""
+        psutil = self._get_psutil()
+        host_memory_percent = browser_rss_mb = None
+        if psutil is not None:
+            host_memory_percent = psutil.virtual_memory().percent
+            rss = 0
+            for entry in self.registry.entries():
+                for pid in entry.session['browser'].process_ids():
+                    try:
+                        rss += psutil.Process(pid).memory_info().rss
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        pass
+            browser_rss_mb = rss / 1024 / 1024
+
+        latencies = list(self.registry.step_latencies)
+        self.registry.step_latencies.clear()
+        lag, self._max_lag = self._max_lag, 0.0
+
+        return {
+            "loop_lag_seconds": lag,
+            "host_memory_percent": host_memory_percent,
+            "browser_rss_mb": browser_rss_mb,
+            "step_latency_seconds": statistics.median(latencies) if latencies else None,
+            "running": len(self.scheduler.running),
+            "queued": self.scheduler.queued
+        }
+
+    def decide(self, sample: Dict[str, Any]) -> Tuple[int, str]:
+        """New limit and the reason for it, from one sample"""
+        pressure = []
+        if sample["loop_lag_seconds"] > self.max_loop_lag_seconds:
+            pressure.append(f"event loop lag {sample['loop_lag_seconds']:.2f}s > {self.max_loop_lag_seconds:.2f}s")
+        if sample["host_memory_percent"] is not None and sample["host_memory_percent"] > self.max_host_memory_percent:
+            pressure.append(f"host memory {sample['host_memory_percent']:.0f}% > {self.max_host_memory_percent:.0f}%")
+        if (self.max_browser_rss_mb and sample["browser_rss_mb"] is not None
+                and sample["browser_rss_mb"] > self.max_browser_rss_mb):
+            pressure.append(f"browser RSS {sample['browser_rss_mb']:.0f}MB > {self.max_browser_rss_mb:.0f}MB")
+
+        latency = sample["step_latency_seconds"]
+        if latency is not None:
+            if self.baseline_latency is not None and latency > self.baseline_latency * self.latency_slowdown:
+                pressure.append(f"step latency {latency:.2f}s > {self.latency_slowdown:g}x "
+                                f"baseline {self.baseline_latency:.2f}s")
+            drifted = self.baseline_latency * BASELINE_DRIFT if self.baseline_latency is not None else latency
+            self.baseline_latency = min(latency, drifted)
+
+        if pressure:
+            return max(self.min_limit, int(self.limit * DECREASE_FACTOR)), "; ".join(pressure)
+        if sample["queued"] and sample["running"] >= self.limit:
+            return min(self.max_limit, self.limit + 1), f"{sample['queued']} tasks waiting, no pressure"
+        return self.limit, "steady"
+
+    def step(self) -> int:
+        """Sample, decide and apply once; returns the limit"""
+        sample = self.sample()
+        self.stats["samples"] += 1
+        new_limit, reason = self.decide(sample)
+        if new_limit != self.limit:
+            arrow = "📈" if new_limit > self.limit else "📉"
+            print(f"{arrow} Task concurrency {self.limit} -> {new_limit} ({reason})")
+            self.stats["increases" if new_limit > self.limit else "decreases"] += 1
+            self.decisions.append({"time": time.time(), "from": self.limit, "to": new_limit,
+                                   "reason": reason, "sample": sample})
+            self.limit = new_limit
+            self.scheduler.set_max_concurrent(new_limit)
+        return self.limit
@@ -0,0 +1,33 @@
+import re
+from typing import Optional
+from backends.base import BackendPage
+
+# Shared by the content tools of every tool module. Pages return one chunk of
+# main-content text at a time (cut in the browser where the backend can), and
+# the tool tells the model which cursor fetches the next chunk.
+
+DEFAULT_CHUNK_CHARS = 4000
+MAX_CHUNK_CHARS = 20000
+
+CHUNK_HEADER = "📄 Content chars {start}-{end} of {total}:"
+CHUNK_HEADER_RE = re.compile(r"📄 Content chars (\d+)-(\d+) of (\d+):$")
+MORE_CONTENT_FOOTER = "➡️ More content available: call again with cursor={cursor}"
+
+async def read_content_chunk(page: BackendPage, cursor: int = 0, max_chars: int = DEFAULT_CHUNK_CHARS,
+                             selector: Optional[str] = None) -> str:
+    """Format one chunk of the page's main content for the model"""
+    max_chars = max(200, min(max_chars, MAX_CHUNK_CHARS))
+    chunk = await page.main_content(offset=max(cursor, 0), max_chars=max_chars, selector=selector)
+
+    total = chunk["total_chars"]
+    if total == 0:
+        return "📄 No readable content found" + (f" in {selector}" if selector else " on the page")
+
+    start = chunk["offset"]
+    end = chunk["next_offset"] if chunk["next_offset"] is not None else total
+    header = CHUNK_HEADER.format(start=start, end=end, total=total)
+    if chunk["next_offset"] is None:
+        footer = "✅ End of content"
+    else:
+        footer = MORE_CONTENT_FOOTER.format(cursor=chunk["next_offset"])
+    return f"{header}\n{chunk['text']}\n{footer}"
@@ -0,0 +1,107 @@
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from backends.base import BackendPage
+from tools.navigation_scheduler import navigation_slot
+from tools.resilience import call_with_policy
+
+# Shared by the structured extraction tools. Each page is extracted in one
+# in-page pass (BackendPage.extract_records); records are appended to a JSONL
+# file as every page arrives, following "next" links for paginated lists, and
+# only a summary with a few sample rows goes back to the model. Following a
+# link is a navigation like navigate_to_url: it takes a navigation slot and
+# runs under the navigation retry policy and circuit breaker. Lines are flat
+# string-valued records with a stable key order (null where a row lacks a
+# column), so the file loads straight into pandas/pyarrow and converts to Parquet.
+
+EXTRACTIONS_DIR = "extractions"
+SAMPLE_RECORDS = 5
+
+async def extract_pages(page: BackendPage, session_id: str, selector: Optional[str] = None,
+                        max_pages: int = 1, max_records: int = 500,
+                        output_path: Optional[str] = None) -> Dict[str, Any]:
+    """Extract records from the current page and up to max_pages - 1 following pages into JSONL"""
+    if output_path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(EXTRACTIONS_DIR, f"{session_id}_{timestamp}_{uuid.uuid4().hex[:8]}.jsonl")
+
+    columns: List[str] = []
+    samples: List[Dict[str, Any]] = []
+    summary = {"path": None, "kind": None, "pages": 0, "records": 0, "next_page": None, "error": None}
+    visited = set()
+    out = None  # opened with the first records, so a failed extraction leaves no empty file
+
+    try:
+        while summary["pages"] < max_pages and summary["records"] < max_records:
+            visited.add(page.url)
+            result = await page.extract_records(selector, max_records - summary["records"])
+            if not result or not result["records"]:
+                break
+
+            if out is None:
+                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+                out = open(output_path, "w", encoding="utf-8")
+                summary["path"] = output_path
+            new_columns = [c for c in result["columns"] if c not in columns]
+            columns.extend(new_columns)
+            for record in result["records"]:
+                out.write(json.dumps({c: record.get(c) for c in columns}, ensure_ascii=False) + "\n")
+            out.flush()  # each page lands on disk as soon as it is extracted
+
+            samples.extend(result["records"][:SAMPLE_RECORDS - len(samples)])
+            summary["kind"] = summary["kind"] or result["kind"]
+            summary["pages"] += 1
+            summary["records"] += len(result["records"])
+            summary["next_page"] = result["next_page"]
+
+            next_page = result["next_page"]
+            if not next_page or next_page in visited:
+                summary["next_page"] = None
+                break
+            if summary["pages"] < max_pages and summary["records"] < max_records:
+                async def goto():
+                    async with navigation_slot(next_page, session_id):
+                        await page.goto(next_page)
+
+                try:
+                    await call_with_policy("extract_next_page", goto, url=next_page)
+                except Exception as e:
+                    # Keep what was extracted; next_page says where to pick up
+                    summary["error"] = f"{type(e).__name__}: {e}"
+                    break
+    finally:
+        if out is not None:
+            out.close()
+
+    summary["columns"] = columns
+    summary["samples"] = samples
+    return summary
+
+async def extract_structured_data_from(session: Dict[str, Any], session_id: str, selector: Optional[str] = None,
+                                      max_pages: int = 1, max_records: int = 500) -> str:
+    """Body of the extract_structured_data tools: extract from the session's page and summarise"""
+    page = session['page']
+    print(f"📊 Extracting structured data (up to {max_pages} page(s))...")
+    summary = await extract_pages(page, session_id, selector, max_pages, max_records)
+    session['current_url'] = page.url
+    return format_extraction(summary)
+
+def format_extraction(summary: Dict[str, Any]) -> str:
+    """Summary of an extraction run for the model"""
+    if not summary["records"]:
+        return "❌ No table or repeated list found to extract"
+
+    lines = [
+        f"📊 Extracted {summary['records']} records ({summary['kind']}) from {summary['pages']} page(s)",
+        f"🧾 Columns: {', '.join(summary['columns'])}",
+        f"💾 Saved as JSONL: {summary['path']}",
+        "🔎 Sample records:"
+    ]
+    lines.extend(json.dumps(record, ensure_ascii=False) for record in summary["samples"])
+    if summary["error"]:
+        lines.append(f"⚠️ Stopped after page {summary['pages']}: could not load {summary['next_page']} ({summary['error']})")
+    elif summary["next_page"]:
+        lines.append(f"➡️ More pages available, next page: {summary['next_page']}")
+    return "\n".join(lines)
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import time
+from typing import Optional, Dict, Any, List
+from tools.sessions import tab_scope
+from tools.navigation_scheduler import navigation_slot
+
+# Shared by the fan-out tools. Every URL is loaded in its own tab of the
+# session's browser context (tools.sessions.tab_scope, capped per session),
+# so pages load and get extracted concurrently; the session's main page is
+# left where it was. Navigations go through the per-domain scheduler, so a
+# fan-out over one site respects that site's limits. Results come back in the
+# order the URLs were given.
+
+MAX_FANOUT_URLS = 20
+PER_PAGE_CHARS = 1500
+PER_PAGE_RECORDS = 20
+
+async def visit_urls(session: Dict[str, Any], urls: List[str], extract: str = "content",
+                     max_chars: int = PER_PAGE_CHARS, session_id: str = "default") -> List[Dict[str, Any]]:
+    """Load URLs in parallel tabs and extract 'content', 'records' or just the 'title' from each"""
+    async def visit(url: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"url": url}
+        try:
+            async with tab_scope(session) as page:
+                async with navigation_slot(url, session_id):
+                    await page.goto(url)
+                result["title"] = await page.title()
+                if extract == "records":
+                    result["records"] = await page.extract_records(max_records=PER_PAGE_RECORDS)
+                elif extract == "content":
+                    result["content"] = await page.main_content(max_chars=max_chars)
+        except Exception as e:
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    unique = list(dict.fromkeys(urls))[:MAX_FANOUT_URLS]
+    return await asyncio.gather(*(visit(url) for url in unique))
+
+def format_visits(results: List[Dict[str, Any]], skipped: int = 0) -> str:
+    """Consolidated fan-out results for the model"""
+    ok = sum(1 for r in results if "error" not in r)
+    lines = [f"🗂️ Visited {len(results)} pages in parallel ({ok} succeeded)"]
+    for i, result in enumerate(results, 1):
+        if "error" in result:
+            lines.append(f"\n❌ [{i}] {result['url']}: {result['error']}")
+            continue
+        lines.append(f"\n🌐 [{i}] {result['url']} - {result.get('title') or 'Untitled'}")
+        content = result.get("content")
+        if content is not None:
+            lines.append(content["text"] or "(no readable content)")
+            if content["next_offset"] is not None:
+                lines.append(f"... ({content['total_chars']} chars in total)")
+        records = result.get("records", False)
+        if records:
+            lines.append(f"📊 {records['total_found']} records ({records['kind']}), columns: "
+                         f"{', '.join(records['columns'])}")
+            lines.extend(json.dumps(r, ensure_ascii=False) for r in records["records"][:3])
+        elif records is None:
+            lines.append("📊 No table or repeated list found")
+    if skipped:
+        lines.append(f"\n⚠️ {skipped} URLs were skipped (duplicates or over the {MAX_FANOUT_URLS}-URL limit)")
+    return "\n".join(lines)
+
+async def visit_pages(session: Dict[str, Any], urls: List[str], extract: str = "content",
+                      session_id: str = "default") -> str:
+    """Body of the visit_pages_in_parallel tools: fan out over urls and summarise"""
+    print(f"🗂️ Visiting {len(urls)} pages in parallel tabs...")
+    results = await visit_urls(session, urls, extract, session_id=session_id)
+    return format_visits(results, skipped=len(urls) - len(results))
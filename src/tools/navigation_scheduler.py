@@ -0,0 +1,207 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Deque, List
+from urllib.parse import urlparse
+
+# Process-wide scheduler in front of every navigation. Each target domain has a
+# concurrency cap and a token bucket (rate per second with a burst allowance),
+# shared by all sessions. Navigations that cannot start yet wait in per-session
+# queues and are granted round-robin across sessions, so one session queueing
+# many URLs for a domain cannot starve the others. Time spent waiting is
+# recorded per domain.
+
+# Recent waits kept per domain for percentiles
+WAIT_SAMPLES = 256
+
+def domain_of(url: str) -> Optional[str]:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else (host or None)
+
+class DomainState:
+    """Slots, tokens and waiting navigations for one domain"""
+
+    def __init__(self, domain: str, max_concurrency: int, rate_per_second: Optional[float], burst: int):
+        self.domain = domain
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        self.active = 0
+        self.queues: Dict[str, Deque[asyncio.Future]] = {}
+        self.turns: Deque[str] = deque()  # sessions with waiters, in round-robin order
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.granted = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def refill(self):
+        if not self.rate_per_second:
+            self.tokens = float(self.burst)
+            return
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate_per_second)
+        self.refilled_at = now
+
+    def enqueue(self, session_id: str, future: asyncio.Future):
+        queue = self.queues.get(session_id)
+        if queue is None:
+            queue = self.queues[session_id] = deque()
+            self.turns.append(session_id)
+        queue.append(future)
+
+    def next_waiter(self) -> Optional[asyncio.Future]:
+        while self.turns:
+            session_id = self.turns.popleft()
+            queue = self.queues[session_id]
+            while queue and queue[0].done():
+                queue.popleft()  # cancelled while waiting
+            if not queue:
+                del self.queues[session_id]
+                continue
+            future = queue.popleft()
+            if queue:
+                self.turns.append(session_id)  # back of the line
+            else:
+                del self.queues[session_id]
+            return future
+        return None
+
+    def record_wait(self, seconds: float):
+        self.granted += 1
+        self.wait_seconds_total += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        self.waits.append(seconds)
+
+class NavigationScheduler:
+    """Per-domain concurrency caps and token-bucket rate limits across all sessions"""
+
+    def __init__(self, max_concurrency: int = 4, rate_per_second: Optional[float] = 2.0, burst: int = 4,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.domains: Dict[str, DomainState] = {}
+
+    def _state(self, domain: str) -> DomainState:
+        state = self.domains.get(domain)
+        if state is None:
+            limits = self.overrides.get(domain, {})
+            state = DomainState(
+                domain,
+                limits.get("max_concurrency", self.max_concurrency),
+                limits.get("rate_per_second", self.rate_per_second),
+                limits.get("burst", self.burst)
+            )
+            self.domains[domain] = state
+        return state
+
+    def _dispatch(self, state: DomainState):
+        while state.queues and state.active < state.max_concurrency:
+            state.refill()
+            if state.tokens < 1:
+                if state.timer is None:
+                    delay = (1 - state.tokens) / state.rate_per_second
+                    state.timer = asyncio.get_running_loop().call_later(delay, self._on_timer, state)
+                return
+            future = state.next_waiter()
+            if future is None:
+                return
+            state.tokens -= 1
+            state.active += 1
+            future.set_result(None)
+
+    def _on_timer(self, state: DomainState):
+        state.timer = None
+        self._dispatch(state)
+
+    def _release(self, state: DomainState):
+        state.active -= 1
+        self._dispatch(state)
+
+    def has_spare_capacity(self, url: str) -> bool:
+        """Whether a navigation to url could start now and still leave a slot and a token free
+
+        Speculative loads (tools.prefetch) check this so they never delay a
+        navigation the agent actually asked for.
+        """
+        domain = domain_of(url)
+        if domain is None:
+            return False
+        state = self._state(domain)
+        state.refill()
+        return not state.queues and state.active + 1 < state.max_concurrency and state.tokens >= 2
+
+    @asynccontextmanager
+    async def slot(self, url: str, session_id: str = "default"):
+        """Wait for this domain's turn, then hold one of its navigation slots"""
+        domain = domain_of(url)
+        if domain is None:
+            yield 0.0  # about:blank, data: URLs and the like are not throttled
+            return
+
+        state = self._state(domain)
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        state.enqueue(session_id, future)
+        self._dispatch(state)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(state)  # granted just as we were cancelled
+            raise
+
+        waited = time.monotonic() - start
+        state.record_wait(waited)
+        try:
+            yield waited
+        finally:
+            self._release(state)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-domain queue and wait-time metrics"""
+        snapshot = {}
+        for domain, state in self.domains.items():
+            waits: List[float] = sorted(state.waits)
+            snapshot[domain] = {
+                "active": state.active,
+                "waiting": state.waiting,
+                "granted": state.granted,
+                "avg_wait_seconds": state.wait_seconds_total / state.granted if state.granted else 0.0,
+                "p95_wait_seconds": waits[int(len(waits) * 0.95)] if len(waits) > 1 else (waits[0] if waits else 0.0),
+                "max_wait_seconds": state.max_wait_seconds
+            }
+        return snapshot
+
+_schedulers: Dict[Any, NavigationScheduler] = {}  # event loop -> scheduler
+
+def get_navigation_scheduler() -> NavigationScheduler:
+    """The scheduler for the running event loop, configured from settings"""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        from config.settings import get_settings
+        settings = get_settings()
+        scheduler = NavigationScheduler(
+            max_concurrency=settings.domain_max_concurrency,
+            rate_per_second=settings.domain_rate_per_second,
+            burst=settings.domain_burst,
+            overrides=settings.domain_limits
+        )
+        for old_loop in [l for l in _schedulers if l.is_closed()]:
+            del _schedulers[old_loop]
+        _schedulers[loop] = scheduler
+    return scheduler
+
+def navigation_slot(url: str, session_id: str = "default"):
+    """Async context manager that throttles a navigation to url (yields seconds waited)"""
+    return get_navigation_scheduler().slot(url, session_id)
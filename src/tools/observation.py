@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Optional, Dict, Any, List
+
+# Pipelined observations. The graph is agent -> tools -> agent, and the model
+# usually spends its next step asking what the page looks like now. With
+# settings.observation_pipelining, every tool action schedules a standard
+# observation bundle for its session (URL, title, visible controls with their
+# values, open dialogs and, if observation_screenshot is set and the model has
+# vision, a small screenshot). It is gathered as soon as the action releases
+# the page, so it overlaps with the rest of the tool batch and with result
+# budgeting, and the next model call folds the latest bundle into its prompt
+# instead of the model calling get_page_elements for it.
+#
+# Bundles are not stored in the conversation: each model call sees only the
+# observation of the state it is deciding from. Closing a session drops its
+# pending bundle (forget_session).
+
+OBSERVATION_MAX_ELEMENTS = 40
+
+observation_stats = {
+    "scheduled": 0,
+    "gathered": 0,
+    "superseded": 0,  # a newer action restarted the gathering
+    "used": 0,
+    "late": 0,  # not ready within observation_wait_seconds
+    "failed": 0,
+    "gather_seconds": 0.0
+}
+
+_pending: Dict[str, asyncio.Task] = {}  # session_id -> bundle being gathered
+
+def pipelining_enabled() -> bool:
+    from config.settings import get_settings
+    return get_settings().observation_pipelining
+
+async def gather_observation(session_id: str) -> Optional[Dict[str, Any]]:
+    """The standard observation bundle for a live session (None if it is gone)"""
+    from config.settings import get_settings
+    from tools.sessions import session_registry
+    from tools.vision import vision_enabled, prepare_image
+
+    if session_id not in session_registry:
+        return None
+    settings = get_settings()
+    start = time.perf_counter()
+    async with session_registry.scope(session_id, action=False) as session:
+        page = session['page']
+        snapshot = await page.snapshot()
+        session['snapshot'] = snapshot  # later page diffs start from what the model was shown
+        png = await page.screenshot() if settings.observation_screenshot and vision_enabled() else None
+
+    image = None
+    if png is not None:
+        image = await asyncio.to_thread(prepare_image, png, settings.observation_image_max_tokens,
+                                        settings.vision_image_format, settings.vision_image_quality)
+    seconds = time.perf_counter() - start
+    observation_stats["gathered"] += 1
+    observation_stats["gather_seconds"] += seconds
+    return {
+        "session_id": session_id,
+        "url": snapshot["url"],
+        "title": snapshot["title"],
+        "elements": snapshot["elements"],
+        "dialogs": snapshot["dialogs"],
+        "image": image,
+        "seconds": seconds
+    }
+
+def _finished(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        observation_stats["failed"] += 1
+        print(f"⚠️ Could not observe page: {task.exception()}")
+
+def on_session_action(session_id: str):
+    """Called by the session registry after every tool action: (re)start gathering this session's bundle"""
+    if not pipelining_enabled():
+        return
+    loop = asyncio.get_running_loop()
+    previous = _pending.get(session_id)
+    if previous is not None and not previous.done() and previous.get_loop() is loop:
+        previous.cancel()
+        observation_stats["superseded"] += 1
+    task = loop.create_task(gather_observation(session_id))
+    task.add_done_callback(_finished)
+    _pending[session_id] = task
+    observation_stats["scheduled"] += 1
+
+def forget_session(session_id: str):
+    """Drop a closing session's bundle, cancelling it if it is still being gathered"""
+    task = _pending.pop(session_id, None)
+    if task is not None and not task.done():
+        task.cancel()
+
+async def take_observations(session_ids: List[str]) -> List[Dict[str, Any]]:
+    """The bundles gathered since these sessions' last actions, waiting briefly for unfinished ones"""
+    from config.settings import get_settings
+    if not pipelining_enabled():
+        return []
+    loop = asyncio.get_running_loop()
+    bundles = []
+    for session_id in dict.fromkeys(session_ids):
+        task = _pending.pop(session_id, None)
+        if task is None or task.get_loop() is not loop:
+            continue
+        try:
+            bundle = await asyncio.wait_for(task, get_settings().observation_wait_seconds)
+        except asyncio.TimeoutError:
+            observation_stats["late"] += 1
+            continue
+        except Exception:
+            continue  # counted and logged by _finished
+        if bundle is not None:
+            observation_stats["used"] += 1
+            bundles.append(bundle)
+    return bundles
+
+def format_observation(bundle: Dict[str, Any]) -> str:
+    """The bundle as text for the model, within settings.observation_token_budget"""
+    from config.settings import get_settings
+    from tools.output_budget import fit_to_budget
+
+    lines = [f"👁️ Page state after your last actions (automatic observation, not a user message) - "
+             f"session {bundle['session_id']}: {bundle['title'] or 'Untitled'} - {bundle['url']}"]
+    for dialog in bundle["dialogs"]:
+        lines.append(f"💬 Open dialog: {dialog}")
+    elements = bundle["elements"]
+    for label, value in elements[:OBSERVATION_MAX_ELEMENTS]:
+        lines.append(f"{label} = '{value}'" if value not in (None, "") else label)
+    if len(elements) > OBSERVATION_MAX_ELEMENTS:
+        lines.append(f"... {len(elements) - OBSERVATION_MAX_ELEMENTS} more controls")
+    lines.append("(Use get_page_elements or get_page_content only if you need more than this.)")
+    text, _, _ = fit_to_budget("\n".join(lines), get_settings().observation_token_budget)
+    return text
+
+def observation_message_content(bundles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Content blocks folding the bundles (and their screenshots) into the next prompt"""
+    from tools.vision import image_message_content
+    content: List[Dict[str, Any]] = []
+    for bundle in bundles:
+        content.append({"type": "text", "text": format_observation(bundle)})
+        if bundle["image"] is not None:
+            caption = f"Screenshot of {bundle['url']} (viewport)"
+            content.extend(image_message_content([dict(bundle["image"], caption=caption)]))
+    return content
@@ -0,0 +1,198 @@
+import math
+import os
+from collections import deque, OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+
+# Token budgets for tool results. The agent graph's tools node passes every
+# tool result through budget_tool_messages() before it joins the conversation:
+# results over their tool's budget are cut deterministically (the first line,
+# usually a status header, and the last line, usually a cursor or footer, are
+# kept; the middle keeps as many whole lines as fit, and omitted lines are
+# summarised by kind), and error results lose Playwright call logs. A content
+# chunk (tools.content) that is cut gets its header and cursor rewritten to
+# end at the first character left out, so the next call resumes there instead
+# of skipping the cut text. Tokens are
+# counted with tiktoken; if its encoding cannot be loaded (e.g. offline) a
+# 4-characters-per-token estimate is used. token_ledger records the tokens of
+# every tool result and, for every model call, how many prompt tokens came
+# from each tool.
+
+TOOL_TOKEN_BUDGETS: Dict[str, int] = {
+    "get_page_content": 5000,
+    "agentcore_get_content": 5000,
+    "visit_pages_in_parallel": 3000,
+    "extract_structured_data": 1500,
+    "get_page_elements": 600,
+}
+DEFAULT_TOKEN_BUDGET = 800
+ERROR_TOKEN_BUDGET = 150
+MARKER_TOKENS = 40  # room reserved for the omission note
+
+# Where Playwright starts appending call logs and stack details to messages
+ERROR_DETAIL_MARKERS = ("\nCall log:", "\n=====", "\nTraceback", "\n    at ")
+
+CHARS_PER_TOKEN = 4
+LEDGER_PROMPTS_PER_SESSION = 200
+LEDGER_RESULTS = 10000
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding: str):
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding)
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding {encoding} unavailable ({type(e).__name__}) - estimating tokens from length")
+        return None
+
+def _encoder():
+    from config.settings import get_settings
+    return get_encoder(get_settings().tokenizer_encoding)
+
+def count_tokens(text: str) -> int:
+    encoder = _encoder()
+    if encoder is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoder.encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """The longest prefix of text that fits in max_tokens"""
+    encoder = _encoder()
+    if encoder is None:
+        return text[:max(max_tokens, 0) * CHARS_PER_TOKEN]
+    return encoder.decode(encoder.encode(text, disallowed_special=())[:max(max_tokens, 0)])
+
+def get_budget(tool_name: str) -> int:
+    from config.settings import get_settings
+    overrides = get_settings().tool_token_budgets
+    return overrides.get(tool_name, TOOL_TOKEN_BUDGETS.get(tool_name, DEFAULT_TOKEN_BUDGET))
+
+def _line_kind(line: str) -> Optional[str]:
+    head, sep, _ = line.strip().partition(":")
+    return head if sep and 0 < len(head) <= 30 else None
+
+def _omission_note(omitted: List[str], omitted_tokens: int, budget: int) -> str:
+    note = f"✂️ {len(omitted)} lines cut (~{omitted_tokens} tokens) to stay within the {budget}-token budget"
+    kinds: Dict[str, int] = {}
+    for line in omitted:
+        kind = _line_kind(line)
+        if kind:
+            kinds[kind] = kinds.get(kind, 0) + 1
+    if kinds:
+        note += " (" + ", ".join(f"{kind}: {n}" for kind, n in sorted(kinds.items(), key=lambda kv: (-kv[1], kv[0]))) + ")"
+    return note
+
+def strip_error_details(text: str) -> str:
+    """Drop call logs and stack details from an error result, keeping the message"""
+    cut = min((i for i in (text.find(m) for m in ERROR_DETAIL_MARKERS) if i != -1), default=-1)
+    return text[:cut].rstrip() if cut != -1 else text
+
+def fit_to_budget(text: str, budget: int) -> Tuple[str, int, int]:
+    """Cut text to budget tokens; returns (text, tokens before, tokens after)"""
+    original_tokens = count_tokens(text)
+    if text.startswith("❌"):
+        text = strip_error_details(text)
+        budget = min(budget, ERROR_TOKEN_BUDGET)
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        return text, original_tokens, tokens
+
+    lines = text.split("\n")
+    if len(lines) == 1:
+        cut = truncate_tokens(text, budget - MARKER_TOKENS // 2)
+        note = f" ✂️ [~{tokens - count_tokens(cut)} tokens omitted]"
+        result = cut + note
+        return result, original_tokens, count_tokens(result)
+
+    from tools.content import CHUNK_HEADER, CHUNK_HEADER_RE, MORE_CONTENT_FOOTER
+    first = truncate_tokens(lines[0], budget // 2)
+    last = lines[-1] if len(lines) > 2 else None
+    middle = lines[1:-1] if last is not None else lines[1:]
+    chunk = CHUNK_HEADER_RE.match(lines[0]) if last is not None else None
+    if chunk:
+        # Leave room for a cursor footer, even in place of "End of content"
+        last = MORE_CONTENT_FOOTER.format(cursor=chunk.group(3))
+    room = budget - MARKER_TOKENS - count_tokens(first) - (count_tokens(last) + 1 if last is not None else 0)
+
+    kept: List[str] = []
+    used = 0
+    for line in middle:
+        cost = count_tokens(line) + 1
+        if used + cost > room:
+            break
+        kept.append(line)
+        used += cost
+
+    omitted = middle[len(kept):]
+    shown = sum(len(line) + 1 for line in kept)  # chars of the middle kept
+    if not kept and omitted and room > MARKER_TOKENS:
+        # Nothing fits whole: keep the start of the first line
+        kept.append(truncate_tokens(omitted[0], room - 1))
+        shown = len(os.path.commonprefix([kept[0], omitted[0]]))
+    if chunk and omitted:
+        # The chunk's text was stripped, so this can only land a little early
+        start = int(chunk.group(1))
+        first = CHUNK_HEADER.format(start=start, end=start + shown, total=chunk.group(3))
+        last = MORE_CONTENT_FOOTER.format(cursor=start + shown)
+    elif chunk:
+        last = lines[-1]
+    ends = [last] if last is not None else []
+    omitted_tokens = max(0, tokens - count_tokens("\n".join([first] + kept + ends)))
+
+    result = "\n".join([first] + kept + [_omission_note(omitted, omitted_tokens, budget)] + ends)
+    return result, original_tokens, count_tokens(result)
+
+class TokenLedger:
+    """Tokens per tool result and, per model call, prompt tokens by tool"""
+
+    def __init__(self):
+        self.results: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()  # tool_call_id -> (tool, tokens)
+        self.prompts: Dict[str, deque] = {}
+        self.totals: Dict[str, Dict[str, int]] = {}
+
+    def _remember(self, tool_call_id: str, tool_name: str, tokens: int):
+        self.results[tool_call_id] = (tool_name, tokens)
+        if len(self.results) > LEDGER_RESULTS:
+            self.results.popitem(last=False)
+
+    def record_result(self, tool_call_id: str, tool_name: str, tokens: int, original_tokens: int):
+        self._remember(tool_call_id, tool_name, tokens)
+        totals = self.totals.setdefault(tool_name, {"calls": 0, "tokens": 0, "original_tokens": 0, "truncated": 0})
+        totals["calls"] += 1
+        totals["tokens"] += tokens
+        totals["original_tokens"] += original_tokens
+        if tokens < original_tokens:
+            totals["truncated"] += 1
+
+    def record_prompt(self, session_id: str, messages: List[Any]) -> Dict[str, int]:
+        """Prompt tokens contributed by each tool's results to this model call"""
+        by_tool: Dict[str, int] = {}
+        for message in messages:
+            if getattr(message, "type", None) != "tool":
+                continue
+            known = self.results.get(message.tool_call_id)
+            if known is None:
+                known = (message.name or "unknown", count_tokens(str(message.content)))
+                self._remember(message.tool_call_id, *known)
+            tool_name, tokens = known
+            by_tool[tool_name] = by_tool.get(tool_name, 0) + tokens
+        self.prompts.setdefault(session_id, deque(maxlen=LEDGER_PROMPTS_PER_SESSION)).append(by_tool)
+        return by_tool
+
+    def forget(self, session_id: str):
+        self.prompts.pop(session_id, None)
+
+token_ledger = TokenLedger()
+
+def budget_tool_messages(messages: List[Any]) -> List[Any]:
+    """Fit each ToolMessage's content to its tool's budget and record it in the ledger"""
+    for message in messages:
+        if getattr(message, "type", None) != "tool" or not isinstance(message.content, str):
+            continue
+        budget = get_budget(message.name)
+        content, original_tokens, tokens = fit_to_budget(message.content, budget)
+        if content != message.content:
+            print(f"✂️ {message.name} result cut from {original_tokens} to {tokens} tokens")
+            message.content = content
+        token_ledger.record_result(message.tool_call_id, message.name, tokens, original_tokens)
+    return messages
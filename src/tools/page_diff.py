@@ -0,0 +1,118 @@
+from collections import Counter
+from typing import Optional, Dict, Any, List
+
+# Page-state diffs for the acting tools. Each session keeps the snapshot taken
+# after its last action (session['snapshot']); a click or fill compares the
+# page afterwards with it and reports only what changed: URL and title, controls
+# that appeared or went away, changed field values, new and removed text lines,
+# and dialogs. When the action moved to another URL only the new page's size is
+# reported instead of listing everything on it. The model can react to the
+# delta without calling get_page_elements or get_page_content again.
+
+MAX_ITEMS = 8
+MAX_TEXT_LINES = 5
+TEXT_LINE_CHARS = 160
+
+async def baseline(session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The snapshot to diff the next action against (None if the page cannot be snapshotted)"""
+    page = session['page']
+    previous = session.get('snapshot')
+    if previous is not None and previous["url"] == page.url:
+        return previous
+    try:
+        session['snapshot'] = await page.snapshot()
+    except Exception as e:
+        print(f"⚠️ Could not snapshot page: {e}")
+        session['snapshot'] = None
+    return session['snapshot']
+
+async def describe_changes(session: Dict[str, Any], before: Optional[Dict[str, Any]]) -> str:
+    """Snapshot the page after an action and describe how it differs from before"""
+    try:
+        after = await session['page'].snapshot()
+    except Exception as e:
+        print(f"⚠️ Could not snapshot page: {e}")
+        session['snapshot'] = None
+        return ""
+    session['snapshot'] = after
+    if before is None:
+        return ""
+    return format_diff(diff_snapshots(before, after))
+
+async def with_changes(session: Dict[str, Any], before: Optional[Dict[str, Any]], message: str) -> str:
+    """An action's result message followed by the page changes it caused"""
+    changes = await describe_changes(session, before)
+    return f"{message}\n{changes}" if changes else message
+
+def _multiset_changes(before: List[Any], after: List[Any]):
+    old, new = Counter(before), Counter(after)
+    added = [item for item in dict.fromkeys(after) for _ in range((new - old)[item])]
+    removed = [item for item in dict.fromkeys(before) for _ in range((old - new)[item])]
+    return added, removed
+
+def diff_snapshots(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """What changed between two BackendPage.snapshot() results"""
+    added, removed = _multiset_changes([label for label, _ in before["elements"]],
+                                       [label for label, _ in after["elements"]])
+
+    old_values = {label: value for label, value in before["elements"] if value is not None}
+    changed_values = [
+        (label, old_values[label], value) for label, value in after["elements"]
+        if value is not None and label in old_values and old_values[label] != value
+    ]
+
+    new_text, removed_text = _multiset_changes(before["text"], after["text"])
+    return {
+        "url": (before["url"], after["url"]) if before["url"] != after["url"] else None,
+        "title": (before["title"], after["title"]) if before["title"] != after["title"] else None,
+        "added": added,
+        "removed": removed,
+        "values": list(dict.fromkeys(changed_values)),
+        "new_text": new_text,
+        "removed_text": removed_text,
+        "dialogs_opened": [d for d in after["dialogs"] if d not in before["dialogs"]],
+        "dialogs_closed": [d for d in before["dialogs"] if d not in after["dialogs"]],
+        "page_size": (len(after["elements"]), len(after["text"])),
+    }
+
+def _listing(items: List[str], limit: int = MAX_ITEMS) -> str:
+    shown = ", ".join(items[:limit])
+    return shown + (f" (+{len(items) - limit} more)" if len(items) > limit else "")
+
+def _clip(text: str) -> str:
+    return text if len(text) <= TEXT_LINE_CHARS else text[:TEXT_LINE_CHARS - 1] + "…"
+
+def format_diff(diff: Dict[str, Any]) -> str:
+    """Compact description of a page diff for the model"""
+    lines = []
+    if diff["url"]:
+        lines.append(f"🌐 URL: {diff['url'][0]} → {diff['url'][1]}")
+    if diff["title"]:
+        lines.append(f"📰 Title: '{diff['title'][0]}' → '{diff['title'][1]}'")
+    for dialog in diff["dialogs_opened"]:
+        lines.append(f"💬 Dialog opened: {_clip(dialog)}")
+    for dialog in diff["dialogs_closed"]:
+        lines.append(f"💬 Dialog closed: {_clip(dialog)}")
+    if diff["url"]:
+        controls, text_lines = diff["page_size"]
+        lines.append(f"📄 New page: {controls} controls, {text_lines} lines of text "
+                     f"(get_page_elements / get_page_content to inspect)")
+        return "🔄 Page changes:\n" + "\n".join(lines)
+    if diff["values"]:
+        lines.append("✏️ Changed: " + _listing([f"{label} '{_clip(str(old))}' → '{_clip(str(new))}'"
+                                                for label, old, new in diff["values"]]))
+    if diff["added"]:
+        lines.append("➕ New: " + _listing(diff["added"]))
+    if diff["removed"]:
+        lines.append("➖ Gone: " + _listing(diff["removed"]))
+    if diff["new_text"]:
+        lines.append(f"📝 New text ({len(diff['new_text'])} lines):")
+        lines.extend(f"  {_clip(line)}" for line in diff["new_text"][:MAX_TEXT_LINES])
+        if len(diff["new_text"]) > MAX_TEXT_LINES:
+            lines.append(f"  … {len(diff['new_text']) - MAX_TEXT_LINES} more lines (get_page_content for all)")
+    if diff["removed_text"]:
+        lines.append(f"🗑️ {len(diff['removed_text'])} text lines disappeared")
+
+    if not lines:
+        return "🔄 No visible page changes"
+    return "🔄 Page changes:\n" + "\n".join(lines)
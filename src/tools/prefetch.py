@@ -0,0 +1,265 @@
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse, urldefrag
+
+# Speculative prefetch. While the model thinks about its next step the browser
+# sits idle, so after every round of tool calls the agent graph calls
+# schedule_prefetch(). In the background, the current page's links and GET
+# form targets are ranked against the task text and the best few are loaded
+# in background tabs of the same session (same cookies and HTTP cache). When
+# navigate_to_url is then asked for a warm URL, adopt_prefetched() makes the
+# loaded tab the session's page instead of loading it again.
+#
+# Prefetching is off unless settings.prefetch_enabled. It never takes the
+# last navigation slot or token of a domain (tools.navigation_scheduler), only
+# uses free tab slots, skips links that look like they change state (logout,
+# delete, checkout, ...), and stops for a session once its prefetches have
+# transferred settings.prefetch_max_bytes_per_minute (checked before each
+# load, so one page can go over). Tabs whose load failed are closed at the
+# next round; closing the session cancels loads still in flight.
+# prefetch_report() gives the hit rate.
+
+# Link words suggesting that following the link changes something
+STATEFUL_WORDS = {"logout", "signout", "logoff", "delete", "remove", "unsubscribe", "cancel",
+                  "checkout", "purchase", "pay", "payment"}
+STATEFUL_PHRASES = ("log out", "sign out", "log off", "add to cart", "add to basket", "buy now")
+
+# Task words too common to say anything about where to go next
+TASK_STOPWORDS = {"the", "and", "for", "with", "then", "from", "that", "this", "into", "onto", "page",
+                  "click", "open", "find", "visit", "navigate", "website", "site", "www", "http",
+                  "https", "com", "org", "net", "html", "please", "what", "how", "get", "show"}
+
+BANDWIDTH_WINDOW_SECONDS = 60.0
+
+prefetch_stats = {
+    "rounds": 0,
+    "prefetched": 0,
+    "failed": 0,
+    "hits": 0,
+    "misses": 0,
+    "wasted": 0,  # warm tabs thrown away unused
+    "bytes": 0,
+    "skipped_busy": 0,  # no spare tab slot or domain capacity
+    "skipped_bandwidth": 0
+}
+
+_rounds: Dict[str, asyncio.Task] = {}  # session_id -> running prefetch round
+
+def _key(url: str) -> str:
+    return urldefrag(url)[0]
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def task_words(text: str) -> set:
+    return {word for word in _words(text) if len(word) >= 3 and word not in TASK_STOPWORDS}
+
+def looks_stateful(target: Dict[str, Any]) -> bool:
+    """Whether loading the target might log out, delete, buy, ..."""
+    text = " ".join(_words(target["text"]))
+    url = " ".join(_words(urlparse(target["url"]).path + " " + urlparse(target["url"]).query))
+    return bool(STATEFUL_WORDS & set(f"{text} {url}".split())) or \
+        any(phrase in f" {text} " or phrase in f" {url} " for phrase in STATEFUL_PHRASES)
+
+def rank_targets(targets: List[Dict[str, Any]], task_text: str, current_url: str,
+                 limit: int = 2) -> List[str]:
+    """The most likely next URLs: targets whose text or URL shares words with the task"""
+    words = task_words(task_text)
+    current = _key(current_url)
+    scores: Dict[str, int] = {}
+    for target in targets:
+        url = _key(target["url"])
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or url == current or looks_stateful(target):
+            continue
+        score = 2 * len(words & set(_words(target["text"]))) + len(words & set(_words(parsed.path + " " + parsed.query)))
+        if target["kind"] == "form":
+            score += 1  # a GET form on the page is a likely next step
+        if score > 0:
+            scores[url] = max(score, scores.get(url, 0))
+    return sorted(scores, key=lambda url: -scores[url])[:limit]  # stable: page order breaks ties
+
+class WarmTab:
+    """A background tab loading, or holding, one prefetched URL"""
+
+    def __init__(self, url: str, page):
+        self.url = url
+        self.page = page
+        self.task: Optional[asyncio.Task] = None
+        self.started = time.monotonic()
+        self.bytes = 0
+
+    def expired(self, ttl_seconds: float) -> bool:
+        return time.monotonic() - self.started > ttl_seconds
+
+    def failed(self) -> bool:
+        return self.task is not None and self.task.done() and (self.task.cancelled() or not self.task.result())
+
+class PrefetchState:
+    """One session's warm tabs and recent prefetch traffic"""
+
+    def __init__(self):
+        self.tabs: Dict[str, WarmTab] = {}
+        self.transfers: deque = deque()  # (time, bytes)
+
+    def recent_bytes(self) -> int:
+        cutoff = time.monotonic() - BANDWIDTH_WINDOW_SECONDS
+        while self.transfers and self.transfers[0][0] < cutoff:
+            self.transfers.popleft()
+        return sum(size for _, size in self.transfers)
+
+def _state(session: Dict[str, Any]) -> PrefetchState:
+    if session.get('prefetch') is None:
+        session['prefetch'] = PrefetchState()
+    return session['prefetch']
+
+async def _close_tab(session: Dict[str, Any], warm: WarmTab):
+    if warm.task is not None and not warm.task.done():
+        warm.task.cancel()
+    try:
+        await warm.page.close()
+    except Exception:
+        pass  # the session may have been torn down underneath us
+    session['tab_slots'].release()
+
+async def _load(session_id: str, state: PrefetchState, warm: WarmTab) -> bool:
+    from tools.navigation_scheduler import navigation_slot
+    try:
+        async with navigation_slot(warm.url, session_id):
+            await warm.page.goto(warm.url)
+        warm.bytes = await warm.page.transfer_size()
+    except Exception as e:
+        prefetch_stats["failed"] += 1
+        print(f"⚠️ Prefetch of {warm.url} failed: {e}")
+        return False
+    state.transfers.append((time.monotonic(), warm.bytes))
+    prefetch_stats["prefetched"] += 1
+    prefetch_stats["bytes"] += warm.bytes
+    print(f"🔮 Prefetched {warm.url} ({warm.bytes / 1024:.1f} KB)")
+    return True
+
+async def _prefetch_round(session_id: str, task_text: str):
+    from config.settings import get_settings
+    from tools.sessions import session_registry
+    from tools.navigation_scheduler import get_navigation_scheduler
+
+    if session_id not in session_registry:
+        return  # never launch a browser just to prefetch
+    settings = get_settings()
+    scheduler = get_navigation_scheduler()
+    try:
+        async with session_registry.scope(session_id, action=False) as session:
+            page = session['page']
+            targets = await page.navigation_targets()
+            prefetch_stats["rounds"] += 1
+            state = _state(session)
+            wanted = rank_targets(targets, task_text, page.url, settings.prefetch_max_pages)
+
+            # Warm tabs that failed to load, or that earlier pages made likely
+            # but this one does not (or that are too old), go
+            for url, warm in list(state.tabs.items()):
+                if warm.failed():
+                    del state.tabs[url]
+                    await _close_tab(session, warm)
+                elif url not in wanted or warm.expired(settings.prefetch_ttl_seconds):
+                    del state.tabs[url]
+                    prefetch_stats["wasted"] += 1
+                    await _close_tab(session, warm)
+
+        # Load one page at a time, outside the session lock, so the agent's own
+        # actions are not held up and the byte budget is checked between loads
+        for url in wanted:
+            if url in state.tabs:
+                continue
+            if state.recent_bytes() >= settings.prefetch_max_bytes_per_minute:
+                prefetch_stats["skipped_bandwidth"] += 1
+                break
+            if session['tab_slots'].locked() or not scheduler.has_spare_capacity(url):
+                prefetch_stats["skipped_busy"] += 1
+                continue
+            await session['tab_slots'].acquire()
+            try:
+                warm = WarmTab(url, await session['browser'].new_page())
+            except BaseException:
+                session['tab_slots'].release()
+                raise
+            warm.task = asyncio.create_task(_load(session_id, state, warm))
+            state.tabs[url] = warm
+            # Shielded: a newer round cancels this one, not the load a navigation may adopt
+            await asyncio.shield(warm.task)
+    except Exception as e:
+        print(f"⚠️ Prefetch round for {session_id} failed: {e}")
+
+def schedule_prefetch(session_ids: List[str], task_text: str):
+    """Start prefetching likely next pages for these sessions in the background (if enabled)"""
+    from config.settings import get_settings
+    if not get_settings().prefetch_enabled:
+        return
+    loop = asyncio.get_running_loop()
+    for session_id in dict.fromkeys(session_ids):
+        previous = _rounds.get(session_id)
+        if previous is not None and not previous.done() and previous.get_loop() is loop:
+            previous.cancel()  # the page has moved on since that round started
+        task = loop.create_task(_prefetch_round(session_id, task_text))
+        _rounds[session_id] = task
+        task.add_done_callback(lambda t, s=session_id: _rounds.pop(s, None) if _rounds.get(s) is t else None)
+
+def cancel_prefetch(session_id: str, session: Dict[str, Any]):
+    """Stop prefetching for a session that is closing: its round and any loads in flight"""
+    round_task = _rounds.pop(session_id, None)
+    if round_task is not None and not round_task.done():
+        round_task.cancel()
+    state = session.get('prefetch')
+    if state is None:
+        return
+    for warm in state.tabs.values():
+        if warm.task is not None and not warm.task.done():
+            warm.task.cancel()
+    state.tabs.clear()  # their pages close with the browser
+
+async def adopt_prefetched(session: Dict[str, Any], url: str) -> bool:
+    """Make a warm tab for url the session's page; False (a miss) if there is none to use
+
+    Call while holding the session (session_scope). A prefetch still loading
+    is waited for rather than started again.
+    """
+    from config.settings import get_settings
+    settings = get_settings()
+    if not settings.prefetch_enabled:
+        return False
+
+    state = session.get('prefetch')
+    warm = state.tabs.pop(_key(url), None) if state is not None else None
+    if warm is None:
+        prefetch_stats["misses"] += 1
+        return False
+    loaded = await warm.task
+    if not loaded or warm.expired(settings.prefetch_ttl_seconds):
+        prefetch_stats["misses"] += 1
+        if loaded:
+            prefetch_stats["wasted"] += 1
+        await _close_tab(session, warm)
+        return False
+
+    old_page = session['page']
+    session['page'] = warm.page
+    session['snapshot'] = None
+    session['tab_slots'].release()  # the warm tab is now the main page, not an extra tab
+    prefetch_stats["hits"] += 1
+    print(f"⚡ {url} served from a prefetched tab")
+    try:
+        await old_page.close()
+    except Exception:
+        pass
+    return True
+
+def prefetch_report() -> Dict[str, Any]:
+    """Prefetch counters plus hit rate (navigations served warm) and precision (prefetches used)"""
+    navigations = prefetch_stats["hits"] + prefetch_stats["misses"]
+    report: Dict[str, Any] = dict(prefetch_stats)
+    report["hit_rate"] = prefetch_stats["hits"] / navigations if navigations else 0.0
+    report["precision"] = prefetch_stats["hits"] / prefetch_stats["prefetched"] if prefetch_stats["prefetched"] else 0.0
+    return report
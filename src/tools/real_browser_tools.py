@@ -1,72 +1,46 @@
 from typing import Optional, Dict, Any, List
 from langchain_core.tools import tool
-from playwright.async_api import async_playwright, Browser, Page
 import asyncio
 import os
 from datetime import datetime
+from tools.storage_profiles import save_storage_state
+from tools.extraction import extract_structured_data_from
+from tools.fanout import visit_pages
+from tools.navigation_scheduler import navigation_slot
+from tools.resilience import call_with_policy
+from tools.vision import vision_enabled, capture_for_model
+from tools.page_diff import baseline, with_changes
+from tools.prefetch import adopt_prefetched
+from tools.sessions import get_browser_session, session_scope, close_browser_session, configure_session
 
-# Global browser management
-_browser_sessions: Dict[str, Dict[str, Any]] = {}
-
-async def get_browser_session(session_id: str = "default") -> Dict[str, Any]:
-    """Get or create a browser session"""
-    if session_id not in _browser_sessions:
-        print(f"🌐 Creating new Chrome browser session: {session_id}")
-        
-        playwright = await async_playwright().start()
-        browser = await playwright.chromium.launch(
-            headless=False,  # Show the browser
-            args=[
-                '--start-maximized',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-extensions'
-            ]
-        )
-        
-        context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
-        
-        page = await context.new_page()
-        
-        _browser_sessions[session_id] = {
-            'playwright': playwright,
-            'browser': browser,
-            'context': context,
-            'page': page,
-            'current_url': None
-        }
-    
-    return _browser_sessions[session_id]
-
-async def close_browser_session(session_id: str = "default"):
-    """Close a browser session"""
-    if session_id in _browser_sessions:
-        session = _browser_sessions[session_id]
-        await session['browser'].close()
-        await session['playwright'].stop()
-        del _browser_sessions[session_id]
-        print(f"🔴 Closed browser session: {session_id}")
+def use_storage_profile(session_id: str, profile: Optional[str]):
+    """Restore the named storage profile when this session's browser starts"""
+    configure_session(session_id, storage_profile=profile or "")
 
 @tool
 async def navigate_to_url(url: str, session_id: Optional[str] = None) -> str:
     """Navigate browser to a specific URL"""
     try:
         session_id = session_id or "default"
-        session = await get_browser_session(session_id)
-        page = session['page']
-        
-        print(f"🌐 Navigating to: {url}")
-        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
-        
-        # Wait a moment for page to settle
-        await asyncio.sleep(2)
-        
-        title = await page.title()
-        session['current_url'] = url
-        
-        return f"✅ Successfully navigated to {url}. Page title: {title}"
+        async with session_scope(session_id) as session:
+            print(f"🌐 Navigating to: {url}")
+            async def goto():
+                async with navigation_slot(url, session_id) as waited:
+                    if waited >= 1:
+                        print(f"⏳ Waited {waited:.1f}s for a navigation slot")
+                    await session['page'].goto(url, timeout_ms=30000)
+
+            # A prefetched tab has already loaded and settled
+            if not await adopt_prefetched(session, url):
+                await call_with_policy("navigate_to_url", goto, url=url)
+
+                # Wait a moment for page to settle
+                await session['page'].settle(2)
+
+            title = await session['page'].title()
+            session['current_url'] = url
+
+            return f"✅ Successfully navigated to {url}. Page title: {title}"
     except Exception as e:
         return f"❌ Error navigating to {url}: {str(e)}"
 
@@ -75,270 +49,318 @@ async def smart_click(description: str, session_id: Optional[str] = None) -> str
     """Click on an element based on its description. Examples: 'search button', 'login link', 'submit button', 'sign up'"""
     try:
         session_id = session_id or "default"
-        session = await get_browser_session(session_id)
-        page = session['page']
-        
-        print(f"🎯 Looking for element to click: {description}")
-        
-        # Common selectors to try based on description
-        desc_lower = description.lower()
-        selectors_to_try = []
-        
-        if 'button' in desc_lower:
+        async with session_scope(session_id) as session:
+            page = session['page']
+
+            print(f"🎯 Looking for element to click: {description}")
+            before = await baseline(session)
+
+            # Common selectors to try based on description
+            desc_lower = description.lower()
+            selectors_to_try = []
+
+            if 'button' in desc_lower:
+                if 'search' in desc_lower:
+                    selectors_to_try.extend([
+                        'button[type="submit"]',
+                        'input[type="submit"]',
+                        'button:has-text("Search")',
+                        'button:has-text("Go")',
+                        '.search-button',
+                        '#search-button'
+                    ])
+                elif 'submit' in desc_lower:
+                    selectors_to_try.extend([
+                        'button[type="submit"]',
+                        'input[type="submit"]',
+                        'button:has-text("Submit")',
+                        'button:has-text("Send")'
+                    ])
+                elif 'login' in desc_lower or 'sign in' in desc_lower:
+                    selectors_to_try.extend([
+                        'button:has-text("Login")',
+                        'button:has-text("Sign in")',
+                        'input[type="submit"]',
+                        '.login-button'
+                    ])
+                else:
+                    # Generic button search
+                    selectors_to_try.extend([
+                        f'button:has-text("{description}")',
+                        'button[type="submit"]',
+                        'input[type="submit"]'
+                    ])
+
+            elif 'link' in desc_lower:
+                if 'login' in desc_lower or 'sign in' in desc_lower:
+                    selectors_to_try.extend([
+                        'a:has-text("Login")',
+                        'a:has-text("Sign in")',
+                        'a:has-text("Log in")'
+                    ])
+                else:
+                    selectors_to_try.extend([
+                        f'a:has-text("{description}")',
+                        f'a[href*="{desc_lower}"]'
+                    ])
+
+            else:
+                # Try to find any clickable element with the text
+                selectors_to_try.extend([
+                    f'button:has-text("{description}")',
+                    f'a:has-text("{description}")',
+                    f'input[value*="{description}"]',
+                    f'*:has-text("{description}"):visible'
+                ])
+
+            # Try each selector
+            for selector in selectors_to_try:
+                try:
+                    print(f"   Trying selector: {selector}")
+                    # Check if element is visible and clickable
+                    if await page.is_visible(selector):
+                        await page.click(selector)
+                        await page.settle(0.5)
+                        return await with_changes(session, before,
+                                                  f"👆 Successfully clicked: {description} (using selector: {selector})")
+                except Exception as e:
+                    print(f"   Selector {selector} failed: {e}")
+                    continue
+
+            # If no specific selector worked, try a more general approach
+            try:
+                print(f"   Trying general text search for: {description}")
+                await page.click(f'text="{description}"', timeout_ms=5000)
+                return await with_changes(session, before, f"👆 Successfully clicked: {description} (using text search)")
+            except:
+                pass
+
+            return f"❌ Could not find clickable element: {description}"
+
+    except Exception as e:
+        return f"❌ Error clicking {description}: {str(e)}"
+
+@tool
+async def smart_fill(field_description: str, text: str, session_id: Optional[str] = None) -> str:
+    """Fill an input field based on its description. Examples: 'search box', 'email field', 'password', 'username'"""
+    try:
+        session_id = session_id or "default"
+        async with session_scope(session_id) as session:
+            page = session['page']
+
+            print(f"✏️ Looking for field to fill: {field_description} with '{text}'")
+            before = await baseline(session)
+
+            # Common selectors based on field description
+            desc_lower = field_description.lower()
+            selectors_to_try = []
+
             if 'search' in desc_lower:
                 selectors_to_try.extend([
-                    'button[type="submit"]',
-                    'input[type="submit"]',
-                    'button:has-text("Search")',
-                    'button:has-text("Go")',
-                    '.search-button',
-                    '#search-button'
+                    'input[name="q"]',
+                    'input[type="search"]',
+                    'input[placeholder*="search"]',
+                    '#search',
+                    '.search-input',
+                    'textarea[name="q"]'
                 ])
-            elif 'submit' in desc_lower:
+            elif 'email' in desc_lower:
                 selectors_to_try.extend([
-                    'button[type="submit"]',
-                    'input[type="submit"]',
-                    'button:has-text("Submit")',
-                    'button:has-text("Send")'
+                    'input[type="email"]',
+                    'input[name="email"]',
+                    'input[name="custemail"]',
+                    'input[placeholder*="email"]'
                 ])
-            elif 'login' in desc_lower or 'sign in' in desc_lower:
+            elif 'password' in desc_lower:
                 selectors_to_try.extend([
-                    'button:has-text("Login")',
-                    'button:has-text("Sign in")',
-                    'input[type="submit"]',
-                    '.login-button'
+                    'input[type="password"]',
+                    'input[name="password"]',
+                    'input[name="pass"]'
                 ])
-            else:
-                # Generic button search
+            elif 'username' in desc_lower or 'user' in desc_lower:
                 selectors_to_try.extend([
-                    f'button:has-text("{description}")',
-                    'button[type="submit"]',
-                    'input[type="submit"]'
+                    'input[name="username"]',
+                    'input[name="user"]',
+                    'input[name="login"]'
+                ])
+            elif 'name' in desc_lower:
+                selectors_to_try.extend([
+                    'input[name="name"]',
+                    'input[name="custname"]',
+                    'input[name="fullname"]',
+                    'input[placeholder*="name"]'
                 ])
-        
-        elif 'link' in desc_lower:
-            if 'login' in desc_lower or 'sign in' in desc_lower:
+            elif 'phone' in desc_lower or 'tel' in desc_lower:
                 selectors_to_try.extend([
-                    'a:has-text("Login")',
-                    'a:has-text("Sign in")',
-                    'a:has-text("Log in")'
+                    'input[type="tel"]',
+                    'input[name="phone"]',
+                    'input[name="tel"]',
+                    'input[name="custtel"]'
                 ])
             else:
+                # Generic input search
                 selectors_to_try.extend([
-                    f'a:has-text("{description}")',
-                    f'a[href*="{desc_lower}"]'
+                    f'input[placeholder*="{field_description}"]',
+                    f'input[name*="{desc_lower}"]',
+                    'input[type="text"]',
+                    'textarea'
                 ])
-        
-        else:
-            # Try to find any clickable element with the text
-            selectors_to_try.extend([
-                f'button:has-text("{description}")',
-                f'a:has-text("{description}")',
-                f'input[value*="{description}"]',
-                f'*:has-text("{description}"):visible'
-            ])
-        
-        # Try each selector
-        for selector in selectors_to_try:
-            try:
-                print(f"   Trying selector: {selector}")
-                element = await page.query_selector(selector)
-                if element:
-                    # Check if element is visible and clickable
-                    is_visible = await element.is_visible()
-                    if is_visible:
-                        await element.click()
-                        await asyncio.sleep(0.5)
-                        return f"👆 Successfully clicked: {description} (using selector: {selector})"
-            except Exception as e:
-                print(f"   Selector {selector} failed: {e}")
-                continue
-        
-        # If no specific selector worked, try a more general approach
-        try:
-            print(f"   Trying general text search for: {description}")
-            await page.click(f'text="{description}"', timeout=5000)
-            return f"👆 Successfully clicked: {description} (using text search)"
-        except:
-            pass
-        
-        return f"❌ Could not find clickable element: {description}"
-        
+
+            # Try each selector
+            for selector in selectors_to_try:
+                try:
+                    print(f"   Trying selector: {selector}")
+                    if await page.is_visible(selector):
+                        await page.fill(selector, text)
+                        await page.settle(0.5)
+                        return await with_changes(session, before,
+                                                  f"✏️ Successfully filled {field_description} with text (using selector: {selector})")
+                except Exception as e:
+                    print(f"   Selector {selector} failed: {e}")
+                    continue
+
+            return f"❌ Could not find input field: {field_description}"
+
     except Exception as e:
-        return f"❌ Error clicking {description}: {str(e)}"
+        return f"❌ Error filling {field_description}: {str(e)}"
 
 @tool
-async def smart_fill(field_description: str, text: str, session_id: Optional[str] = None) -> str:
-    """Fill an input field based on its description. Examples: 'search box', 'email field', 'password', 'username'"""
+async def smart_fill_form(fields: Dict[str, str], session_id: Optional[str] = None) -> str:
+    """Fill several form fields in one call. fields maps field descriptions to values, e.g. {"customer name": "John Doe", "telephone": "555-1234", "email": "john@example.com", "pizza size": "Medium", "toppings": "Bacon, Cheese", "delivery instructions": "Ring twice"}. Works for text boxes, text areas, dropdowns, radio buttons and checkboxes."""
     try:
         session_id = session_id or "default"
-        session = await get_browser_session(session_id)
-        page = session['page']
-        
-        print(f"✏️ Looking for field to fill: {field_description} with '{text}'")
-        
-        # Common selectors based on field description
-        desc_lower = field_description.lower()
-        selectors_to_try = []
-        
-        if 'search' in desc_lower:
-            selectors_to_try.extend([
-                'input[name="q"]',
-                'input[type="search"]',
-                'input[placeholder*="search"]',
-                '#search',
-                '.search-input',
-                'textarea[name="q"]'
-            ])
-        elif 'email' in desc_lower:
-            selectors_to_try.extend([
-                'input[type="email"]',
-                'input[name="email"]',
-                'input[name="custemail"]',
-                'input[placeholder*="email"]'
-            ])
-        elif 'password' in desc_lower:
-            selectors_to_try.extend([
-                'input[type="password"]',
-                'input[name="password"]',
-                'input[name="pass"]'
-            ])
-        elif 'username' in desc_lower or 'user' in desc_lower:
-            selectors_to_try.extend([
-                'input[name="username"]',
-                'input[name="user"]',
-                'input[name="login"]'
-            ])
-        elif 'name' in desc_lower:
-            selectors_to_try.extend([
-                'input[name="name"]',
-                'input[name="custname"]',
-                'input[name="fullname"]',
-                'input[placeholder*="name"]'
-            ])
-        elif 'phone' in desc_lower or 'tel' in desc_lower:
-            selectors_to_try.extend([
-                'input[type="tel"]',
-                'input[name="phone"]',
-                'input[name="tel"]',
-                'input[name="custtel"]'
-            ])
-        else:
-            # Generic input search
-            selectors_to_try.extend([
-                f'input[placeholder*="{field_description}"]',
-                f'input[name*="{desc_lower}"]',
-                'input[type="text"]',
-                'textarea'
-            ])
-        
-        # Try each selector
-        for selector in selectors_to_try:
-            try:
-                print(f"   Trying selector: {selector}")
-                element = await page.query_selector(selector)
-                if element:
-                    is_visible = await element.is_visible()
-                    if is_visible:
-                        await element.fill("")  # Clear first
-                        await element.fill(text)
-                        await asyncio.sleep(0.5)
-                        return f"✏️ Successfully filled {field_description} with text (using selector: {selector})"
-            except Exception as e:
-                print(f"   Selector {selector} failed: {e}")
-                continue
-        
-        return f"❌ Could not find input field: {field_description}"
-        
+        async with session_scope(session_id) as session:
+            page = session['page']
+
+            print(f"📝 Filling {len(fields)} form fields in one pass...")
+            before = await baseline(session)
+            results = await call_with_policy("smart_fill_form", lambda: page.fill_form(fields), url=page.url)
+            await page.settle(0.5)
+
+            lines = []
+            for result in results:
+                if result['status'] == 'filled':
+                    lines.append(f"✅ {result['field']}: filled (using {result['target']})")
+                elif result['status'] == 'no_matching_option':
+                    lines.append(f"⚠️ {result['field']}: no option matching '{result['value']}' in {result['target']}")
+                else:
+                    lines.append(f"❌ {result['field']}: no matching field found")
+
+            filled = sum(1 for result in results if result['status'] == 'filled')
+            return await with_changes(session, before, f"📝 Filled {filled}/{len(results)} fields:\n" + "\n".join(lines))
     except Exception as e:
-        return f"❌ Error filling {field_description}: {str(e)}"
+        return f"❌ Error filling form: {str(e)}"
 
 @tool
 async def get_page_elements(session_id: Optional[str] = None) -> str:
     """Get a list of clickable elements and input fields on the current page"""
     try:
         session_id = session_id or "default"
-        session = await get_browser_session(session_id)
-        page = session['page']
-        
-        print("🔍 Analyzing page elements...")
-        
-        # Get clickable elements
-        buttons = await page.query_selector_all('button, input[type="submit"], input[type="button"]')
-        links = await page.query_selector_all('a[href]')
-        inputs = await page.query_selector_all('input[type="text"], input[type="email"], input[type="search"], input[type="tel"], textarea')
-        
-        elements_info = []
-        
-        # Analyze buttons
-        for button in buttons[:10]:  # Limit to first 10
-            try:
-                text = await button.text_content()
-                tag_name = await button.evaluate('el => el.tagName')
-                if text and text.strip():
-                    elements_info.append(f"Button: '{text.strip()}'")
-            except:
-                pass
-        
-        # Analyze links
-        for link in links[:10]:  # Limit to first 10
-            try:
-                text = await link.text_content()
-                if text and text.strip():
-                    elements_info.append(f"Link: '{text.strip()}'")
-            except:
-                pass
-        
-        # Analyze input fields
-        for input_elem in inputs[:10]:  # Limit to first 10
-            try:
-                name = await input_elem.get_attribute('name')
-                placeholder = await input_elem.get_attribute('placeholder')
-                input_type = await input_elem.get_attribute('type')
-                
-                desc = f"Input field"
-                if name:
-                    desc += f" (name: {name})"
-                if placeholder:
-                    desc += f" (placeholder: {placeholder})"
-                if input_type:
-                    desc += f" (type: {input_type})"
-                
-                elements_info.append(desc)
-            except:
-                pass
-        
-        if elements_info:
-            result = "📋 Found these elements:\n" + "\n".join(elements_info)
-        else:
-            result = "📋 No interactive elements found on this page"
-        
-        return result
-        
+        async with session_scope(session_id) as session:
+            page = session['page']
+
+            print("🔍 Analyzing page elements...")
+
+            elements_info = []
+            elements = await call_with_policy("get_page_elements", lambda: page.describe_elements(limit=10),
+                                              url=page.url)
+            for element in elements:
+                if element['kind'] == 'button':
+                    elements_info.append(f"Button: '{element['text']}'")
+                elif element['kind'] == 'link':
+                    elements_info.append(f"Link: '{element['text']}'")
+                else:
+                    desc = f"Input field"
+                    if element.get('name'):
+                        desc += f" (name: {element['name']})"
+                    if element.get('placeholder'):
+                        desc += f" (placeholder: {element['placeholder']})"
+                    if element.get('type'):
+                        desc += f" (type: {element['type']})"
+                    elements_info.append(desc)
+
+            if elements_info:
+                result = "📋 Found these elements:\n" + "\n".join(elements_info)
+            else:
+                result = "📋 No interactive elements found on this page"
+
+            return result
+
     except Exception as e:
         return f"❌ Error analyzing page elements: {str(e)}"
 
 @tool
-async def take_screenshot(session_id: Optional[str] = None, full_page: bool = False) -> str:
-    """Take a screenshot of current page"""
+async def extract_structured_data(selector: Optional[str] = None, max_pages: int = 1, max_records: int = 500,
+                                  session_id: Optional[str] = None) -> str:
+    """Extract a table or repeated list on the page (products, search results, rows) into records in one call
+
+    Follows "next" pagination links for up to max_pages pages and saves all
+    records as JSONL; returns the columns, a few sample records and the file path.
+    Use selector to restrict extraction to part of the page.
+    """
     try:
         session_id = session_id or "default"
-        session = await get_browser_session(session_id)
-        page = session['page']
-        
-        # Create screenshots directory if it doesn't exist
-        os.makedirs("screenshots", exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshots/screenshot_{session_id}_{timestamp}.png"
-        
-        print(f"📸 Taking screenshot...")
-        await page.screenshot(path=filename, full_page=full_page)
-        
-        return f"📸 Screenshot saved: {filename}"
+        async with session_scope(session_id) as session:
+            return await extract_structured_data_from(session, session_id, selector, max_pages, max_records)
+    except Exception as e:
+        return f"❌ Error extracting structured data: {str(e)}"
+
+@tool
+async def visit_pages_in_parallel(urls: List[str], extract: str = "content", session_id: Optional[str] = None) -> str:
+    """Open several URLs at once in parallel tabs and return a consolidated summary of each. extract is "content" (main text of each page), "records" (tables/lists on each page) or "title". Use this instead of navigating to many URLs one by one."""
+    try:
+        session_id = session_id or "default"
+        async with session_scope(session_id) as session:
+            return await visit_pages(session, urls, extract, session_id)
+    except Exception as e:
+        return f"❌ Error visiting pages: {str(e)}"
+
+@tool
+async def take_screenshot(session_id: Optional[str] = None, full_page: bool = False, view: bool = False,
+                          selector: Optional[str] = None) -> str:
+    """Take a screenshot of current page. Set view=True to look at it yourself (downscaled); selector limits it to one element"""
+    try:
+        session_id = session_id or "default"
+        async with session_scope(session_id) as session:
+            page = session['page']
+
+            if view and vision_enabled():
+                print(f"👀 Capturing screenshot for the model...")
+                return await call_with_policy("take_screenshot",
+                                              lambda: capture_for_model(page, session_id, selector, full_page),
+                                              url=page.url)
+
+            # Create screenshots directory if it doesn't exist
+            os.makedirs("screenshots", exist_ok=True)
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"screenshots/screenshot_{session_id}_{timestamp}.png"
+
+            print(f"📸 Taking screenshot...")
+            await call_with_policy("take_screenshot",
+                                   lambda: page.screenshot(path=filename, full_page=full_page, selector=selector),
+                                   url=page.url)
+
+            note = " (the configured model cannot view images)" if view else ""
+            return f"📸 Screenshot saved: {filename}{note}"
     except Exception as e:
         return f"❌ Error taking screenshot: {str(e)}"
 
+@tool
+async def save_login_profile(profile: str, session_id: Optional[str] = None) -> str:
+    """Save the current cookies and local storage under a profile name so future sessions start logged in. Call this right after a successful login."""
+    try:
+        session_id = session_id or "default"
+        async with session_scope(session_id) as session:
+
+            state = await session['browser'].storage_state()
+            await asyncio.to_thread(save_storage_state, profile, state)
+            session['storage_profile'] = profile
+
+            return f"🔑 Saved login profile '{profile}' ({len(state.get('cookies', []))} cookies)"
+    except Exception as e:
+        return f"❌ Error saving login profile {profile}: {str(e)}"
+
 @tool
 async def close_browser(session_id: Optional[str] = None) -> str:
     """Close the browser session"""
@@ -0,0 +1,193 @@
+import asyncio
+import random
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable
+from tools.navigation_scheduler import domain_of
+
+# Retry, timeout and circuit-breaker policies for browser tool actions. A tool
+# runs its browser action through call_with_policy(); transient failures
+# (timeouts, dropped connections) are retried with full-jitter exponential
+# backoff inside the tool call, so the model only hears about failures that
+# survived the retries. Attempts are time-limited. Transient navigation
+# failures also feed a per-domain circuit breaker: after enough consecutive
+# ones the domain is failed fast for a while, then a single trial call decides
+# whether it closes again. Outcomes are counted per tool in tool_outcomes.
+
+class ToolPolicy:
+    """How one tool's browser action is retried and timed out"""
+
+    def __init__(self, attempts: int = 1, timeout_seconds: Optional[float] = 60.0,
+                 backoff_seconds: float = 0.5, max_backoff_seconds: float = 5.0,
+                 circuit_breaker: bool = False):
+        self.attempts = attempts
+        self.timeout_seconds = timeout_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.circuit_breaker = circuit_breaker
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter delay before the given retry (1-based)"""
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (retry - 1)))
+
+# Only navigations feed the circuit breaker: a missing selector timing out says
+# nothing about the site being down
+NAVIGATE = ToolPolicy(attempts=3, timeout_seconds=45.0, backoff_seconds=1.0, circuit_breaker=True)
+INTERACT = ToolPolicy(attempts=2, timeout_seconds=15.0, backoff_seconds=0.5)
+READ = ToolPolicy(attempts=2, timeout_seconds=30.0, backoff_seconds=0.5)
+
+TOOL_POLICIES: Dict[str, ToolPolicy] = {
+    "navigate_to_url": NAVIGATE,
+    "agentcore_navigate": NAVIGATE,
+    "extract_next_page": NAVIGATE,  # pagination inside extract_structured_data
+    "click_element": INTERACT,
+    "agentcore_click": INTERACT,
+    "fill_input": INTERACT,
+    "agentcore_fill": INTERACT,
+    "smart_fill_form": INTERACT,
+    "wait_for_element": ToolPolicy(attempts=1, timeout_seconds=None),  # bounded by its own timeout argument
+    "get_page_content": READ,
+    "agentcore_get_content": READ,
+    "get_page_elements": READ,
+    "take_screenshot": READ,
+    "agentcore_screenshot": READ,
+}
+DEFAULT_POLICY = ToolPolicy()
+
+# Error text from Playwright/Chromium for failures worth retrying
+TRANSIENT_MARKERS = (
+    "Timeout", "net::ERR_CONNECTION", "net::ERR_TIMED_OUT", "net::ERR_NETWORK_CHANGED",
+    "net::ERR_INTERNET_DISCONNECTED", "net::ERR_EMPTY_RESPONSE", "net::ERR_HTTP2",
+    "ECONNRESET", "Connection closed",
+)
+
+class ToolTimeoutError(TimeoutError):
+    """A tool action ran longer than its policy allows"""
+
+class CircuitOpenError(Exception):
+    """Calls to a domain are being failed fast after repeated transient failures"""
+
+def is_transient(error: BaseException) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ == "TimeoutError":
+        return True
+    message = str(error)
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+class CircuitBreaker:
+    """Closed -> open after consecutive transient failures -> half-open trial after a cool-down"""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_running or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_running = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at)) if self.opened_at else 0.0
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+tool_outcomes: Dict[str, Dict[str, int]] = {}
+
+def get_policy(tool_name: str) -> ToolPolicy:
+    """The tool's policy with any settings.tool_policy_overrides applied"""
+    from config.settings import get_settings
+    policy = TOOL_POLICIES.get(tool_name, DEFAULT_POLICY)
+    overrides = get_settings().tool_policy_overrides.get(tool_name)
+    if overrides:
+        merged = dict(vars(policy))
+        merged.update(overrides)
+        merged["attempts"] = int(merged["attempts"])
+        policy = ToolPolicy(**merged)
+    return policy
+
+def get_circuit_breaker(domain: str) -> CircuitBreaker:
+    breaker = circuit_breakers.get(domain)
+    if breaker is None:
+        from config.settings import get_settings
+        settings = get_settings()
+        breaker = CircuitBreaker(settings.circuit_breaker_failure_threshold, settings.circuit_breaker_reset_seconds)
+        circuit_breakers[domain] = breaker
+    return breaker
+
+def _count(tool_name: str, outcome: str):
+    counters = tool_outcomes.setdefault(tool_name, {})
+    counters[outcome] = counters.get(outcome, 0) + 1
+
+async def call_with_policy(tool_name: str, action: Callable[[], Awaitable[Any]],
+                           url: Optional[str] = None) -> Any:
+    """Run action() under the tool's retry/timeout policy and url's domain circuit breaker
+
+    Raises the last error (or CircuitOpenError) when the action does not succeed.
+    """
+    policy = get_policy(tool_name)
+    domain = domain_of(url) if url and policy.circuit_breaker else None
+    breaker = get_circuit_breaker(domain) if domain else None
+
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None and not breaker.allow():
+            _count(tool_name, "circuit_open")
+            raise CircuitOpenError(f"{domain} is failing repeatedly; not retrying for another "
+                                   f"{breaker.retry_in():.0f}s")
+        try:
+            if policy.timeout_seconds:
+                started = time.monotonic()
+                try:
+                    result = await asyncio.wait_for(action(), timeout=policy.timeout_seconds)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - started < policy.timeout_seconds:
+                        raise  # the action's own timeout, not ours
+                    raise ToolTimeoutError(f"{tool_name} timed out after {policy.timeout_seconds:g}s")
+            else:
+                result = await action()
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.trial_running = False
+            raise
+        except Exception as e:
+            transient = is_transient(e)
+            if breaker is not None:
+                if transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()  # the site answered; the request itself was bad
+            if not transient or attempt >= policy.attempts:
+                _count(tool_name, "timeout" if isinstance(e, ToolTimeoutError) else "failure")
+                raise
+            _count(tool_name, "retries")
+            delay = policy.backoff(attempt)
+            print(f"🔁 {tool_name} failed ({e}); retry {attempt}/{policy.attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        _count(tool_name, "success" if attempt == 1 else "success_after_retry")
+        return result
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from typing import Optional, Dict, Any, List
+from config.settings import get_settings
+
+# Background task that recycles browser sessions nobody closed. A session is
+# reaped when it has been idle longer than session_idle_ttl_seconds, is older
+# than session_max_age_seconds, or its browser process tree exceeds the RSS or
+# sustained CPU budget. Reaping goes through SessionRegistry.close(), so
+# in-flight tool calls finish first and the next call starts a fresh session
+# (restoring its storage profile if one was configured). Process sampling
+# walks the OS process table through psutil, so it runs in a worker thread.
+
+# Consecutive over-budget CPU samples before a session is recycled
+CPU_STRIKES_TO_REAP = 3
+
+reaper_stats: Dict[str, Any] = {
+    "reaped_sessions": 0,
+    "reaped_idle": 0,
+    "reaped_max_age": 0,
+    "reaped_rss": 0,
+    "reaped_cpu": 0,
+    "reclaimed_rss_bytes": 0,
+}
+
+class SessionReaper:
+    """Periodically recycle idle, old or oversized sessions in a SessionRegistry"""
+
+    def __init__(self, registry, interval_seconds: Optional[float] = None):
+        settings = get_settings()
+        self.registry = registry
+        self.interval_seconds = interval_seconds or settings.session_reaper_interval_seconds
+        self.idle_ttl_seconds = settings.session_idle_ttl_seconds
+        self.max_age_seconds = settings.session_max_age_seconds
+        self.max_rss_bytes = settings.session_max_rss_mb * 1024 * 1024 if settings.session_max_rss_mb else None
+        self.max_cpu_percent = settings.session_max_cpu_percent
+        self._task: Optional[asyncio.Task] = None
+        self._processes: Dict[int, Any] = {}  # pid -> psutil.Process, kept for cpu_percent deltas
+        self._cpu_strikes: Dict[str, int] = {}
+        self._psutil = None
+        self._psutil_checked = False
+
+    @property
+    def running(self) -> bool:
+        if self._task is None or self._task.done():
+            return False
+        # A task left behind by a previous asyncio.run() never finishes
+        return self._task.get_loop() is asyncio.get_running_loop()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.reap_once()
+            except Exception as e:
+                print(f"⚠️ Session reaper error: {e}")
+
+    def _get_psutil(self):
+        if not self._psutil_checked:
+            self._psutil_checked = True
+            try:
+                import psutil
+                self._psutil = psutil
+            except ImportError:
+                if self.max_rss_bytes or self.max_cpu_percent:
+                    print("⚠️ psutil not installed - session RSS/CPU budgets are disabled")
+        return self._psutil
+
+    def measure(self, pids: List[int]) -> Dict[str, float]:
+        """RSS bytes and CPU percent summed over a process tree"""
+        psutil = self._get_psutil()
+        usage = {"rss_bytes": 0, "cpu_percent": 0.0}
+        if psutil is None:
+            return usage
+
+        for pid in pids:
+            proc = self._processes.get(pid)
+            try:
+                if proc is None:
+                    proc = psutil.Process(pid)
+                    proc.cpu_percent(None)  # first call primes the delta
+                    self._processes[pid] = proc
+                    usage["rss_bytes"] += proc.memory_info().rss
+                else:
+                    usage["rss_bytes"] += proc.memory_info().rss
+                    usage["cpu_percent"] += proc.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._processes.pop(pid, None)
+        return usage
+
+    def _sample(self, browser):
+        pids = browser.process_ids()
+        return pids, self.measure(pids)
+
+    def _reap_reason(self, entry, now: float, usage: Dict[str, float]) -> Optional[str]:
+        # An old session in use is recycled once its tool calls are done, not
+        # while a task is running on it
+        if entry.refcount == 0 and self.max_age_seconds and now - entry.created_at > self.max_age_seconds:
+            return "max_age"
+        if entry.refcount == 0 and self.idle_ttl_seconds and now - entry.last_used > self.idle_ttl_seconds:
+            return "idle"
+        if self.max_rss_bytes and usage["rss_bytes"] > self.max_rss_bytes:
+            return "rss"
+        if self.max_cpu_percent and usage["cpu_percent"] > self.max_cpu_percent:
+            strikes = self._cpu_strikes.get(entry.session_id, 0) + 1
+            self._cpu_strikes[entry.session_id] = strikes
+            if strikes >= CPU_STRIKES_TO_REAP:
+                return "cpu"
+        else:
+            self._cpu_strikes.pop(entry.session_id, None)
+        return None
+
+    async def reap_once(self) -> List[str]:
+        """Check every session once and recycle offenders; returns the reaped session ids"""
+        now = time.monotonic()
+        reaped = []
+        for entry in self.registry.entries():
+            if entry.closing:
+                continue
+            pids, usage = await asyncio.to_thread(self._sample, entry.session['browser'])
+            reason = self._reap_reason(entry, now, usage)
+            if reason is None:
+                continue
+
+            print(f"♻️ Reaping browser session {entry.session_id} ({reason}, "
+                  f"{usage['rss_bytes'] / 1024 / 1024:.0f}MB RSS)")
+            if await self.registry.close(entry.session_id, keep_options=True):
+                reaper_stats["reaped_sessions"] += 1
+                reaper_stats[f"reaped_{reason}"] += 1
+                reaper_stats["reclaimed_rss_bytes"] += usage["rss_bytes"]
+                reaped.append(entry.session_id)
+            self._cpu_strikes.pop(entry.session_id, None)
+            for pid in pids:
+                self._processes.pop(pid, None)
+        return reaped
+
+_reapers: Dict[int, SessionReaper] = {}
+
+def ensure_reaper_running(registry) -> Optional[SessionReaper]:
+    """Start the reaper for a registry if enabled and not already running"""
+    if not get_settings().session_reaper_enabled:
+        return None
+    reaper = _reapers.get(id(registry))
+    if reaper is None:
+        reaper = SessionReaper(registry)
+        _reapers[id(registry)] = reaper
+    reaper.start()
+    return reaper
+
+async def stop_reapers():
+    """Stop all background reapers (e.g. before the event loop shuts down)"""
+    for reaper in list(_reapers.values()):
+        await reaper.stop()
@@ -0,0 +1,250 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
+from backends.base import get_backend
+from tools.storage_profiles import load_storage_state
+
+# Browser sessions shared by every tool module. A session is a dict holding the
+# backend session ('browser'), its active tab ('page') and bookkeeping. Which
+# backend a session uses is decided when it is created: from configure_session(),
+# from the calling tool module's default, or from settings.browser_backend.
+#
+# Creation is single-flight: concurrent callers for the same session_id await
+# one launch instead of each starting a browser. Tools hold a reference while
+# they run (session_scope), which also serialises actions on the session's page;
+# close waits for outstanding references and tears the browser down exactly once.
+#
+# Besides its main 'page', a session can open extra tabs in the same browser
+# context with tab_scope(); at most settings.max_tabs_per_session are open at
+# once per session and further tabs wait for a free slot.
+#
+# The registry keeps the durations of recent tool actions (time spent holding a
+# session) in step_latencies; the adaptive concurrency controller drains them.
+# When an action releases a session, the observation pipeline is told so it
+# can gather the page state for the next model call (tools.observation).
+# Internal reads that do not act on the page pass action=False.
+
+# Recent action durations kept across all sessions
+STEP_LATENCY_SAMPLES = 512
+
+class SessionEntry:
+    """Registry bookkeeping for one live session"""
+
+    def __init__(self, session_id: str, session: Dict[str, Any]):
+        self.session_id = session_id
+        self.session = session
+        self.lock = asyncio.Lock()
+        self.refcount = 0
+        self.closing = False
+        self.released = asyncio.Event()
+        self.released.set()
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class SessionRegistry:
+    """Single-flight, reference-counted registry of browser sessions"""
+
+    def __init__(self):
+        self._entries: Dict[str, SessionEntry] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._options: Dict[str, Dict[str, Any]] = {}
+        self.step_latencies = deque(maxlen=STEP_LATENCY_SAMPLES)
+
+    def configure(self, session_id: str, storage_profile: Optional[str] = None,
+                  backend: Optional[str] = None):
+        """Set how a session is created the next time a tool needs it"""
+        options = self._options.setdefault(session_id, {})
+        if storage_profile is not None:
+            options['storage_profile'] = storage_profile or None
+        if backend is not None:
+            options['backend'] = backend or None
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self):
+        return list(self._entries.values())
+
+    async def _create(self, session_id: str, storage_profile: Optional[str],
+                      backend: Optional[str]) -> SessionEntry:
+        options = self._options.get(session_id, {})
+        backend_name = options.get('backend') or backend
+        profile = storage_profile or options.get('storage_profile')
+
+        storage_state = await asyncio.to_thread(load_storage_state, profile) if profile else None
+        if storage_state:
+            print(f"🔑 Restoring storage profile: {profile}")
+
+        browser_backend = get_backend(backend_name)
+        browser = await browser_backend.launch(session_id, storage_state=storage_state)
+        # Until the entry is registered nothing else knows about this browser
+        try:
+            page = await browser.new_page()
+
+            from config.settings import get_settings
+            entry = SessionEntry(session_id, {
+                'backend': browser_backend.name,
+                'browser': browser,
+                'page': page,
+                'current_url': None,
+                'storage_profile': profile,
+                'tabs': [],
+                'snapshot': None,  # page state after the last action (tools.page_diff)
+                'prefetch': None,  # warm background tabs (tools.prefetch)
+                'tab_slots': asyncio.Semaphore(get_settings().max_tabs_per_session)
+            })
+
+            from tools.session_reaper import ensure_reaper_running
+            ensure_reaper_running(self)
+        except BaseException:
+            await browser.close()
+            raise
+        self._entries[session_id] = entry
+        return entry
+
+    async def _get_entry(self, session_id: str, storage_profile: Optional[str] = None,
+                         backend: Optional[str] = None) -> SessionEntry:
+        while True:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                return entry
+
+            task = self._pending.get(session_id)
+            if task is None:
+                task = asyncio.create_task(self._create(session_id, storage_profile, backend))
+                self._pending[session_id] = task
+                task.add_done_callback(lambda _: self._pending.pop(session_id, None))
+            # Shield so a cancelled caller does not abort the launch other callers await
+            entry = await asyncio.shield(task)
+            # A close() that also awaited the launch may have run first; then
+            # this entry is on its way out and the caller needs a fresh session
+            if self._entries.get(session_id) is entry:
+                return entry
+
+    async def get(self, session_id: str, storage_profile: Optional[str] = None,
+                  backend: Optional[str] = None) -> Dict[str, Any]:
+        """Get or create a session without holding a reference to it"""
+        return (await self._get_entry(session_id, storage_profile, backend)).session
+
+    @asynccontextmanager
+    async def scope(self, session_id: str, storage_profile: Optional[str] = None,
+                    backend: Optional[str] = None, action: bool = True):
+        """Hold a reference to a session and its action lock for the duration of a tool call"""
+        entry = await self._get_entry(session_id, storage_profile, backend)
+        entry.refcount += 1
+        entry.released.clear()
+        entry.last_used = time.monotonic()
+        try:
+            async with entry.lock:
+                started = time.monotonic()
+                try:
+                    yield entry.session
+                finally:
+                    if action:
+                        self.step_latencies.append(time.monotonic() - started)
+        finally:
+            entry.last_used = time.monotonic()
+            entry.refcount -= 1
+            if entry.refcount == 0:
+                entry.released.set()
+            if action and not entry.closing:
+                from tools.observation import on_session_action
+                on_session_action(session_id)
+
+    async def close(self, session_id: str, keep_options: bool = False) -> bool:
+        """Close a session once every in-flight tool call has released it
+        
+        The options set with configure() are forgotten too, unless keep_options
+        is set so the next call recreates the session the same way (the reaper
+        does this).
+        """
+        if not keep_options:
+            self._options.pop(session_id, None)
+        pending = self._pending.get(session_id)
+        if pending is not None:
+            try:
+                await asyncio.shield(pending)
+            except Exception:
+                return False
+
+        # Unregister first so new callers get a fresh session, then let
+        # in-flight tool calls finish before tearing the browser down
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+
+        entry.closing = True
+        await entry.released.wait()
+        from tools.prefetch import cancel_prefetch
+        from tools.observation import forget_session
+        cancel_prefetch(session_id, entry.session)
+        forget_session(session_id)
+        await entry.session['browser'].close()
+        print(f"🔴 Closed browser session: {session_id}")
+        return True
+
+    async def close_all(self):
+        """Close every session (e.g. on shutdown)"""
+        await asyncio.gather(
+            *(self.close(session_id) for session_id in list(self._entries)),
+            return_exceptions=True
+        )
+
+# Global registry used by all tool modules
+session_registry = SessionRegistry()
+
+def configure_session(session_id: str, storage_profile: Optional[str] = None,
+                      backend: Optional[str] = None):
+    """Set how a session is created the next time a tool needs it"""
+    session_registry.configure(session_id, storage_profile=storage_profile, backend=backend)
+
+async def get_browser_session(session_id: str = "default", storage_profile: Optional[str] = None,
+                              backend: Optional[str] = None) -> Dict[str, Any]:
+    """Get or create a browser session, optionally restoring a saved storage profile"""
+    return await session_registry.get(session_id, storage_profile=storage_profile, backend=backend)
+
+def session_scope(session_id: str = "default", storage_profile: Optional[str] = None,
+                  backend: Optional[str] = None):
+    """Async context manager yielding a session while holding a reference to it"""
+    return session_registry.scope(session_id, storage_profile=storage_profile, backend=backend)
+
+@asynccontextmanager
+async def tab_scope(session: Dict[str, Any]):
+    """Open an extra tab in a session for the duration of a block, within the session's tab cap"""
+    async with session['tab_slots']:
+        page = await session['browser'].new_page()
+        session['tabs'].append(page)
+        try:
+            yield page
+        finally:
+            session['tabs'].remove(page)
+            try:
+                await page.close()
+            except Exception:
+                pass  # the session may have been torn down underneath us
+
+def session_handle_counts() -> Dict[str, int]:
+    """Remote element/JS handles held by each live session's pages (main page, tabs, prefetched tabs)"""
+    counts = {}
+    for entry in session_registry.entries():
+        session = entry.session
+        pages = [session['page']] + list(session['tabs'])
+        if session.get('prefetch') is not None:
+            pages.extend(warm.page for warm in session['prefetch'].tabs.values())
+        counts[entry.session_id] = sum(page.handle_count() for page in pages)
+    return counts
+
+async def close_browser_session(session_id: str = "default"):
+    """Close a browser session"""
+    await session_registry.close(session_id)
+
+async def close_all_sessions():
+    """Close every open browser session and stop the background reaper"""
+    from tools.session_reaper import stop_reapers
+    await stop_reapers()
+    await session_registry.close_all()
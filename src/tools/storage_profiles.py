@@ -0,0 +1,120 @@
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+from config.settings import get_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows - fall back to atomic renames only
+    fcntl = None
+
+# Storage state profiles let a new browser session start already logged in.
+# Each profile is one JSON file holding Playwright's storage_state (cookies and
+# localStorage) plus the time it was captured. Writes go through a temp file and
+# os.replace so readers in other worker processes never see a half-written file,
+# and an flock on a sidecar lock file serialises writers across processes.
+
+def _profile_name(profile: str) -> str:
+    """Turn a profile name into a safe file name"""
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', profile.strip())
+    if not name:
+        raise ValueError("Storage profile name must not be empty")
+    return name
+
+def profile_path(profile: str) -> str:
+    """Path of the JSON file backing a storage profile"""
+    return os.path.join(get_settings().storage_state_dir, f"{_profile_name(profile)}.json")
+
+@contextmanager
+def _profile_lock(profile: str, exclusive: bool):
+    """Hold a cross-process lock on a profile while reading or writing it"""
+    os.makedirs(get_settings().storage_state_dir, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    lock_path = profile_path(profile) + ".lock"
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _is_expired(entry: Dict[str, Any], now: float) -> bool:
+    ttl = entry.get("ttl_seconds", get_settings().storage_state_ttl_seconds)
+    return ttl is not None and now - entry.get("saved_at", 0) > ttl
+
+def load_storage_state(profile: str) -> Optional[Dict[str, Any]]:
+    """Return the saved storage state for a profile, or None if missing or expired"""
+    path = profile_path(profile)
+    with _profile_lock(profile, exclusive=False):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable storage profile {profile}: {e}")
+            return None
+
+    if _is_expired(entry, time.time()):
+        print(f"⌛ Storage profile {profile} expired - starting logged out")
+        _remove_if_expired(profile)
+        return None
+
+    return entry.get("state")
+
+def save_storage_state(profile: str, state: Dict[str, Any], ttl_seconds: Optional[int] = None) -> str:
+    """Atomically save a storage state under a profile name"""
+    path = profile_path(profile)
+    entry = {
+        "profile": profile,
+        "saved_at": time.time(),
+        "ttl_seconds": ttl_seconds if ttl_seconds is not None else get_settings().storage_state_ttl_seconds,
+        "state": state
+    }
+
+    with _profile_lock(profile, exclusive=True):
+        fd, tmp_path = tempfile.mkstemp(dir=get_settings().storage_state_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.chmod(tmp_path, 0o600)  # cookies are credentials
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+
+    print(f"💾 Saved storage profile: {profile}")
+    return path
+
+def invalidate_storage_state(profile: str) -> bool:
+    """Delete a storage profile so the next session starts logged out"""
+    with _profile_lock(profile, exclusive=True):
+        try:
+            os.remove(profile_path(profile))
+            return True
+        except FileNotFoundError:
+            return False
+
+def _remove_if_expired(profile: str):
+    """Delete an expired profile unless another process refreshed it meanwhile"""
+    path = profile_path(profile)
+    with _profile_lock(profile, exclusive=True):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return
+        if _is_expired(entry, time.time()):
+            _remove_quietly(path)
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
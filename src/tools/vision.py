@@ -0,0 +1,119 @@
+import base64
+import io
+import math
+from typing import Optional, Dict, Any, List
+
+# Model-ready screenshots. A PNG from the browser (viewport, full page or one
+# element) is downscaled in memory until its vision token cost fits
+# settings.vision_image_max_tokens, re-encoded as JPEG or WebP, and queued for
+# the session. The agent graph's tools node attaches queued images to the
+# conversation as a user message right after the tool results. Images are
+# only produced when the configured model takes image input.
+
+# Model name prefixes that accept image input
+VISION_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-4-turbo", "gpt-5", "o1", "o3", "o4")
+
+# OpenAI's high-detail image costing: the image is fit within 2048x2048, then
+# its shortest side is scaled to 768, and each 512px tile costs TILE_TOKENS
+MAX_SIDE = 2048
+SHORT_SIDE = 768
+TILE_SIZE = 512
+BASE_TOKENS = 85
+TILE_TOKENS = 170
+
+FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+pending_images: Dict[str, List[Dict[str, Any]]] = {}  # session_id -> images waiting to be attached
+
+def vision_enabled() -> bool:
+    """Whether screenshots can be shown to the configured model"""
+    from config.settings import get_settings
+    settings = get_settings()
+    if settings.vision_enabled is not None:
+        return settings.vision_enabled
+    return settings.model_name.lower().startswith(VISION_MODEL_PREFIXES)
+
+def _fit_dimensions(width: int, height: int):
+    scale = min(1.0, MAX_SIDE / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, SHORT_SIDE / min(width, height))
+    return width * scale, height * scale
+
+def image_tokens(width: int, height: int) -> int:
+    """Vision tokens an image of this size costs at high detail"""
+    width, height = _fit_dimensions(width, height)
+    return BASE_TOKENS + TILE_TOKENS * math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+
+def target_size(width: int, height: int, max_tokens: int):
+    """Largest size, no bigger than the model would use, that costs at most max_tokens"""
+    fit_width, fit_height = _fit_dimensions(width, height)
+    scale = 1.0
+    while scale > 0.05 and image_tokens(max(1, round(fit_width * scale)), max(1, round(fit_height * scale))) > max_tokens:
+        scale *= 0.9
+    return max(1, round(fit_width * scale)), max(1, round(fit_height * scale))
+
+def prepare_image(png: bytes, max_tokens: int, image_format: str = "jpeg", quality: int = 70) -> Dict[str, Any]:
+    """Downscale and re-encode a screenshot to fit a vision token budget"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Pillow is not installed - model-ready screenshots are unavailable")
+    if image_format not in FORMATS:
+        raise ValueError(f"Unsupported image format '{image_format}'. Available: {', '.join(FORMATS)}")
+
+    pil_format, mime = FORMATS[image_format]
+    with Image.open(io.BytesIO(png)) as image:
+        original = image.size
+        size = target_size(*original, max_tokens)
+        image = image.convert("RGB")  # JPEG has no alpha; WebP does not need it here
+        if size != original:
+            image = image.resize(size, Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, pil_format, quality=quality)
+
+    return {
+        "data": out.getvalue(),
+        "mime": mime,
+        "width": size[0],
+        "height": size[1],
+        "original_width": original[0],
+        "original_height": original[1],
+        "tokens": image_tokens(*size)
+    }
+
+def queue_image(session_id: str, image: Dict[str, Any], caption: str):
+    pending_images.setdefault(session_id, []).append(dict(image, caption=caption))
+
+def take_pending_images(session_ids: List[str]) -> List[Dict[str, Any]]:
+    images = []
+    for session_id in dict.fromkeys(session_ids):
+        images.extend(pending_images.pop(session_id, []))
+    return images
+
+def image_message_content(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Content blocks showing the images to the model"""
+    content: List[Dict[str, Any]] = []
+    for image in images:
+        content.append({"type": "text", "text": image["caption"]})
+        data = base64.b64encode(image["data"]).decode("ascii")
+        content.append({"type": "image_url", "image_url": {"url": f"data:{image['mime']};base64,{data}", "detail": "high"}})
+    return content
+
+def format_image_result(image: Dict[str, Any]) -> str:
+    return (f"📸 Screenshot attached for you to look at ({image['width']}x{image['height']} "
+            f"{image['mime'].split('/')[1].upper()}, ~{image['tokens']} tokens, scaled from "
+            f"{image['original_width']}x{image['original_height']})")
+
+async def capture_for_model(page, session_id: str, selector: Optional[str] = None,
+                            full_page: bool = False) -> str:
+    """Screenshot the page (or an element), prepare it for the model and queue it for the conversation"""
+    import asyncio
+    from config.settings import get_settings
+
+    settings = get_settings()
+    png = await page.screenshot(full_page=full_page, selector=selector)
+    image = await asyncio.to_thread(prepare_image, png, settings.vision_image_max_tokens,
+                                    settings.vision_image_format, settings.vision_image_quality)
+    region = f"element {selector}" if selector else ("full page" if full_page else "viewport")
+    queue_image(session_id, image, f"Screenshot of {page.url} ({region})")
+    return format_image_result(image)
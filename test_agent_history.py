@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from agents.browser_agent import BrowserAutomationAgent
+from agents.real_browser_agent import RealBrowserAutomationAgent
+
+def test_run_task_drops_its_thread(scripted_model):
+    agent = BrowserAutomationAgent()
+    checkpointer = agent.compiled.checkpointer
+
+    asyncio.run(agent.run_task("Say hi", session_id="s1"))
+    asyncio.run(agent.run_task("Say hi again", session_id="s1"))
+    assert len(scripted_model.calls) == 2
+    assert len(scripted_model.calls[1]) == 2  # system prompt and this task only
+    assert not checkpointer.storage
+
+def test_failed_run_drops_its_thread(scripted_model):
+    agent = RealBrowserAutomationAgent()
+    scripted_model.replies.append(RuntimeError("model unavailable"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(agent.run_task("Say hi", session_id="s1"))
+    assert not agent.compiled.checkpointer.storage
+
+def test_kept_history_until_released(scripted_model):
+    agent = BrowserAutomationAgent(keep_history=True)
+    other = BrowserAutomationAgent(keep_history=True)
+    checkpointer = agent.compiled.checkpointer
+
+    asyncio.run(agent.run_task("Open the shop", session_id="s1"))
+    asyncio.run(agent.run_task("Now the cart", session_id="s1"))
+    asyncio.run(other.run_task("Open the news", session_id="s1"))
+    # The second task sees the first one; the other handle has its own thread
+    assert [m.content for m in scripted_model.calls[1][1:]] == ["Open the shop", "Done", "Now the cart"]
+    assert len(scripted_model.calls[2]) == 2
+    assert len(checkpointer.storage) == 2
+
+    agent.release_session("s1")
+    assert len(checkpointer.storage) == 1
+    other.release()
+    assert not checkpointer.storage
@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+
+import pytest
+
+from backends import playwright_backend
+from backends.agentcore_backend import AgentCoreBackend
+from backends.agentcore_pool import AgentCoreSessionPool
+
+class StubBrowserClient:
+    """BrowserClient stand-in whose signed headers change on every call"""
+
+    def __init__(self, region):
+        self.region = region
+        self.signatures = itertools.count(1)
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.stopped = True
+
+    def generate_ws_headers(self):
+        return f"wss://{self.region}.agentcore.test/browser", {"Authorization": f"sig-{next(self.signatures)}"}
+
+class StubRawPage:
+    def __init__(self, context):
+        self.context = context
+
+    def on(self, event, handler):
+        pass
+
+class StubContext:
+    def __init__(self):
+        self.pages = []
+        self.cookies = []
+
+    async def new_page(self):
+        page = StubRawPage(self)
+        self.pages.append(page)
+        return page
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+class StubCdpBrowser:
+    """What connect_over_cdp returns: one WebSocket and the remote's default context"""
+
+    def __init__(self):
+        self.contexts = [StubContext()]
+        self.open = True
+
+    def is_connected(self):
+        return self.open
+
+    async def new_context(self):
+        context = StubContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.open = False
+
+class StubChromium:
+    def __init__(self):
+        self.connects = []  # (ws_url, headers) per connect_over_cdp call
+        self.browsers = []
+
+    async def connect_over_cdp(self, ws_url, headers=None):
+        await asyncio.sleep(0.01)  # a WebSocket handshake
+        self.connects.append((ws_url, headers))
+        browser = StubCdpBrowser()
+        self.browsers.append(browser)
+        return browser
+
+@pytest.fixture
+def chromium(monkeypatch):
+    chromium = StubChromium()
+    playwright = type("StubPlaywright", (), {"chromium": chromium})()
+
+    async def get_shared_playwright():
+        return playwright
+
+    monkeypatch.setattr(playwright_backend, "get_shared_playwright", get_shared_playwright)
+    return chromium
+
+def _backend():
+    pool = AgentCoreSessionPool(["us-west-2"], warm_per_region=0,
+                                client_factory=StubBrowserClient, preconnect=False)
+    return AgentCoreBackend(pool), pool
+
+async def _pages_share_one_connection(chromium):
+    backend, pool = _backend()
+    cookies = [{"name": "sid", "value": "abc", "domain": "shop.test", "path": "/"}]
+    session = await backend.launch("s", storage_state={"cookies": cookies, "origins": []})
+    pages = [await session.new_page() for _ in range(5)]
+
+    assert len(chromium.connects) == 1
+    assert chromium.connects[0] == ("wss://us-west-2.agentcore.test/browser", {"Authorization": "sig-1"})
+    browser = chromium.browsers[0]
+    assert len(browser.contexts) == 1  # the remote's own context, not a new one per page
+    assert [p.page for p in pages] == browser.contexts[0].pages
+    assert browser.contexts[0].cookies == cookies
+
+    remote = session.remote
+    await session.close()
+    assert not browser.open and remote.client.stopped
+    await pool.close()
+
+async def _reconnects_after_drop(chromium):
+    backend, pool = _backend()
+    session = await backend.launch("s")
+    await session.new_page()
+    chromium.browsers[0].open = False  # the WebSocket dropped
+
+    # Concurrent tool calls share one reconnect
+    pages = await asyncio.gather(*(session.new_page() for _ in range(3)))
+    assert len(chromium.connects) == 2
+    assert chromium.connects[1][1] == {"Authorization": "sig-2"}  # freshly signed headers
+    reconnected = chromium.browsers[1]
+    assert session.browser is reconnected
+    assert session.context is reconnected.contexts[0]
+    assert [p.page for p in pages] == reconnected.contexts[0].pages
+    assert session.remote.connects == 2
+
+    await session.new_page()
+    assert len(chromium.connects) == 2  # connected again, nothing more to do
+    await session.close()
+    await pool.close()
+
+def test_pages_share_one_connection(chromium):
+    asyncio.run(asyncio.wait_for(_pages_share_one_connection(chromium), 10))
+
+def test_reconnects_after_drop(chromium):
+    asyncio.run(asyncio.wait_for(_reconnects_after_drop(chromium), 10))
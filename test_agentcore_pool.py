@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from backends.agentcore_pool import AgentCoreSessionPool
+
+START_SECONDS = 0.2
+
+class StandInBrowserClient:
+    """Local stand-in for bedrock_agentcore's BrowserClient
+    
+    start() blocks like the real remote call; generate_ws_headers() points at
+    a local CDP endpoint (e.g. chromium --remote-debugging-port=9222).
+    """
+    
+    started = 0
+    stopped = 0
+    
+    def __init__(self, region):
+        self.region = region
+    
+    def start(self):
+        time.sleep(START_SECONDS)
+        StandInBrowserClient.started += 1
+    
+    def stop(self):
+        StandInBrowserClient.stopped += 1
+    
+    def generate_ws_headers(self):
+        return "ws://127.0.0.1:9222/devtools/browser", {"X-Region": self.region}
+
+async def _starts_do_not_block_loop():
+    pool = AgentCoreSessionPool(["us-west-2", "us-east-1"], warm_per_region=0,
+                                client_factory=StandInBrowserClient, preconnect=False)
+    ticks = 0
+    
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    leases = await asyncio.gather(*(pool.acquire() for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    beat.cancel()
+    
+    # Starts ran concurrently in threads and the loop kept ticking meanwhile
+    assert elapsed < START_SECONDS * 3
+    assert ticks >= 5
+    # Load was spread across both regions
+    assert sorted(r.region for r in leases) == ["us-east-1", "us-east-1", "us-west-2", "us-west-2"]
+    
+    for remote in leases:
+        await pool.release(remote)
+    await pool.close()
+
+async def _warm_sessions_are_reused():
+    # preconnect=False: the stand-in endpoint is not a real CDP server
+    pool = AgentCoreSessionPool(["us-west-2"], warm_per_region=2,
+                                client_factory=StandInBrowserClient, preconnect=False)
+    await pool.warm_up()
+    
+    start = time.perf_counter()
+    remote = await pool.acquire()
+    assert time.perf_counter() - start < START_SECONDS / 2
+    assert pool.stats["warm_hits"] == 1
+    assert remote.ws_endpoint()[1] == {"X-Region": "us-west-2"}
+    
+    await pool.release(remote)
+    await asyncio.sleep(START_SECONDS * 1.5)  # background refill
+    assert len(pool.regions["us-west-2"].warm) == 2
+    await pool.close()
+
+def test_starts_do_not_block_loop():
+    asyncio.run(_starts_do_not_block_loop())
+
+def test_warm_sessions_are_reused():
+    asyncio.run(_warm_sessions_are_reused())
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from agents.task_scheduler import TaskScheduler
+from tools.concurrency_controller import ConcurrencyController
+
+def calm(**overrides):
+    sample = {"loop_lag_seconds": 0.0, "host_memory_percent": 40.0, "browser_rss_mb": 500.0,
+              "step_latency_seconds": None, "running": 4, "queued": 0}
+    sample.update(overrides)
+    return sample
+
+def make_controller(limit=4, **kwargs):
+    return ConcurrencyController(TaskScheduler(max_concurrent=limit), min_limit=1, max_limit=6, **kwargs)
+
+def test_additive_increase():
+    """The limit grows by one only while tasks are waiting for a slot"""
+    controller = make_controller()
+    assert controller.decide(calm()) == (4, "steady")
+    assert controller.decide(calm(queued=3))[0] == 5
+    controller.limit = 6
+    assert controller.decide(calm(running=6, queued=3))[0] == 6  # capped
+
+def test_multiplicative_decrease():
+    """Any saturated signal cuts the limit, down to the minimum"""
+    controller = make_controller(max_browser_rss_mb=2000)
+    new_limit, reason = controller.decide(calm(loop_lag_seconds=0.3, queued=5))
+    assert new_limit == 2 and "event loop lag" in reason
+    assert "host memory" in controller.decide(calm(host_memory_percent=95))[1]
+    assert "browser RSS" in controller.decide(calm(browser_rss_mb=3000))[1]
+    controller.limit = 1
+    assert controller.decide(calm(loop_lag_seconds=1.0))[0] == 1
+
+def test_step_latency_slowdown():
+    """Actions getting much slower than the baseline count as pressure"""
+    controller = make_controller()
+    assert controller.decide(calm(step_latency_seconds=0.2))[1] == "steady"
+    assert controller.decide(calm(step_latency_seconds=0.3))[1] == "steady"
+    new_limit, reason = controller.decide(calm(step_latency_seconds=0.6))
+    assert new_limit < 4 and "step latency" in reason
+
+def test_controller_drives_scheduler():
+    """Raising the limit starts queued tasks; lowering it holds new ones back"""
+    class SleepAgent:
+        async def run_task(self, task, session_id=None, max_steps=None):
+            await asyncio.sleep(0.1)
+            return task
+
+    async def run():
+        scheduler = TaskScheduler(max_concurrent=1)
+        controller = ConcurrencyController(scheduler, min_limit=1, max_limit=3)
+        controller._psutil_checked = True  # signals from psutil are not needed here
+        handles = [scheduler.submit(SleepAgent(), f"t{i}", f"s{i}") for i in range(4)]
+        assert len(scheduler.running) == 1
+
+        assert controller.step() == 2
+        assert len(scheduler.running) == 2 and scheduler.max_concurrent == 2
+
+        controller._max_lag = 0.5
+        assert controller.step() == 1
+        assert controller.stats == {"samples": 2, "increases": 1, "decreases": 1}
+        assert [d["to"] for d in controller.decisions] == [2, 1]
+        assert await asyncio.wait_for(asyncio.gather(*(h.wait() for h in handles)), 10) == ["t0", "t1", "t2", "t3"]
+
+    asyncio.run(run())
+
+def test_event_loop_lag_probe():
+    """Blocking the event loop shows up as lag in the next sample"""
+    async def run():
+        controller = make_controller(interval_seconds=60)
+        controller._psutil_checked = True
+        controller.start()
+        await asyncio.sleep(0.06)
+        time.sleep(0.2)  # a blocking call on the loop
+        await asyncio.sleep(0.06)
+        assert controller.sample()["loop_lag_seconds"] > 0.1
+        await controller.stop()
+
+    asyncio.run(run())
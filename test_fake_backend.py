@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from backends.fake_backend import FakeBackend, FakeSite
+
+FORM_PAGE = """<html><head><title>Order form</title></head><body>
+<form action="/post" method="get">
+  <input name="custname" type="text">
+  <input name="custemail" type="email" placeholder="email">
+  <input name="secret" type="hidden" value="x">
+  <button type="submit">Submit order</button>
+</form>
+<a href="/login">Login</a>
+<p style="display: none">hidden text</p>
+</body></html>"""
+
+ARTICLE_PAGE = """<html><head><title>Article</title><style>p {{ color: red }}</style></head><body>
+<header><a href="/">Logo</a></header>
+<nav><a href="/a">Section A</a></nav>
+<main>
+<h1>Long read</h1>
+{paragraphs}
+<aside>Related links</aside>
+<div hidden>Secret draft</div>
+</main>
+<footer>Copyright</footer>
+</body></html>""".format(paragraphs="".join(f"<p>Paragraph {i} of the article body.</p>" for i in range(300)))
+
+def _site():
+    return FakeSite({"https://shop.test/form": FORM_PAGE, "https://news.test/article": ARTICLE_PAGE})
+
+async def _form_round_trip():
+    session = await FakeBackend(_site()).launch("test")
+    page = await session.new_page()
+    
+    await page.goto("https://shop.test/form")
+    assert await page.title() == "Order form"
+    assert await page.is_visible('input[name="custname"]')
+    assert not await page.is_visible('input[type="hidden"]')
+    assert not await page.is_visible('p:has-text("hidden text")')
+    
+    await page.fill('input[name="custname"]', "John Doe")
+    await page.fill('input[placeholder*="email"]', "john@example.com")
+    await page.click('button:has-text("Submit")')
+    assert page.url == "https://shop.test/post?custname=John+Doe&custemail=john%40example.com&secret=x"
+
+async def _describe_and_links():
+    session = await FakeBackend(_site()).launch("test")
+    page = await session.new_page()
+    await page.goto("https://shop.test/form")
+    
+    kinds = [e['kind'] for e in await page.describe_elements()]
+    assert kinds.count('button') == 1 and kinds.count('link') == 1 and kinds.count('input') == 2
+    
+    await page.click('text="Login"')
+    assert page.url == "https://shop.test/login"
+    assert "Fake login" == await page.title()
+
+async def _main_content_chunks():
+    session = await FakeBackend(_site()).launch("test")
+    page = await session.new_page()
+    await page.goto("https://news.test/article")
+    
+    chunks, cursor = [], 0
+    while cursor is not None:
+        chunk = await page.main_content(offset=cursor, max_chars=1000)
+        assert len(chunk["text"]) <= 1000
+        chunks.append(chunk["text"])
+        cursor = chunk["next_offset"]
+    
+    text = "\n".join(chunks)
+    assert text.startswith("Long read\nParagraph 0 of the article body.")
+    assert text.endswith("Paragraph 299 of the article body.")
+    assert len(chunks) > 5
+    for boilerplate in ("Logo", "Section A", "Related links", "Secret draft", "Copyright", "color"):
+        assert boilerplate not in text
+    # Chunks are cut on line or word boundaries, so no word is split
+    whole = await page.main_content(max_chars=100000)
+    assert whole["next_offset"] is None
+    assert " ".join(chunks).split() == whole["text"].split()
+
+async def _agent_steps_per_second(steps: int) -> float:
+    from langchain_core.messages import AIMessage
+    from agents.browser_agent import BrowserAutomationAgent
+    from tools.sessions import configure_session, get_browser_session, close_browser_session
+    
+    agent = BrowserAutomationAgent()
+    model = agent.compiled.model
+    for i in range(steps):
+        model.replies.append(AIMessage(content="", tool_calls=[
+            {"name": "navigate_to_url", "args": {"url": f"https://load.test/page-{i}", "session_id": "load"},
+             "id": f"navigate-{i}"},
+            {"name": "fill_input", "args": {"selector": 'input[name="q"]', "text": f"query {i}", "session_id": "load"},
+             "id": f"fill-{i}"},
+        ]))
+    configure_session("load", backend="fake")
+    try:
+        start = time.perf_counter()
+        result = await agent.run_task("Load test", session_id="load", max_steps=steps + 1)
+        elapsed = time.perf_counter() - start
+        tool_results = [m.content for m in result["messages"] if m.type == "tool"]
+        assert len(tool_results) == 2 * steps
+        assert all("Successfully" in content for content in tool_results), tool_results[:2]
+        assert (await get_browser_session("load"))['browser'].history[-1] == f"https://load.test/page-{steps - 1}"
+    finally:
+        await close_browser_session("load")
+    return steps / elapsed
+
+async def _logs_are_bounded():
+    from backends.fake_backend import ACTION_LOG_SIZE, compile_selector, SELECTOR_CACHE_SIZE
+    session = await FakeBackend().launch("load")
+    page = await session.new_page()
+    for i in range(ACTION_LOG_SIZE + 50):
+        await page.goto(f"https://load.test/page-{i}")
+        await page.fill(f'input[name="q"], #generated-{i}', "x")
+    assert len(session.history) == len(page.actions) == ACTION_LOG_SIZE
+    assert session.history[-1] == f"https://load.test/page-{ACTION_LOG_SIZE + 49}"
+    assert compile_selector.cache_info().currsize <= SELECTOR_CACHE_SIZE
+
+def test_form_round_trip():
+    asyncio.run(_form_round_trip())
+
+def test_describe_and_links():
+    asyncio.run(_describe_and_links())
+
+def test_main_content_chunks():
+    asyncio.run(_main_content_chunks())
+
+def test_logs_are_bounded():
+    asyncio.run(_logs_are_bounded())
+
+def test_fake_backend_throughput(scripted_model, monkeypatch):
+    """Agent steps per second through the compiled graph, tools and fake backend"""
+    from config.settings import get_settings
+    # Take the politeness rate limit out of a load test against one fake domain
+    monkeypatch.setitem(get_settings().domain_limits, "load.test", {"rate_per_second": 1e6})
+    rate = asyncio.run(_agent_steps_per_second(100))
+    print(f"⚡ Agent on fake backend: {rate:.0f} steps/s")
+    assert rate > 20
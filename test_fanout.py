@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSession, FakePage
+from config.settings import get_settings
+from tools.sessions import configure_session, get_browser_session, close_browser_session
+
+PAGE_LOAD_SECONDS = 0.1
+
+class SlowTabsBackend(FakeBackend):
+    """Fake backend whose page loads take a while and which tracks open tabs"""
+    
+    name = "slow-tabs"
+    
+    def __init__(self):
+        super().__init__()
+        self.open_tabs = 0
+        self.max_open_tabs = 0
+    
+    async def launch(self, session_id, storage_state=None):
+        backend = self
+        
+        class SlowPage(FakePage):
+            async def goto(self, url, timeout_ms=30000):
+                await asyncio.sleep(PAGE_LOAD_SECONDS)
+                await super().goto(url, timeout_ms)
+            
+            async def close(self):
+                backend.open_tabs -= 1
+                await super().close()
+        
+        class SlowSession(FakeSession):
+            async def new_page(self):
+                backend.open_tabs += 1
+                backend.max_open_tabs = max(backend.max_open_tabs, backend.open_tabs)
+                page = SlowPage(self)
+                self.pages.append(page)
+                return page
+        
+        return SlowSession(self.site, storage_state)
+
+async def _fan_out_within_tab_cap():
+    from tools.real_browser_tools import navigate_to_url, visit_pages_in_parallel
+    
+    backend = SlowTabsBackend()
+    register_backend("slow-tabs", backend)
+    configure_session("fan", backend="slow-tabs")
+    await navigate_to_url.ainvoke({"url": "https://start.test/", "session_id": "fan"})
+    
+    urls = [f"https://site{i}.test/" for i in range(10)]
+    start = time.perf_counter()
+    result = await visit_pages_in_parallel.ainvoke({"urls": urls + urls[:2], "session_id": "fan"})
+    elapsed = time.perf_counter() - start
+    
+    cap = get_settings().max_tabs_per_session
+    assert "Visited 10 pages in parallel (10 succeeded)" in result
+    assert "2 URLs were skipped" in result
+    assert all(f"[{i + 1}] {url}" in result for i, url in enumerate(urls))
+    assert "Fake content for https://site7.test/" in result
+    # main page + at most `cap` extra tabs, all closed again afterwards
+    assert backend.max_open_tabs == cap + 1
+    assert backend.open_tabs == 1
+    assert elapsed < PAGE_LOAD_SECONDS * 10 / 2, f"fan-out took {elapsed:.2f}s"
+    
+    session = await get_browser_session("fan")
+    assert session['page'].url == "https://start.test/"
+    assert session['tabs'] == []
+    await close_browser_session("fan")
+
+def test_fan_out_within_tab_cap():
+    asyncio.run(_fan_out_within_tab_cap())
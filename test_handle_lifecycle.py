@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from backends.base import BrowserBackend, BackendSession, register_backend, chunk_text
+from backends.playwright_backend import PlaywrightPage, SNAPSHOT_JS, MAIN_CONTENT_JS, DESCRIBE_ELEMENTS_JS
+from tools.sessions import configure_session, close_browser_session, session_handle_counts
+
+ACTIONS = 1000
+
+# A stand-in for a Playwright page that records which element handles it
+# handed out are still undisposed. No browser is needed.
+
+class RecordingHandle:
+    def __init__(self, page):
+        self.page = page
+        page.open_handles.add(self)
+
+    async def is_visible(self):
+        return True
+
+    async def text_content(self):
+        return "Search"
+
+    async def get_attribute(self, name):
+        return None
+
+    async def dispose(self):
+        self.page.open_handles.discard(self)
+
+class RecordingLocator:
+    @property
+    def first(self):
+        return self
+
+    async def is_visible(self):
+        return True
+
+class RecordingPage:
+    def __init__(self):
+        self.url = "https://handles.test/"
+        self.open_handles = set()
+
+    def on(self, event, handler):
+        pass
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.url = url
+
+    async def title(self):
+        return "Handles"
+
+    def locator(self, selector):
+        return RecordingLocator()
+
+    async def query_selector(self, selector):
+        return RecordingHandle(self)
+
+    async def query_selector_all(self, selector):
+        return [RecordingHandle(self) for _ in range(3)]
+
+    async def click(self, selector, timeout=None):
+        pass
+
+    async def fill(self, selector, text):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        if script is SNAPSHOT_JS:
+            return {"title": "Handles", "elements": [["button: Search", None]], "dialogs": []}
+        if script is MAIN_CONTENT_JS:
+            return chunk_text("Search the catalogue", arg[0], arg[1])
+        if script is DESCRIBE_ELEMENTS_JS:
+            return [{"kind": "button", "text": "Search"}, {"kind": "input", "name": "q", "placeholder": None, "type": "search"}]
+        raise AssertionError("unexpected script")
+
+    async def close(self):
+        pass
+
+class InstantPlaywrightPage(PlaywrightPage):
+    async def settle(self, seconds):
+        return None
+
+class RecordingSession(BackendSession):
+    async def new_page(self):
+        return InstantPlaywrightPage(RecordingPage())
+
+    async def storage_state(self):
+        return {}
+
+    async def close(self):
+        pass
+
+class RecordingBackend(BrowserBackend):
+    name = "recording-playwright"
+
+    async def launch(self, session_id, storage_state=None):
+        return RecordingSession()
+
+def test_handle_count_sees_live_handles():
+    """handle_count reports element handles until their block disposes them"""
+    async def run():
+        page = PlaywrightPage(RecordingPage())
+        async with page.element_handles("button") as handles:
+            assert len(handles) == 3
+            assert page.handle_count() == 3
+        assert page.handle_count() == 0
+        assert not page.page.open_handles
+
+        try:
+            async with page.element_handles("button"):
+                raise RuntimeError("tool failed")
+        except RuntimeError:
+            pass
+        assert page.handle_count() == 0
+        assert not page.page.open_handles
+
+    asyncio.run(run())
+
+def test_handle_counts_stay_flat():
+    """Thousands of clicks, fills and element listings leave no handles behind"""
+    async def run():
+        from tools.real_browser_tools import smart_click, smart_fill, get_page_elements
+        from tools.browser_tools import click_element
+
+        register_backend("recording-playwright", RecordingBackend())
+        configure_session("handles", backend="recording-playwright")
+        try:
+            for i in range(ACTIONS):
+                assert "Successfully clicked" in await smart_click.ainvoke({"description": "search button", "session_id": "handles"})
+                assert "Successfully filled" in await smart_fill.ainvoke({"field_description": "search box", "text": f"query {i}",
+                                                                          "session_id": "handles"})
+                assert "Button: 'Search'" in await get_page_elements.ainvoke({"session_id": "handles"})
+                await click_element.ainvoke({"selector": "button", "session_id": "handles"})
+                if i % 250 == 0:
+                    assert session_handle_counts()["handles"] == 0
+            assert session_handle_counts()["handles"] == 0
+        finally:
+            await close_browser_session("handles")
+
+    asyncio.run(run())
+
+async def _launch_chromium():
+    from playwright.async_api import async_playwright
+    playwright = await async_playwright().start()
+    try:
+        return playwright, await playwright.chromium.launch(headless=True)
+    except Exception as e:
+        await playwright.stop()
+        pytest.skip(f"Chromium is not installed ({type(e).__name__})")
+
+def test_handles_in_real_chromium():
+    """Against a real browser: handles work inside the block and are dead after it"""
+    pytest.importorskip("playwright")
+
+    async def run():
+        playwright, browser = await _launch_chromium()
+        try:
+            raw_page = await browser.new_page()
+            page = PlaywrightPage(raw_page)
+            await raw_page.set_content('<button>One</button><button>Two</button><input name="q">')
+            async with page.element_handles("button") as handles:
+                assert page.handle_count() == 2
+                assert [await h.text_content() for h in handles] == ["One", "Two"]
+            assert page.handle_count() == 0
+            with pytest.raises(Exception):
+                await handles[0].text_content()  # disposed in the browser too
+
+            for i in range(50):
+                await page.click("button")
+                await page.fill("input", f"query {i}")
+                await page.snapshot()
+                await page.describe_elements()
+            assert page.handle_count() == 0
+        finally:
+            await browser.close()
+            await playwright.stop()
+
+    asyncio.run(run())
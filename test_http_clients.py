@@ -0,0 +1,45 @@
+import asyncio
+import httpx
+
+from agents.factory import LoopLocalTransport
+
+class RecordingPool(httpx.AsyncBaseTransport):
+    """Stand-in connection pool that remembers its loop and whether it was closed"""
+
+    def __init__(self):
+        self.loop = None
+        self.closed = False
+
+    async def handle_async_request(self, request):
+        loop = asyncio.get_running_loop()
+        assert self.loop in (None, loop), "pool used from a second event loop"
+        assert not self.closed, "pool used after it was closed"
+        self.loop = loop
+        return httpx.Response(200, json={"ok": True})
+
+    async def aclose(self):
+        self.closed = True
+
+def test_pool_per_event_loop():
+    """Each event loop gets its own pool; one loop closing its pool leaves the client usable"""
+    pools = []
+
+    def make_pool():
+        pools.append(RecordingPool())
+        return pools[-1]
+
+    transport = LoopLocalTransport(make_pool)
+    client = httpx.AsyncClient(transport=transport)
+
+    async def requests(close: bool):
+        for _ in range(3):
+            assert (await client.get("https://model.test/v1/models")).json() == {"ok": True}
+        if close:
+            await transport.aclose()
+
+    asyncio.run(requests(close=True))
+    assert len(pools) == 1 and pools[0].closed
+    asyncio.run(requests(close=False))
+    asyncio.run(requests(close=False))
+    assert len(pools) == 3 and len({id(pool.loop) for pool in pools}) == 3
+    assert len(transport._pools) == 1  # pools of closed loops are dropped
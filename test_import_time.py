@@ -0,0 +1,68 @@
+import sys
+import os
+import subprocess
+import json
+
+# Import-time budget for the agent and tool entry points. Cold start dominates
+# short-lived batch jobs, so importing an agent must not pull in the model
+# client, LangGraph, Playwright or the AWS SDKs - those load on first use.
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+
+# Cumulative import time budget per module, in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "150"))
+
+HEAVY_MODULES = [
+    "langchain_openai",
+    "langgraph",
+    "playwright",
+    "boto3",
+    "langchain_aws",
+    "bedrock_agentcore",
+    "pydantic_settings",
+]
+
+def measure_import(module: str):
+    """Import a module in a fresh interpreter and return (cumulative_us, loaded_modules)"""
+    code = (
+        "import sys, json; "
+        f"sys.path.insert(0, {SRC_DIR!r}); "
+        f"import {module}; "
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True
+    )
+
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return cumulative_us, loaded
+
+def _assert_light(module: str):
+    cumulative_us, loaded = measure_import(module)
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    assert not heavy, f"importing {module} eagerly loaded {heavy}"
+
+    elapsed_ms = cumulative_us / 1000
+    print(f"⏱️  import {module}: {elapsed_ms:.1f}ms (budget {IMPORT_BUDGET_MS:.0f}ms)")
+    assert elapsed_ms <= IMPORT_BUDGET_MS, f"import {module} took {elapsed_ms:.1f}ms"
+
+def test_browser_agent_import_is_light():
+    _assert_light("agents.browser_agent")
+
+def test_real_browser_agent_import_is_light():
+    _assert_light("agents.real_browser_agent")
+
+if __name__ == "__main__":
+    test_browser_agent_import_is_light()
+    test_real_browser_agent_import_is_light()
+    print("✅ Import budget respected")
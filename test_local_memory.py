@@ -0,0 +1,90 @@
+import time
+
+from memory.local_memory import LocalMemoryClient
+
+def test_sessions_are_partitioned():
+    client = LocalMemoryClient()
+    client.store("a", "Navigated to https://shop.test/checkout")
+    for i in range(5):
+        client.store("b", f"Navigated to https://news.test/{i}")
+    ids = {client.store("a", "Clicked checkout button")["id"], client.store("b", "Clicked menu")["id"]}
+    assert len(ids) == 2  # no key collisions across sessions
+
+    results = client.retrieve("a", query="checkout")
+    assert len(results) == 2
+    assert all("news.test" not in r["content"] for r in results)
+    assert client.retrieve("missing", query="checkout") == []
+
+def test_query_ranking_and_limit():
+    client = LocalMemoryClient()
+    client.store("s", "Filled the login form on example.com")
+    client.store("s", "Navigated to pricing page pricing plans pricing")
+    client.store("s", "Navigated to docs")
+    client.store("s", "Opened pricing")
+
+    results = client.retrieve("s", query="pricing", limit=1)
+    assert len(results) == 1
+    assert results[0]["content"].startswith("Navigated to pricing")
+    assert client.retrieve("s", query="unrelated words") == []
+
+    recent = client.retrieve("s", limit=2)
+    assert [r["content"] for r in recent] == ["Opened pricing", "Navigated to docs"]
+
+def test_ttl_eviction():
+    client = LocalMemoryClient(ttl_seconds=0.05)
+    client.store("s", "old visit to example.com")
+    time.sleep(0.1)
+    client.store("s", "new visit to example.com")
+    results = client.retrieve("s", query="example")
+    assert [r["content"] for r in results] == ["new visit to example.com"]
+
+def test_eviction_compacts_storage():
+    """A partition under steady TTL churn holds O(live) entries and keeps stable ids"""
+    client = LocalMemoryClient(ttl_seconds=60)
+    partition = client._partition("s")
+    now = 1000.0
+    for i in range(5000):
+        now += 1.0
+        with partition.lock:
+            partition.evict_expired(now)
+            partition.add(f"visit {i} to example.com", {}, now)
+        assert len(partition.records) <= 2 * 60 + 64
+        assert len(partition.doc_len) <= 4 * (2 * 60 + 64)
+    assert partition.size == 61  # stored at or after now - ttl
+    assert all(p.size <= len(partition.records) for p in partition.postings.values())
+
+    results = partition.search("visit 4990", 1)
+    assert results[0]["id"] == "s:4990" and results[0]["content"] == "visit 4990 to example.com"
+    assert [r["id"] for r in partition.recent(2)] == ["s:4999", "s:4998"]
+    assert partition.search("visit 100", 1)[0]["id"] != "s:100"  # evicted long ago
+
+def test_compression_round_trip():
+    content = "Navigated to https://example.com/ " * 50
+    for compress in (True, False):
+        client = LocalMemoryClient(enable_compression=compress)
+        client.store("s", content, {"url": "https://example.com/"})
+        stored = client.partitions["s"].records[0][0]
+        assert isinstance(stored, bytes) is compress
+        result = client.retrieve("s", query="example")[0]
+        assert result["content"] == content
+        assert result["metadata"] == {"url": "https://example.com/"}
+
+def test_retrieval_speed():
+    client = LocalMemoryClient()
+    n = 1_000_000
+    for start in range(0, n, 10000):
+        client.store_batch("s", [(f"Navigated to https://site{i % 500}.test/page/{i} step {i}", None)
+                                 for i in range(start, start + 10000)])
+
+    for query, expected in (("site42 page", "site42."), ("navigated to https", "Navigated to")):
+        client.retrieve("s", query=query, limit=5)
+        per_query_ms = float("inf")
+        for _ in range(3):  # best of three rounds, so a scheduler hiccup doesn't fail the run
+            start = time.perf_counter()
+            for _ in range(100):
+                results = client.retrieve("s", query=query, limit=5)
+            per_query_ms = min(per_query_ms, (time.perf_counter() - start) * 1000 / 100)
+        assert len(results) == 5
+        assert all(expected in r["content"] for r in results)
+        print(f"⏱️ {per_query_ms:.3f}ms per '{query}' query over 1M memories")
+        assert per_query_ms < 1
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+from memory.local_memory import LocalMemoryClient
+from memory.write_behind import MemoryWriteQueue, get_memory_write_queue, flush_memory_writes
+
+class SlowMemoryClient(LocalMemoryClient):
+    """Local client whose batch writes take a fixed time, like a remote backend"""
+
+    def __init__(self, delay_seconds):
+        super().__init__()
+        self.delay_seconds = delay_seconds
+        self.batch_sizes = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.stalled_sessions = set()  # their writes wait for the gate
+
+    def store_batch(self, session_id, items):
+        if not self.stalled_sessions or session_id in self.stalled_sessions:
+            self.gate.wait()
+        time.sleep(self.delay_seconds)
+        self.batch_sizes.append(len(items))
+        return super().store_batch(session_id, items)
+
+async def _puts_do_not_wait_for_backend():
+    client = SlowMemoryClient(delay_seconds=0.2)
+    queue = MemoryWriteQueue(client, batch_size=10, flush_interval_seconds=0.05)
+
+    start = time.perf_counter()
+    for i in range(25):
+        await queue.put("a", f"Navigated to https://a.test/{i}")
+    await queue.put("b", "Navigated to https://b.test/")
+    assert time.perf_counter() - start < 0.1  # nothing waited on the 0.2s store
+
+    await queue.flush()
+    assert queue.pending == 0
+    assert queue.stats["stored"] == 26
+    assert sorted(client.batch_sizes) == [1, 5, 10, 10]
+    # Per-session order is kept
+    recent = client.retrieve("a", limit=25)
+    assert [r["content"] for r in reversed(recent)] == [f"Navigated to https://a.test/{i}" for i in range(25)]
+    await queue.close()
+
+async def _time_threshold_flushes():
+    client = SlowMemoryClient(delay_seconds=0)
+    queue = MemoryWriteQueue(client, batch_size=100, flush_interval_seconds=0.05)
+    await queue.put("s", "Navigated to https://example.com/")
+    await asyncio.sleep(0.2)
+    assert client.batch_sizes == [1]
+    await queue.close()
+
+async def _backpressure_when_backend_lags():
+    client = SlowMemoryClient(delay_seconds=0)
+    client.gate.clear()  # backend stalls
+    queue = MemoryWriteQueue(client, batch_size=5, flush_interval_seconds=10, max_pending=10)
+    for i in range(10):
+        await queue.put("s", f"memory {i}")
+
+    blocked = asyncio.create_task(queue.put("s", "memory 10"))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    assert queue.stats["backpressure_waits"] == 1
+
+    client.gate.set()
+    await asyncio.wait_for(blocked, timeout=2)
+    await queue.close()
+    assert queue.stats["stored"] == 11
+
+async def _concurrent_writers_stay_under_max_pending():
+    client = SlowMemoryClient(delay_seconds=0.01)
+    client.gate.clear()
+    queue = MemoryWriteQueue(client, batch_size=2, flush_interval_seconds=10, max_pending=4)
+    for i in range(4):
+        await queue.put("s", f"memory {i}")
+    peak = []
+
+    async def writer(i):
+        await queue.put("s", f"late {i}")
+        peak.append(queue.pending)
+
+    writers = [asyncio.create_task(writer(i)) for i in range(10)]
+    await asyncio.sleep(0.05)
+    assert not any(w.done() for w in writers)
+    client.gate.set()
+    await asyncio.wait_for(asyncio.gather(*writers), timeout=5)
+    # A freed batch lets in only as many writers as there is room for
+    assert max(peak) <= 4
+    await queue.close()
+    assert queue.stats["stored"] == 14
+    assert queue.stats["backpressure_waits"] == 10
+
+async def _session_flush_skips_other_sessions():
+    client = SlowMemoryClient(delay_seconds=0)
+    client.stalled_sessions = {"slow"}
+    client.gate.clear()
+    queue = MemoryWriteQueue(client, batch_size=1, flush_interval_seconds=10)
+    await queue.put("slow", "stuck behind a slow backend")
+    await queue.put("fast", "Navigated to https://fast.test/")
+
+    await asyncio.wait_for(queue.flush("fast"), timeout=1)
+    assert [r["content"] for r in client.retrieve("fast")] == ["Navigated to https://fast.test/"]
+    flush_all = asyncio.create_task(queue.flush())
+    await asyncio.sleep(0.05)
+    assert not flush_all.done()  # a full flush still waits for every session
+
+    client.gate.set()
+    await asyncio.wait_for(flush_all, timeout=2)
+    await queue.close()
+
+async def _one_queue_per_client():
+    first, second = LocalMemoryClient(), LocalMemoryClient()
+    assert get_memory_write_queue(first) is get_memory_write_queue(first)
+    assert get_memory_write_queue(second) is not get_memory_write_queue(first)
+    assert get_memory_write_queue(second).client is second
+
+    await get_memory_write_queue(first).put("s", "written through the first client")
+    await get_memory_write_queue(second).put("s", "written through the second client")
+    await flush_memory_writes("s")
+    assert [r["content"] for r in first.retrieve("s")] == ["written through the first client"]
+    assert [r["content"] for r in second.retrieve("s")] == ["written through the second client"]
+    await get_memory_write_queue(first).close()
+    await get_memory_write_queue(second).close()
+
+def test_puts_do_not_wait_for_backend():
+    asyncio.run(_puts_do_not_wait_for_backend())
+
+def test_time_threshold_flushes():
+    asyncio.run(_time_threshold_flushes())
+
+def test_backpressure_when_backend_lags():
+    asyncio.run(_backpressure_when_backend_lags())
+
+def test_concurrent_writers_stay_under_max_pending():
+    asyncio.run(_concurrent_writers_stay_under_max_pending())
+
+def test_session_flush_skips_other_sessions():
+    asyncio.run(_session_flush_skips_other_sessions())
+
+def test_one_queue_per_client():
+    asyncio.run(_one_queue_per_client())
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from tools.navigation_scheduler import NavigationScheduler, domain_of
+
+def test_domain_of():
+    """Navigations are keyed by host, ignoring www. and scheme"""
+    assert domain_of("https://www.Example.com/a?b=1") == "example.com"
+    assert domain_of("http://example.com:8080/") == "example.com"
+    assert domain_of("about:blank") is None
+
+def test_concurrency_cap():
+    """No more than max_concurrency navigations to one domain run at once"""
+    async def run():
+        scheduler = NavigationScheduler(max_concurrency=2, rate_per_second=None)
+        active = peak = 0
+
+        async def navigate(i):
+            nonlocal active, peak
+            async with scheduler.slot(f"https://example.com/{i}", f"s{i}"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+        # Another domain is not held up by example.com's queue
+        async def other():
+            async with scheduler.slot("https://other.org/", "s-other") as waited:
+                return waited
+
+        results = await asyncio.wait_for(asyncio.gather(*(navigate(i) for i in range(6)), other()), 5)
+        assert peak == 2
+        assert results[-1] < 0.01
+        stats = scheduler.stats()["example.com"]
+        assert stats["granted"] == 6 and stats["active"] == 0 and stats["waiting"] == 0
+        assert stats["max_wait_seconds"] >= 0.04
+
+    asyncio.run(run())
+
+def test_token_bucket_rate():
+    """A burst goes through at once, then navigations are spaced by the rate"""
+    async def run():
+        scheduler = NavigationScheduler(max_concurrency=10, rate_per_second=20, burst=2)
+        started = []
+
+        async def navigate(i):
+            async with scheduler.slot("https://example.com/", "s"):
+                started.append(time.monotonic())
+
+        start = time.monotonic()
+        await asyncio.wait_for(asyncio.gather(*(navigate(i) for i in range(6))), 5)
+        offsets = [t - start for t in started]
+        assert offsets[1] < 0.02  # burst of 2
+        assert offsets[-1] >= 4 / 20 * 0.9  # remaining 4 at 20/s
+
+    asyncio.run(run())
+
+def test_fair_across_sessions():
+    """A session queueing many URLs does not starve a session that queues later"""
+    async def run():
+        scheduler = NavigationScheduler(max_concurrency=1, rate_per_second=None)
+        order = []
+
+        async def navigate(session_id, i):
+            async with scheduler.slot(f"https://example.com/{i}", session_id):
+                order.append(session_id)
+                await asyncio.sleep(0.01)
+
+        greedy = [asyncio.create_task(navigate("greedy", i)) for i in range(5)]
+        await asyncio.sleep(0)
+        polite = asyncio.create_task(navigate("polite", 0))
+        await asyncio.wait_for(asyncio.gather(*greedy, polite), 5)
+        assert order.index("polite") <= 2, order
+
+    asyncio.run(run())
+
+def test_cancelled_waiter_frees_its_turn():
+    """Cancelling a queued navigation neither leaks a slot nor blocks the queue"""
+    async def run():
+        scheduler = NavigationScheduler(max_concurrency=1, rate_per_second=None)
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("https://example.com/", "a"):
+                await release.wait()
+
+        async def navigate(session_id):
+            async with scheduler.slot("https://example.com/", session_id):
+                return session_id
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        doomed = asyncio.create_task(navigate("b"))
+        waiting = asyncio.create_task(navigate("c"))
+        await asyncio.sleep(0)
+        doomed.cancel()
+        release.set()
+        assert await asyncio.wait_for(waiting, 1) == "c"
+        await asyncio.wait_for(holder, 1)
+        assert scheduler.stats()["example.com"]["active"] == 0
+
+    asyncio.run(run())
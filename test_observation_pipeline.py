@@ -0,0 +1,117 @@
+import asyncio
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSite
+from config.settings import get_settings
+from tools.sessions import configure_session, close_browser_session
+from tools.observation import (
+    take_observations, observation_message_content, observation_stats, _pending
+)
+
+SITE = {
+    "https://obs.test/": """<html><head><title>Start</title></head><body><main>
+        <input name="q" placeholder="Search"> <a href="/next">Next step</a></main></body></html>""",
+    "https://obs.test/next": """<html><head><title>Next</title></head><body><main>
+        <button>Confirm</button> <div role="dialog"><p>Are you sure?</p></div></main></body></html>""",
+}
+
+def test_bundle_gathered_after_actions():
+    """Each action schedules a bundle of the page as it is afterwards; the latest one wins"""
+    async def run():
+        from tools.browser_tools import navigate_to_url, fill_input, click_element
+
+        settings = get_settings()
+        register_backend("fake-observe", FakeBackend(FakeSite(SITE)))
+        configure_session("obs", backend="fake-observe")
+        settings.observation_pipelining = True
+        try:
+            await navigate_to_url.ainvoke({"url": "https://obs.test/", "session_id": "obs"})
+            superseded = observation_stats["superseded"]
+            await asyncio.gather(
+                fill_input.ainvoke({"selector": "input[name=\"q\"]", "text": "pizza", "session_id": "obs"}),
+                click_element.ainvoke({"selector": "a", "session_id": "obs"})
+            )
+            assert observation_stats["superseded"] > superseded
+
+            bundles = await take_observations(["obs", "obs"])
+            assert len(bundles) == 1
+            bundle = bundles[0]
+            assert bundle["url"] == "https://obs.test/next" and bundle["title"] == "Next"
+            assert bundle["elements"] == [["button: Confirm", None]]
+            assert bundle["dialogs"] == ["Are you sure?"] and bundle["image"] is None
+
+            text = observation_message_content(bundles)[0]["text"]
+            assert "Next - https://obs.test/next" in text and "💬 Open dialog: Are you sure?" in text
+            assert "button: Confirm" in text
+
+            assert await take_observations(["obs"]) == []  # each bundle is used once
+        finally:
+            settings.observation_pipelining = False
+            await close_browser_session("obs")
+
+    asyncio.run(run())
+
+def test_close_drops_pending_bundle():
+    """Closing a session cancels and forgets the bundle being gathered for it"""
+    async def run():
+        from tools.browser_tools import navigate_to_url
+
+        settings = get_settings()
+        register_backend("fake-observe", FakeBackend(FakeSite(SITE)))
+        configure_session("obs-close", backend="fake-observe")
+        settings.observation_pipelining = True
+        try:
+            await navigate_to_url.ainvoke({"url": "https://obs.test/", "session_id": "obs-close"})
+            task = _pending["obs-close"]
+            await close_browser_session("obs-close")
+            assert "obs-close" not in _pending
+            await asyncio.sleep(0)
+            assert task.done()
+        finally:
+            settings.observation_pipelining = False
+            await close_browser_session("obs-close")
+
+    asyncio.run(run())
+
+def test_disabled_by_default():
+    """Without observation_pipelining no bundles are gathered"""
+    async def run():
+        from tools.browser_tools import navigate_to_url
+
+        register_backend("fake-observe", FakeBackend(FakeSite(SITE)))
+        configure_session("obs-off", backend="fake-observe")
+        try:
+            await navigate_to_url.ainvoke({"url": "https://obs.test/", "session_id": "obs-off"})
+            assert "obs-off" not in _pending
+            assert await take_observations(["obs-off"]) == []
+        finally:
+            await close_browser_session("obs-off")
+
+    asyncio.run(run())
+
+def test_agent_finds_bundles_of_calls_without_session_id():
+    """Tool calls without session_id run on "default", even when the agent's own session is another"""
+    async def run():
+        from langchain_core.messages import HumanMessage, AIMessage
+        from agents.factory import acted_sessions
+        from tools.browser_tools import navigate_to_url
+
+        settings = get_settings()
+        register_backend("fake-observe", FakeBackend(FakeSite(SITE)))
+        configure_session("default", backend="fake-observe")
+        settings.observation_pipelining = True
+        call = {"name": "navigate_to_url", "args": {"url": "https://obs.test/"}, "id": "call-1"}
+        state = {"messages": [HumanMessage(content="Open the start page"), AIMessage(content="", tool_calls=[call])],
+                 "browser_session_id": "task-7"}
+        try:
+            await navigate_to_url.ainvoke(call["args"])
+            assert acted_sessions(state) == ["default"]
+            bundles = await take_observations(acted_sessions(state))
+            assert [bundle["session_id"] for bundle in bundles] == ["default"]
+            assert bundles[0]["title"] == "Start"
+        finally:
+            settings.observation_pipelining = False
+            await close_browser_session("default")
+            configure_session("default", backend="")
+
+    asyncio.run(run())
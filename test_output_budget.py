@@ -0,0 +1,81 @@
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from tools.output_budget import (
+    fit_to_budget, count_tokens, budget_tool_messages, get_budget, token_ledger, TokenLedger
+)
+
+ELEMENTS = "📋 Found these elements:\n" + "\n".join(
+    [f"Button: 'Action number {i}'" for i in range(120)] + [f"Link: 'Article {i}'" for i in range(80)]
+)
+
+def test_short_results_untouched():
+    """Results within budget pass through unchanged"""
+    text = "✅ Successfully navigated to https://example.com. Page title: Example"
+    assert fit_to_budget(text, 800) == (text, count_tokens(text), count_tokens(text))
+
+def test_list_cut_to_budget():
+    """Long lists keep the header and whole leading lines and summarise what was cut"""
+    result, before, after = fit_to_budget(ELEMENTS, 200)
+    assert before > 200 and after <= 200
+    lines = result.split("\n")
+    assert lines[0] == "📋 Found these elements:"
+    assert lines[1] == "Button: 'Action number 0'"
+    assert "lines cut" in result and "Link: 79" in result
+    assert fit_to_budget(ELEMENTS, 200) == (result, before, after)  # deterministic
+
+def test_footer_kept():
+    """The last line (e.g. a status footer) survives truncation"""
+    text = "🌐 Visited 200 pages:\n" + "\n".join(f"Page {i} " * 20 for i in range(200)) + \
+        "\n✅ Done: 200 succeeded, 0 failed"
+    result, _, after = fit_to_budget(text, 300)
+    assert after <= 300
+    assert result.endswith("✅ Done: 200 succeeded, 0 failed")
+
+def test_content_cursor_resumes_at_cut():
+    """A cut content chunk ends its header and cursor at the first character left out"""
+    content = "\n".join(f"Paragraph {i} " * 20 for i in range(200))
+    for footer in ("➡️ More content available: call again with cursor=40000", "✅ End of content"):
+        text = f"📄 Content chars 0-{len(content)} of 90000:\n{content}\n{footer}"
+        result, _, after = fit_to_budget(text, 300)
+        assert after <= 300
+        lines = result.split("\n")
+        cursor = int(lines[-1].rsplit("cursor=", 1)[1])
+        assert lines[-1] == f"➡️ More content available: call again with cursor={cursor}"
+        assert lines[0] == f"📄 Content chars 0-{cursor} of 90000:"
+        assert content[:cursor].rstrip("\n") == "\n".join(lines[1:-2])  # nothing skipped
+        assert content[cursor:].startswith("Paragraph ")
+
+    text = "📄 Content chars 100-20100 of 90000:\n" + "x" * 20000 + "\n✅ End of content"
+    result, _, after = fit_to_budget(text, 300)
+    cursor = int(result.rsplit("cursor=", 1)[1])
+    assert after <= 300 and 100 < cursor < 20100  # a single long line still moves forward
+    assert result.split("\n")[1] == "x" * (cursor - 100)
+
+def test_errors_lose_call_logs():
+    """Error results drop Playwright call logs and are held to the error budget"""
+    text = ("❌ Error clicking button.go: Timeout 5000ms exceeded.\nCall log:\n"
+            + "\n".join(f"  - waiting for locator('button.go') attempt {i}" for i in range(100)))
+    result, before, after = fit_to_budget(text, 800)
+    assert result == "❌ Error clicking button.go: Timeout 5000ms exceeded."
+    assert after < before
+
+    long_line = "❌ Error: " + "x" * 5000
+    result, _, after = fit_to_budget(long_line, 800)
+    assert after <= 150 and "tokens omitted" in result
+
+def test_tool_messages_and_ledger():
+    """Tool messages are cut in place and their tokens land in the ledger per prompt"""
+    big = ToolMessage(content=ELEMENTS, name="get_page_elements", tool_call_id="call-elements")
+    small = ToolMessage(content="👆 Successfully clicked element: #go", name="click_element",
+                        tool_call_id="call-click")
+    budget_tool_messages([big, small])
+    assert count_tokens(big.content) <= get_budget("get_page_elements")
+    assert small.content == "👆 Successfully clicked element: #go"
+    assert token_ledger.totals["get_page_elements"]["truncated"] >= 1
+
+    ledger = TokenLedger()
+    ledger.record_result("call-elements", "get_page_elements", count_tokens(big.content), 9999)
+    messages = [HumanMessage(content="task"), AIMessage(content=""), big, small, big]
+    by_tool = ledger.record_prompt("s1", messages)
+    assert by_tool["get_page_elements"] == 2 * count_tokens(big.content)
+    assert by_tool["click_element"] == count_tokens(small.content)
+    assert list(ledger.prompts["s1"]) == [by_tool]
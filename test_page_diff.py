@@ -0,0 +1,90 @@
+import asyncio
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSite, FakeSession, FakePage
+from tools.sessions import configure_session, close_browser_session
+from tools.page_diff import diff_snapshots, format_diff
+
+SHOP = """<html><head><title>Shop</title></head><body>
+<main>
+ <h1>Pizza shop</h1>
+ <p>Pick a size and sign up for the newsletter.</p>
+ <input name="email" placeholder="Email">
+ <button id="open">Show offers</button>
+ <div role="dialog" hidden><p>20% off today only</p><button id="close">Close</button></div>
+ <a href="https://shop.test/menu">Menu</a>
+</main>
+</body></html>"""
+
+MENU = """<html><head><title>Menu</title></head><body>
+<main><h1>Menu</h1><p>Margherita</p><p>Pepperoni</p><a href="https://shop.test/">Back</a></main>
+</body></html>"""
+
+class DialogBackend(FakeBackend):
+    """Fake backend whose #open button reveals the offers dialog"""
+
+    name = "fake-dialogs"
+
+    async def launch(self, session_id, storage_state=None):
+        class DialogPage(FakePage):
+            async def click(self, selector, timeout_ms=5000):
+                if selector == "#open":
+                    self._first('[role="dialog"]').attrs.pop("hidden", None)
+                    return
+                await super().click(selector, timeout_ms)
+
+        class DialogSession(FakeSession):
+            async def new_page(self):
+                page = DialogPage(self)
+                self.pages.append(page)
+                return page
+
+        return DialogSession(self.site, storage_state)
+
+def test_diff_formatting():
+    """Only what changed is reported"""
+    before = {"url": "u", "title": "T", "elements": [["button: Go", None], ["text: q", ""]],
+              "text": ["Results", "none yet"], "dialogs": []}
+    after = {"url": "u", "title": "T", "elements": [["button: Go", None], ["text: q", "pizza"], ["link: Next", None]],
+             "text": ["Results", "3 pizzas found"], "dialogs": []}
+    result = format_diff(diff_snapshots(before, after))
+    assert "✏️ Changed: text: q '' → 'pizza'" in result
+    assert "➕ New: link: Next" in result and "Gone" not in result
+    assert "  3 pizzas found" in result and "1 text lines disappeared" in result
+    assert format_diff(diff_snapshots(before, before)) == "🔄 No visible page changes"
+
+def test_click_and_fill_report_changes():
+    """Tools append a compact diff of the page after each action"""
+    async def run():
+        from tools.browser_tools import navigate_to_url, click_element, fill_input
+
+        register_backend("fake-dialogs", DialogBackend(FakeSite({"https://shop.test/": SHOP,
+                                                                 "https://shop.test/menu": MENU})))
+        configure_session("diff", backend="fake-dialogs")
+        try:
+            await navigate_to_url.ainvoke({"url": "https://shop.test/", "session_id": "diff"})
+
+            result = await fill_input.ainvoke({"selector": "input[name=\"email\"]", "text": "a@b.c", "session_id": "diff"})
+            assert "✏️ Changed: text: email '' → 'a@b.c'" in result, result
+
+            result = await click_element.ainvoke({"selector": "#open", "session_id": "diff"})
+            assert "💬 Dialog opened: 20% off today only Close" in result, result
+            assert "➕ New: button: Close" in result and "20% off today only" in result
+
+            result = await click_element.ainvoke({"selector": "#close", "session_id": "diff"})
+            assert result.endswith("🔄 No visible page changes"), result
+
+            result = await click_element.ainvoke({"selector": "a", "session_id": "diff"})
+            assert "🌐 URL: https://shop.test/ → https://shop.test/menu" in result
+            assert "📰 Title: 'Shop' → 'Menu'" in result and "📄 New page: 1 controls" in result
+            assert "➕" not in result  # a new page is summarised, not listed
+
+            from tools.sessions import get_browser_session
+            session = await get_browser_session("diff")
+            session['page'].js_dialogs.append("alert: Item added")
+            result = await click_element.ainvoke({"selector": "h1", "session_id": "diff"})
+            assert "💬 Dialog opened: alert: Item added" in result, result
+        finally:
+            await close_browser_session("diff")
+
+    asyncio.run(run())
@@ -0,0 +1,148 @@
+import asyncio
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSite
+from config.settings import get_settings
+from tools.sessions import configure_session, close_browser_session, get_browser_session
+from tools import prefetch
+from tools.prefetch import rank_targets, schedule_prefetch, prefetch_stats, prefetch_report
+
+HOME = """<html><head><title>Pizza Place</title></head><body>
+<nav><a href="/about">About us</a> <a href="/logout">Log out</a></nav>
+<main>
+ <a href="/menu/pepperoni">Pepperoni pizza</a>
+ <a href="/menu/margherita">Margherita</a>
+ <a href="/menu/pepperoni#reviews">Pepperoni reviews</a>
+ <a href="/cart/delete?item=1">Remove pepperoni</a>
+ <form action="/search" method="get"><input name="q"><button>Search</button></form>
+</main>
+</body></html>"""
+
+SITE = {
+    "https://pizza.test/": HOME,
+    "https://pizza.test/menu/pepperoni": "<html><head><title>Pepperoni</title></head><body><main>$12</main></body></html>",
+    "https://pizza.test/menu/margherita": '<html><head><title>Margherita</title></head><body><main>$10 <a href="/">Back</a></main></body></html>',
+}
+
+TASK = "Find the price of a pepperoni pizza on https://pizza.test/"
+
+def test_rank_targets():
+    """Links sharing words with the task come first; state-changing links are never picked"""
+    targets = [
+        {"kind": "link", "text": "About us", "url": "https://pizza.test/about"},
+        {"kind": "link", "text": "Log out", "url": "https://pizza.test/logout"},
+        {"kind": "link", "text": "Margherita", "url": "https://pizza.test/menu/margherita"},
+        {"kind": "link", "text": "Pepperoni pizza", "url": "https://pizza.test/menu/pepperoni"},
+        {"kind": "link", "text": "Remove pepperoni", "url": "https://pizza.test/cart/delete?item=1"},
+        {"kind": "form", "text": "Search", "url": "https://pizza.test/search"},
+        {"kind": "link", "text": "Pizza home", "url": "https://pizza.test/#top"},
+    ]
+    assert rank_targets(targets, TASK, "https://pizza.test/", limit=3) == [
+        "https://pizza.test/menu/pepperoni", "https://pizza.test/search"
+    ]
+
+async def _prefetch_round(session_id: str):
+    schedule_prefetch([session_id], TASK)
+    await prefetch._rounds[session_id]
+    session = await get_browser_session(session_id)
+    state = session['prefetch']
+    await asyncio.gather(*(warm.task for warm in state.tabs.values()))
+    return session, state
+
+def test_navigation_adopts_prefetched_tab():
+    """A navigation to a prefetched URL takes over the warm tab; others load as usual"""
+    async def run():
+        from tools.browser_tools import navigate_to_url
+
+        settings = get_settings()
+        register_backend("fake-prefetch", FakeBackend(FakeSite(SITE)))
+        configure_session("pf", backend="fake-prefetch")
+        settings.prefetch_enabled = True
+        try:
+            await navigate_to_url.ainvoke({"url": "https://pizza.test/", "session_id": "pf"})
+            session, state = await _prefetch_round("pf")
+            assert list(state.tabs) == ["https://pizza.test/menu/pepperoni", "https://pizza.test/search"]
+            slots = session['tab_slots']._value
+
+            hits = prefetch_stats["hits"]
+            result = await navigate_to_url.ainvoke({"url": "https://pizza.test/menu/pepperoni", "session_id": "pf"})
+            assert "Page title: Pepperoni" in result
+            assert prefetch_stats["hits"] == hits + 1
+            assert session['page'].url == "https://pizza.test/menu/pepperoni"
+            assert session['tab_slots']._value == slots + 1  # the adopted tab no longer counts as extra
+
+            misses = prefetch_stats["misses"]
+            await navigate_to_url.ainvoke({"url": "https://pizza.test/menu/margherita", "session_id": "pf"})
+            assert prefetch_stats["misses"] == misses + 1
+            assert 0 < prefetch_report()["hit_rate"] < 1
+
+            # The search tab is no longer likely from this page and is closed
+            await _prefetch_round("pf")
+            assert not state.tabs and session['tab_slots']._value == settings.max_tabs_per_session
+        finally:
+            settings.prefetch_enabled = False
+            await close_browser_session("pf")
+
+    asyncio.run(run())
+
+def test_bandwidth_cap():
+    """Once a session's prefetches hit the byte budget, no further pages are prefetched"""
+    async def run():
+        from tools.browser_tools import navigate_to_url
+
+        settings = get_settings()
+        register_backend("fake-prefetch", FakeBackend(FakeSite(SITE)))
+        configure_session("pf-cap", backend="fake-prefetch")
+        settings.prefetch_enabled = True
+        settings.prefetch_max_bytes_per_minute = 1
+        try:
+            await navigate_to_url.ainvoke({"url": "https://pizza.test/", "session_id": "pf-cap"})
+            skipped = prefetch_stats["skipped_bandwidth"]
+            _, state = await _prefetch_round("pf-cap")
+            assert list(state.tabs) == ["https://pizza.test/menu/pepperoni"]
+            assert prefetch_stats["skipped_bandwidth"] == skipped + 1
+        finally:
+            settings.prefetch_enabled = False
+            settings.prefetch_max_bytes_per_minute = 5_000_000
+            await close_browser_session("pf-cap")
+
+    asyncio.run(run())
+
+def test_failed_and_in_flight_tabs_cleaned_up():
+    """A tab whose load failed is closed and retried; closing the session cancels loads in flight"""
+    async def run():
+        from tools.browser_tools import navigate_to_url
+        from tools.prefetch import WarmTab
+
+        settings = get_settings()
+        register_backend("fake-prefetch", FakeBackend(FakeSite(SITE)))
+        configure_session("pf-clean", backend="fake-prefetch")
+        settings.prefetch_enabled = True
+
+        async def failed_load():
+            return False
+
+        try:
+            await navigate_to_url.ainvoke({"url": "https://pizza.test/", "session_id": "pf-clean"})
+            session = await get_browser_session("pf-clean")
+            state = prefetch._state(session)
+            await session['tab_slots'].acquire()
+            broken = WarmTab("https://pizza.test/menu/pepperoni", await session['browser'].new_page())
+            broken.task = asyncio.create_task(failed_load())
+            await broken.task
+            state.tabs[broken.url] = broken
+
+            await _prefetch_round("pf-clean")
+            assert state.tabs[broken.url] is not broken and await state.tabs[broken.url].task
+            assert session['tab_slots']._value == settings.max_tabs_per_session - len(state.tabs)
+
+            stuck = WarmTab("https://pizza.test/slow", await session['browser'].new_page())
+            stuck.task = asyncio.create_task(asyncio.sleep(60))
+            state.tabs[stuck.url] = stuck
+        finally:
+            settings.prefetch_enabled = False
+            await close_browser_session("pf-clean")
+        await asyncio.sleep(0)
+        assert stuck.task.cancelled() and not state.tabs
+
+    asyncio.run(run())
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from tools.session_reaper import SessionReaper, reaper_stats, CPU_STRIKES_TO_REAP
+
+MB = 1024 * 1024
+
+class FakePsutil:
+    """psutil stand-in reporting the RSS and CPU set per pid"""
+
+    class NoSuchProcess(Exception):
+        pass
+
+    class AccessDenied(Exception):
+        pass
+
+    def __init__(self):
+        self.rss = {}
+        self.cpu = {}
+        self.threads = set()  # threads the sampling ran on
+        fake = self
+
+        class Process:
+            def __init__(self, pid):
+                if pid not in fake.rss:
+                    raise FakePsutil.NoSuchProcess(pid)
+                self.pid = pid
+
+            def memory_info(self):
+                fake.threads.add(threading.get_ident())
+                return SimpleNamespace(rss=fake.rss[self.pid])
+
+            def cpu_percent(self, interval=None):
+                return fake.cpu.get(self.pid, 0.0)
+
+        self.Process = Process
+
+class FakeBrowser:
+    def __init__(self, pids):
+        self.pids = pids
+
+    def process_ids(self):
+        return list(self.pids)
+
+class FakeRegistry:
+    """Just the parts of SessionRegistry the reaper uses"""
+
+    def __init__(self):
+        self._entries = {}
+        self.closed = []
+
+    def add(self, session_id, pids=(), age=0.0, idle=0.0, refcount=0):
+        now = time.monotonic()
+        entry = SimpleNamespace(session_id=session_id, session={'browser': FakeBrowser(pids)},
+                                refcount=refcount, closing=False,
+                                created_at=now - age, last_used=now - idle)
+        self._entries[session_id] = entry
+        return entry
+
+    def entries(self):
+        return list(self._entries.values())
+
+    async def close(self, session_id, keep_options=False):
+        assert keep_options  # a reaped session is recreated as configured
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+        entry.closing = True
+        self.closed.append(session_id)
+        return True
+
+def make_reaper(registry, psutil=None, idle=600.0, max_age=3600.0, max_rss_mb=None, max_cpu=None):
+    reaper = SessionReaper(registry, interval_seconds=60)
+    reaper.idle_ttl_seconds = idle
+    reaper.max_age_seconds = max_age
+    reaper.max_rss_bytes = max_rss_mb * MB if max_rss_mb else None
+    reaper.max_cpu_percent = max_cpu
+    reaper._psutil = psutil
+    reaper._psutil_checked = True
+    return reaper
+
+def test_idle_sessions_are_reaped():
+    registry = FakeRegistry()
+    registry.add("idle", idle=700)
+    registry.add("busy", idle=700, refcount=1)  # a tool call is still running on it
+    registry.add("fresh", idle=10)
+    before = dict(reaper_stats)
+
+    reaped = asyncio.run(make_reaper(registry).reap_once())
+    assert reaped == ["idle"]
+    assert reaper_stats["reaped_idle"] == before["reaped_idle"] + 1
+    assert reaper_stats["reaped_sessions"] == before["reaped_sessions"] + 1
+
+def test_max_age_waits_until_session_is_free():
+    registry = FakeRegistry()
+    registry.add("old", age=4000)
+    in_use = registry.add("old-in-use", age=4000, refcount=1)
+    registry.add("young", age=100)
+    reaper = make_reaper(registry)
+    before = reaper_stats["reaped_max_age"]
+
+    assert asyncio.run(reaper.reap_once()) == ["old"]
+    in_use.refcount = 0
+    assert asyncio.run(reaper.reap_once()) == ["old-in-use"]
+    assert reaper_stats["reaped_max_age"] == before + 2
+    assert "young" not in registry.closed
+
+def test_rss_budget_sums_the_process_tree():
+    psutil = FakePsutil()
+    psutil.rss = {1: 600 * MB, 2: 600 * MB, 3: 100 * MB}
+    registry = FakeRegistry()
+    registry.add("heavy", pids=[1, 2])
+    registry.add("light", pids=[3])
+    registry.add("gone", pids=[99])  # exited processes are skipped
+    before = dict(reaper_stats)
+
+    reaped = asyncio.run(make_reaper(registry, psutil, max_rss_mb=1024).reap_once())
+    assert reaped == ["heavy"]
+    assert reaper_stats["reaped_rss"] == before["reaped_rss"] + 1
+    assert reaper_stats["reclaimed_rss_bytes"] == before["reclaimed_rss_bytes"] + 1200 * MB
+    # Sampling ran off the event loop's thread
+    assert psutil.threads and threading.get_ident() not in psutil.threads
+
+def test_cpu_budget_needs_consecutive_strikes():
+    psutil = FakePsutil()
+    psutil.rss = {1: MB, 2: MB}
+    psutil.cpu = {1: 95.0, 2: 95.0}
+    registry = FakeRegistry()
+    registry.add("spinning", pids=[1])
+    registry.add("bursty", pids=[2])
+    reaper = make_reaper(registry, psutil, max_cpu=80.0)
+    before = reaper_stats["reaped_cpu"]
+
+    async def run():
+        reaped = []
+        # The first sample only primes psutil's CPU delta
+        for round_ in range(CPU_STRIKES_TO_REAP + 1):
+            if round_ == 2:
+                psutil.cpu[2] = 5.0  # a quiet sample resets the strikes
+            elif round_ == 3:
+                psutil.cpu[2] = 95.0
+            reaped.append(await reaper.reap_once())
+        return reaped
+
+    assert asyncio.run(run()) == [[], [], [], ["spinning"]]
+    assert reaper_stats["reaped_cpu"] == before + 1
+    assert reaper._cpu_strikes == {"bursty": 1}
+
+def test_without_psutil_only_time_budgets_apply():
+    registry = FakeRegistry()
+    registry.add("s", pids=[1], idle=10)
+    reaper = make_reaper(registry, psutil=None, max_rss_mb=1, max_cpu=1.0)
+    assert asyncio.run(reaper.reap_once()) == []
+    assert reaper.measure([1]) == {"rss_bytes": 0, "cpu_percent": 0.0}
@@ -0,0 +1,149 @@
+import asyncio
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend
+from tools.sessions import SessionRegistry
+
+class CountingBackend(FakeBackend):
+    """Fake backend with a slow launch that counts launches and closes"""
+    
+    name = "counting"
+    
+    def __init__(self):
+        super().__init__()
+        self.launches = 0
+        self.closes = 0
+    
+    async def launch(self, session_id, storage_state=None):
+        self.launches += 1
+        await asyncio.sleep(0.05)  # long enough for every caller to race
+        session = await super().launch(session_id, storage_state)
+        original_close = session.close
+        
+        async def close():
+            self.closes += 1
+            await original_close()
+        
+        session.close = close
+        return session
+
+async def _concurrent_creation():
+    backend = CountingBackend()
+    register_backend("counting", backend)
+    registry = SessionRegistry()
+    
+    async def tool_call(i):
+        async with registry.scope("shared", backend="counting") as session:
+            await session['page'].goto(f"https://race.test/{i}")
+            return session['browser']
+    
+    browsers = await asyncio.wait_for(asyncio.gather(*(tool_call(i) for i in range(200))), 10)
+    assert backend.launches == 1
+    assert len({id(b) for b in browsers}) == 1
+    
+    await registry.close("shared")
+    await registry.close("shared")
+    assert backend.closes == 1
+    assert "shared" not in registry
+
+async def _close_waits_for_in_flight_calls():
+    backend = CountingBackend()
+    register_backend("counting", backend)
+    registry = SessionRegistry()
+    in_tool = asyncio.Event()
+    finish_tool = asyncio.Event()
+    
+    async def slow_tool():
+        async with registry.scope("s", backend="counting"):
+            in_tool.set()
+            await finish_tool.wait()
+            return backend.closes
+    
+    tool_task = asyncio.create_task(slow_tool())
+    await asyncio.wait_for(in_tool.wait(), 5)
+    close_task = asyncio.create_task(registry.close("s"))
+    await asyncio.sleep(0.01)
+    assert backend.closes == 0  # still in use
+    
+    finish_tool.set()
+    assert await asyncio.wait_for(tool_task, 5) == 0
+    await asyncio.wait_for(close_task, 5)
+    assert backend.closes == 1
+
+async def _failed_setup_closes_browser():
+    from tools import session_reaper
+    backend = CountingBackend()
+    register_backend("counting", backend)
+    registry = SessionRegistry()
+    
+    def broken_reaper(registry):
+        raise RuntimeError("reaper unavailable")
+    
+    original = session_reaper.ensure_reaper_running
+    session_reaper.ensure_reaper_running = broken_reaper
+    try:
+        await registry.get("broken", backend="counting")
+        assert False, "session setup should have failed"
+    except RuntimeError:
+        pass
+    finally:
+        session_reaper.ensure_reaper_running = original
+    assert backend.launches == 1 and backend.closes == 1
+    assert "broken" not in registry
+
+async def _caller_woken_after_close_gets_fresh_session():
+    backend = CountingBackend()
+    register_backend("counting", backend)
+    registry = SessionRegistry()
+    
+    async def tool_call():
+        async with registry.scope("r", backend="counting") as session:
+            return session['browser'].closed
+    
+    # Wake-up order once the launch finishes: the first getter, close(), then
+    # the tool call, which must not act on the session close() just took down
+    first = asyncio.create_task(registry.get("r", backend="counting"))
+    await asyncio.sleep(0)
+    closing = asyncio.create_task(registry.close("r"))
+    await asyncio.sleep(0)
+    caller = asyncio.create_task(tool_call())
+    
+    assert (await asyncio.wait_for(first, 5))['browser'].closed
+    assert await asyncio.wait_for(closing, 5)
+    assert await asyncio.wait_for(caller, 5) is False
+    assert backend.launches == 2 and backend.closes == 1
+    assert "r" in registry
+    await registry.close("r")
+
+async def _close_forgets_configured_options():
+    register_backend("counting", CountingBackend())
+    registry = SessionRegistry()
+    
+    registry.configure("o", backend="counting", storage_profile="shop")
+    await registry.get("o")
+    await registry.close("o")
+    assert "o" not in registry._options
+    
+    registry.configure("never-started", backend="counting")
+    assert not await registry.close("never-started")
+    assert not registry._options
+    
+    registry.configure("reaped", backend="counting")
+    await registry.get("reaped")
+    await registry.close("reaped", keep_options=True)
+    assert registry._options == {"reaped": {"backend": "counting"}}
+
+def test_concurrent_creation_is_single_flight():
+    asyncio.run(_concurrent_creation())
+
+def test_close_waits_for_in_flight_calls():
+    asyncio.run(_close_waits_for_in_flight_calls())
+
+def test_failed_setup_closes_browser():
+    asyncio.run(_failed_setup_closes_browser())
+
+def test_caller_woken_after_close_gets_fresh_session():
+    asyncio.run(_caller_woken_after_close_gets_fresh_session())
+
+def test_close_forgets_configured_options():
+    asyncio.run(asyncio.wait_for(_close_forgets_configured_options(), 10))
@@ -0,0 +1,88 @@
+import asyncio
+from urllib.parse import urlparse, parse_qsl
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSite
+from tools.sessions import configure_session, close_browser_session
+
+# The httpbin.org/forms/post form used in the demos (method switched to GET so
+# the fake backend shows the submitted values in the URL)
+HTTPBIN_FORM = """<html><head><title>httpbin form</title></head><body>
+<form method="get" action="/post">
+ <p><label>Customer name: <input name="custname"></label></p>
+ <p><label>Telephone: <input type=tel name="custtel"></label></p>
+ <p><label>E-mail address: <input type=email name="custemail"></label></p>
+ <fieldset>
+  <legend> Pizza Size </legend>
+  <p><label> <input type=radio name=size value="small"> Small </label></p>
+  <p><label> <input type=radio name=size value="medium"> Medium </label></p>
+  <p><label> <input type=radio name=size value="large"> Large </label></p>
+ </fieldset>
+ <fieldset>
+  <legend> Pizza Toppings </legend>
+  <p><label> <input type=checkbox name="topping" value="bacon"> Bacon </label></p>
+  <p><label> <input type=checkbox name="topping" value="cheese"> Extra Cheese </label></p>
+  <p><label> <input type=checkbox name="topping" value="onion"> Onion </label></p>
+  <p><label> <input type=checkbox name="topping" value="mushroom"> Mushroom </label></p>
+ </fieldset>
+ <p><label>Preferred delivery time: <input type=time min="11:00" max="21:00" step="900" name="delivery"></label></p>
+ <p><label>Delivery instructions: <textarea name="comments"></textarea></label></p>
+ <p><button>Submit order</button></p>
+</form>
+</body></html>"""
+
+FORM_URL = "https://httpbin.test/forms/post"
+
+async def _fill_whole_form_in_one_call():
+    from tools.real_browser_tools import navigate_to_url, smart_fill_form, smart_click
+    
+    register_backend("fake-forms", FakeBackend(FakeSite({FORM_URL: HTTPBIN_FORM})))
+    configure_session("form", backend="fake-forms")
+    await navigate_to_url.ainvoke({"url": FORM_URL, "session_id": "form"})
+    
+    result = await smart_fill_form.ainvoke({"session_id": "form", "fields": {
+        "customer name": "John Doe",
+        "telephone": "555-1234",
+        "email": "john@example.com",
+        "pizza size": "Medium",
+        "toppings": "Bacon, Extra Cheese",
+        "delivery time": "19:30",
+        "delivery instructions": "Ring twice",
+        "coupon code": "SAVE10"
+    }})
+    assert "Filled 7/8 fields" in result, result
+    assert "❌ coupon code: no matching field found" in result
+    
+    await smart_click.ainvoke({"description": "submit button", "session_id": "form"})
+    from tools.sessions import get_browser_session
+    page = (await get_browser_session("form"))['page']
+    submitted = parse_qsl(urlparse(page.url).query)
+    assert submitted == [
+        ("custname", "John Doe"), ("custtel", "555-1234"), ("custemail", "john@example.com"),
+        ("size", "medium"), ("topping", "bacon"), ("topping", "cheese"),
+        ("delivery", "19:30"), ("comments", "Ring twice")
+    ]
+    await close_browser_session("form")
+
+async def _checkbox_by_description_and_select():
+    html = """<html><body><form>
+    <label for="country">Country</label>
+    <select id="country" name="country"><option value="us">United States</option><option value="de">Germany</option></select>
+    <label><input type="checkbox" name="terms"> I accept the terms</label>
+    </form></body></html>"""
+    session = await FakeBackend(FakeSite({"https://f.test/": html})).launch("f")
+    page = await session.new_page()
+    await page.goto("https://f.test/")
+    
+    results = await page.fill_form({"country": "germany", "accept terms": "yes", "size": "XL"})
+    assert [r["status"] for r in results] == ["filled", "filled", "not_found"]
+    assert results[0]["target"] == 'select[name="country"]'
+    
+    results = await page.fill_form({"country": "France"})
+    assert results[0]["status"] == "no_matching_option"
+
+def test_fill_whole_form_in_one_call():
+    asyncio.run(_fill_whole_form_in_one_call())
+
+def test_checkbox_by_description_and_select():
+    asyncio.run(_checkbox_by_description_and_select())
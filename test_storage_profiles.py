@@ -0,0 +1,105 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from config.settings import get_settings
+from tools import storage_profiles
+from tools.storage_profiles import (
+    load_storage_state, save_storage_state, invalidate_storage_state, profile_path
+)
+from tools.sessions import configure_session, session_scope, close_browser_session
+
+STATE = {
+    "cookies": [{"name": "sid", "value": "abc123", "domain": "shop.test", "path": "/"}],
+    "origins": [{"origin": "https://shop.test", "localStorage": [{"name": "cart", "value": "3"}]}]
+}
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "storage_state_dir", str(tmp_path))
+    return tmp_path
+
+def test_save_load_round_trip(profile_dir):
+    path = save_storage_state("shop login", STATE)
+    assert path == profile_path("shop login")
+    assert os.path.dirname(path) == str(profile_dir)
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert load_storage_state("shop login") == STATE
+    assert load_storage_state("missing") is None
+
+def test_expired_profiles_are_dropped(monkeypatch):
+    save_storage_state("short", STATE, ttl_seconds=60)
+    save_storage_state("long", STATE)
+    later = storage_profiles.time.time() + 120
+    monkeypatch.setattr(storage_profiles.time, "time", lambda: later)
+
+    assert load_storage_state("short") is None
+    assert not os.path.exists(profile_path("short"))
+    assert load_storage_state("long") == STATE  # default TTL is hours
+
+def test_invalidate():
+    save_storage_state("shop", STATE)
+    assert invalidate_storage_state("shop") is True
+    assert load_storage_state("shop") is None
+    assert invalidate_storage_state("shop") is False
+
+def test_failed_write_keeps_previous_profile(profile_dir, monkeypatch):
+    save_storage_state("shop", STATE)
+
+    def broken_dump(entry, f):
+        f.write('{"profile": "shop", "sta')  # the process dies mid-write
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patched, pytest.raises(OSError):
+        patched.setattr(storage_profiles.json, "dump", broken_dump)
+        save_storage_state("shop", {"cookies": [], "origins": []})
+
+    assert load_storage_state("shop") == STATE
+    assert not [name for name in os.listdir(profile_dir) if name.endswith(".tmp")]
+
+def test_readers_never_see_a_partial_write():
+    states = [{"cookies": [{"name": "n", "value": str(i) * 2000}], "origins": []} for i in range(10)]
+    save_storage_state("busy", states[0])
+    seen = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            seen.append(load_storage_state("busy"))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        for _ in range(20):
+            for state in states:
+                save_storage_state("busy", state)
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+    assert seen and all(state in states for state in seen)
+
+def test_unreadable_profile_is_ignored():
+    os.makedirs(get_settings().storage_state_dir, exist_ok=True)
+    with open(profile_path("corrupt"), "w") as f:
+        f.write("{not json")
+    assert load_storage_state("corrupt") is None
+
+async def _restore_into_session():
+    configure_session("profile-configured", storage_profile="shop", backend="fake")
+    try:
+        async with session_scope("profile-configured") as session:
+            assert session['storage_profile'] == "shop"
+            assert await session['browser'].storage_state() == STATE
+        async with session_scope("profile-explicit", storage_profile="shop", backend="fake") as session:
+            assert await session['browser'].storage_state() == STATE
+        async with session_scope("profile-missing", storage_profile="nobody", backend="fake") as session:
+            assert await session['browser'].storage_state() == {"cookies": [], "origins": []}
+    finally:
+        for session_id in ("profile-configured", "profile-explicit", "profile-missing"):
+            await close_browser_session(session_id)
+
+def test_profile_restored_into_new_session():
+    save_storage_state("shop", STATE)
+    asyncio.run(asyncio.wait_for(_restore_into_session(), 10))
@@ -0,0 +1,172 @@
+import os
+import asyncio
+import json
+import tempfile
+
+import pytest
+
+from backends.fake_backend import FakeBackend, FakeSite
+from config.settings import get_settings
+from tools import extraction
+from tools.extraction import extract_pages, format_extraction
+
+def _product_page(page_number, pages=3, per_page=4):
+    cards = "".join(
+        f'<div class="product-card"><h2 class="name">Widget {page_number}-{i}</h2>'
+        f'<span class="price">${i}.99</span><a href="/p/{page_number}-{i}">Details</a></div>'
+        for i in range(per_page)
+    )
+    next_link = f'<a href="/products?page={page_number + 1}">Next ›</a>' if page_number < pages else ""
+    return f"""<html><head><title>Products</title></head><body>
+<nav><a href="/">Home</a><a href="/a">A</a><a href="/b">B</a><a href="/c">C</a></nav>
+<main><div class="grid">{cards}</div><div class="pager">{next_link}</div></main>
+</body></html>"""
+
+TABLE_PAGE = """<html><head><title>Prices</title></head><body>
+<table>
+<thead><tr><th>Plan</th><th>Monthly price</th><th>Seats</th></tr></thead>
+<tbody>
+<tr><td><a href="/plans/free">Free</a></td><td>$0</td><td>1</td></tr>
+<tr><td>Team</td><td>$20</td><td>10</td></tr>
+<tr><td>Enterprise</td><td></td><td>Unlimited</td></tr>
+</tbody>
+</table>
+<ul><li>Footnote one</li><li>Footnote two</li><li>Footnote three</li></ul>
+</body></html>"""
+
+def _site(host="shop.test"):
+    pages = {f"https://{host}/products?page={n}": _product_page(n) for n in range(1, 4)}
+    pages[f"https://{host}/pricing"] = TABLE_PAGE
+    pages[f"https://{host}/last-link"] = _product_page(1).replace(
+        '<a href="/products?page=2">Next ›</a>', '<a href="/products?page=3">»</a>')
+    return FakeSite(pages)
+
+@pytest.fixture
+def fast_retries():
+    get_settings().tool_policy_overrides["extract_next_page"] = {"backoff_seconds": 0.01}
+    yield
+    del get_settings().tool_policy_overrides["extract_next_page"]
+
+async def _paginated_list_to_jsonl():
+    session = await FakeBackend(_site()).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://shop.test/products?page=1")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "products.jsonl")
+        summary = await extract_pages(page, "extract", max_pages=5, output_path=path)
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+    
+    assert summary["kind"] == "list"
+    assert summary["pages"] == 3 and summary["records"] == 12
+    assert summary["next_page"] is None
+    assert summary["columns"] == ["name", "price", "link", "link_url"]
+    assert rows[0] == {"name": "Widget 1-0", "price": "$0.99", "link": "Details",
+                       "link_url": "https://shop.test/p/1-0"}
+    assert rows[-1]["name"] == "Widget 3-3"
+    assert page.url == "https://shop.test/products?page=3"
+
+async def _page_limit_reports_next_page():
+    session = await FakeBackend(_site()).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://shop.test/products?page=1")
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = await extract_pages(page, "extract", max_pages=1, output_path=os.path.join(tmp, "p.jsonl"))
+    assert summary["records"] == 4
+    assert summary["next_page"] == "https://shop.test/products?page=2"
+
+async def _table_records():
+    session = await FakeBackend(_site()).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://shop.test/pricing")
+    
+    result = await page.extract_records()
+    assert result["kind"] == "table"
+    assert result["columns"] == ["plan", "plan_url", "monthly_price", "seats"]
+    assert result["records"][0] == {"plan": "Free", "plan_url": "https://shop.test/plans/free",
+                                    "monthly_price": "$0", "seats": "1"}
+    assert result["records"][2]["monthly_price"] is None
+    
+    footnotes = await page.extract_records(selector="ul")
+    assert [r["text"] for r in footnotes["records"]] == ["Footnote one", "Footnote two", "Footnote three"]
+
+async def _default_paths_are_unique_and_lazy(tmp):
+    session = await FakeBackend(_site()).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://shop.test/products?page=1")
+    first = await extract_pages(page, "extract")
+    await page.goto("https://shop.test/products?page=1")
+    second = await extract_pages(page, "extract")
+    assert first["path"] != second["path"]  # same session, same second
+    assert sorted(os.listdir(tmp)) == sorted(os.path.basename(s["path"]) for s in (first, second))
+
+    empty = await extract_pages(page, "extract", selector="#no-such-list")
+    assert empty["records"] == 0 and empty["path"] is None
+    assert len(os.listdir(tmp)) == 2  # no empty JSONL left behind
+
+async def _pagination_retries_navigation():
+    session = await FakeBackend(_site("retry.test")).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://retry.test/products?page=1")
+    goto, failures = page.goto, []
+
+    async def flaky_goto(url, timeout_ms=30000):
+        if not failures:
+            failures.append(url)
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+        await goto(url, timeout_ms)
+
+    page.goto = flaky_goto
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = await extract_pages(page, "extract", max_pages=5, output_path=os.path.join(tmp, "p.jsonl"))
+    assert failures == ["https://retry.test/products?page=2"]
+    assert summary["pages"] == 3 and summary["error"] is None
+
+async def _failed_pagination_keeps_records():
+    session = await FakeBackend(_site("down.test")).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://down.test/products?page=1")
+
+    async def broken_goto(url, timeout_ms=30000):
+        raise RuntimeError("net::ERR_CONNECTION_RESET")
+
+    page.goto = broken_goto
+    with tempfile.TemporaryDirectory() as tmp:
+        summary = await extract_pages(page, "extract", max_pages=5, output_path=os.path.join(tmp, "p.jsonl"))
+        with open(summary["path"]) as f:
+            assert len(f.readlines()) == 4
+    assert summary["pages"] == 1 and summary["records"] == 4
+    assert summary["next_page"] == "https://down.test/products?page=2"
+    assert "ERR_CONNECTION_RESET" in summary["error"]
+    assert "⚠️ Stopped after page 1: could not load https://down.test/products?page=2" in format_extraction(summary)
+
+async def _last_page_link_is_not_next():
+    session = await FakeBackend(_site()).launch("extract")
+    page = await session.new_page()
+    await page.goto("https://shop.test/last-link")
+    result = await page.extract_records()
+    assert len(result["records"]) == 4
+    assert result["next_page"] is None
+
+def test_paginated_list_to_jsonl():
+    asyncio.run(_paginated_list_to_jsonl())
+
+def test_page_limit_reports_next_page():
+    asyncio.run(_page_limit_reports_next_page())
+
+def test_table_records():
+    asyncio.run(_table_records())
+
+def test_default_paths_are_unique_and_lazy(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "EXTRACTIONS_DIR", str(tmp_path))
+    asyncio.run(_default_paths_are_unique_and_lazy(str(tmp_path)))
+
+def test_pagination_retries_navigation(fast_retries):
+    asyncio.run(_pagination_retries_navigation())
+
+def test_failed_pagination_keeps_records(fast_retries):
+    asyncio.run(_failed_pagination_keeps_records())
+
+def test_last_page_link_is_not_next():
+    asyncio.run(_last_page_link_is_not_next())
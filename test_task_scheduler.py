@@ -0,0 +1,153 @@
+import asyncio
+
+from agents.task_scheduler import TaskScheduler, TaskAborted
+from tools.sessions import session_registry, get_browser_session
+
+class StepAgent:
+    """Stand-in agent whose run_task takes `steps` steps of `step_seconds` each"""
+
+    def __init__(self, step_seconds: float = 0.02):
+        self.step_seconds = step_seconds
+        self.started = []
+        self.released = []
+
+    async def run_task(self, task, session_id=None, max_steps=None, steps=3):
+        from langgraph.errors import GraphRecursionError
+        self.started.append(task)
+        await get_browser_session(session_id, backend="fake")
+        for step in range(steps):
+            if max_steps and step >= max_steps:
+                raise GraphRecursionError("Recursion limit reached")
+            await asyncio.sleep(self.step_seconds)
+        return {"task": task}
+
+    def release_session(self, session_id=None):
+        self.released.append(session_id)
+
+def test_priority_order():
+    """Queued tasks start by priority class, then earliest deadline, then arrival"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=1)
+        first = scheduler.submit(agent, "first", "s-first")
+        handles = [
+            scheduler.submit(agent, "background", "s-bg", priority="background"),
+            scheduler.submit(agent, "normal-late", "s-n1", deadline_seconds=60),
+            scheduler.submit(agent, "normal-soon", "s-n2", deadline_seconds=30),
+        ]
+        await asyncio.wait_for(asyncio.gather(first.wait(), *(h.wait() for h in handles)), 10)
+        assert agent.started == ["first", "normal-soon", "normal-late", "background"]
+        assert scheduler.stats["completed"] == 4
+        await session_registry.close_all()
+
+    asyncio.run(run())
+
+def test_limits():
+    """Step and wall-time limits abort the run and free its session"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=2)
+        too_long = scheduler.submit(agent, "slow", "s-slow", max_wall_seconds=0.05, steps=100)
+        too_many = scheduler.submit(agent, "loop", "s-loop", max_steps=2, steps=10)
+        for handle, status in ((too_long, "timed_out"), (too_many, "step_limit")):
+            try:
+                await asyncio.wait_for(handle.wait(), 5)
+                assert False, "should have been aborted"
+            except TaskAborted as e:
+                assert e.status == status and handle.status == status
+        assert "s-slow" not in session_registry and "s-loop" not in session_registry
+        assert sorted(agent.released) == ["s-loop", "s-slow"]
+
+    asyncio.run(run())
+
+def test_deadline_expires_in_queue():
+    """A task whose deadline passes while it waits never starts"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=1)
+        blocker = scheduler.submit(agent, "blocker", "s-block", steps=5)
+        late = scheduler.submit(agent, "late", "s-late", deadline_seconds=0.01)
+        await asyncio.wait_for(blocker.wait(), 5)
+        try:
+            await asyncio.wait_for(late.wait(), 5)
+            assert False, "should have expired"
+        except TaskAborted as e:
+            assert e.status == "expired"
+        assert "late" not in agent.started
+        await session_registry.close_all()
+
+    asyncio.run(run())
+
+def test_cancel_mid_run():
+    """Cancelling a running task closes its browser session"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=1)
+        running = scheduler.submit(agent, "running", "s-run", steps=100)
+        queued = scheduler.submit(agent, "queued", "s-queued")
+        await asyncio.sleep(0.05)
+        assert "s-run" in session_registry
+        assert scheduler.cancel(running.id) and scheduler.cancel(queued.id)
+        for handle in (running, queued):
+            try:
+                await asyncio.wait_for(handle.wait(), 5)
+                assert False, "should have been cancelled"
+            except TaskAborted as e:
+                assert e.status == "cancelled"
+        await asyncio.sleep(0)
+        assert "s-run" not in session_registry
+        assert agent.started == ["running"]
+        assert not scheduler.running and not scheduler.tasks
+
+    asyncio.run(run())
+
+def test_interactive_preempts_background():
+    """An interactive task takes a busy slot from background work, which reruns afterwards"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=1)
+        background = scheduler.submit(agent, "background", "s-bg", priority="background", steps=20)
+        await asyncio.sleep(0.05)
+        interactive = scheduler.submit(agent, "interactive", "s-ui", priority="interactive")
+        assert (await asyncio.wait_for(interactive.wait(), 5))["task"] == "interactive"
+        assert background.status in ("queued", "running")
+        assert (await asyncio.wait_for(background.wait(), 5))["task"] == "background"
+        assert agent.started == ["background", "interactive", "background"]
+        assert scheduler.stats["preempted"] == 1 and background.preemptions == 1
+        await session_registry.close_all()
+
+    asyncio.run(run())
+
+def test_preempt_before_start():
+    """A task preempted in the tick it was dispatched gives up its slot and reruns later"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=1)
+        background = scheduler.submit(agent, "background", "s-bg", priority="background")
+        interactive = scheduler.submit(agent, "interactive", "s-ui", priority="interactive")
+        assert (await asyncio.wait_for(interactive.wait(), 5))["task"] == "interactive"
+        assert (await asyncio.wait_for(background.wait(), 5))["task"] == "background"
+        assert agent.started == ["interactive", "background"]
+        assert background.preemptions == 1 and not scheduler.running
+        await session_registry.close_all()
+
+    asyncio.run(run())
+
+def test_cancel_before_start():
+    """Cancelling a task whose runner has not started yet still finishes it and frees the slot"""
+    async def run():
+        agent = StepAgent()
+        scheduler = TaskScheduler(max_concurrent=1)
+        cancelled = scheduler.submit(agent, "cancelled", "s-cancel")
+        assert scheduler.cancel(cancelled.id)
+        try:
+            await asyncio.wait_for(cancelled.wait(), 5)
+            assert False, "should have been cancelled"
+        except TaskAborted as e:
+            assert e.status == "cancelled"
+        after = scheduler.submit(agent, "after", "s-after")
+        assert (await asyncio.wait_for(after.wait(), 5))["task"] == "after"
+        assert agent.started == ["after"] and not scheduler.running and not scheduler.tasks
+        await session_registry.close_all()
+
+    asyncio.run(run())
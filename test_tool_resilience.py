@@ -0,0 +1,143 @@
+import asyncio
+
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSession, FakePage
+from config.settings import get_settings
+from tools.sessions import configure_session, close_browser_session
+from tools.resilience import (
+    ToolPolicy, TOOL_POLICIES, CircuitBreaker, CircuitOpenError, ToolTimeoutError,
+    call_with_policy, circuit_breakers, tool_outcomes
+)
+
+FAST = ToolPolicy(attempts=3, timeout_seconds=0.2, backoff_seconds=0.01, circuit_breaker=True)
+
+class Flaky:
+    """Action that fails with the given error a number of times, then succeeds"""
+
+    def __init__(self, failures: int, error: Exception):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+def test_retries_transient_failures():
+    """Transient errors are retried inside the call; the caller only sees success"""
+    async def run():
+        TOOL_POLICIES["test_retry"] = FAST
+        action = Flaky(2, Exception("net::ERR_CONNECTION_RESET at https://retry.test/"))
+        assert await call_with_policy("test_retry", action, url="https://retry.test/") == "ok"
+        assert action.calls == 3
+        assert tool_outcomes["test_retry"] == {"retries": 2, "success_after_retry": 1}
+
+    asyncio.run(run())
+
+def test_permanent_failures_are_not_retried():
+    """A bad request fails on the first attempt"""
+    async def run():
+        TOOL_POLICIES["test_permanent"] = FAST
+        action = Flaky(5, ValueError("Unsupported selector"))
+        try:
+            await call_with_policy("test_permanent", action)
+            assert False, "should have raised"
+        except ValueError:
+            pass
+        assert action.calls == 1
+        assert tool_outcomes["test_permanent"] == {"failure": 1}
+
+    asyncio.run(run())
+
+def test_attempt_timeout():
+    """An attempt that hangs is cut off at the policy timeout and retried"""
+    async def run():
+        TOOL_POLICIES["test_timeout"] = ToolPolicy(attempts=2, timeout_seconds=0.05, backoff_seconds=0.01)
+        calls = 0
+
+        async def hang():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(10)
+
+        try:
+            await call_with_policy("test_timeout", hang)
+            assert False, "should have timed out"
+        except ToolTimeoutError:
+            pass
+        assert calls == 2
+        assert tool_outcomes["test_timeout"] == {"retries": 1, "timeout": 1}
+
+    asyncio.run(run())
+
+def test_circuit_breaker():
+    """Consecutive transient failures open the circuit; a trial call after the cool-down closes it"""
+    async def run():
+        TOOL_POLICIES["test_breaker"] = ToolPolicy(attempts=1, backoff_seconds=0.01, circuit_breaker=True)
+        circuit_breakers["down.test"] = CircuitBreaker(failure_threshold=3, reset_seconds=0.1)
+        failing = Flaky(100, TimeoutError("Navigation timeout of 30000 ms exceeded"))
+
+        for _ in range(3):
+            try:
+                await call_with_policy("test_breaker", failing, url="https://down.test/a")
+            except TimeoutError:
+                pass
+        assert circuit_breakers["down.test"].state == "open"
+
+        try:
+            await call_with_policy("test_breaker", failing, url="https://www.down.test/b")
+            assert False, "should fail fast"
+        except CircuitOpenError:
+            pass
+        assert failing.calls == 3
+        assert tool_outcomes["test_breaker"]["circuit_open"] == 1
+
+        await asyncio.sleep(0.12)
+        assert circuit_breakers["down.test"].state == "half_open"
+        assert await call_with_policy("test_breaker", Flaky(0, None), url="https://down.test/") == "ok"
+        assert circuit_breakers["down.test"].state == "closed"
+
+    asyncio.run(run())
+
+class FlakyNetworkBackend(FakeBackend):
+    """Fake backend whose first load of every URL drops the connection"""
+
+    name = "flaky-network"
+
+    async def launch(self, session_id, storage_state=None):
+        class FlakyPage(FakePage):
+            attempted = set()
+
+            async def goto(self, url, timeout_ms=30000):
+                if url not in self.attempted:
+                    self.attempted.add(url)
+                    raise Exception(f"net::ERR_CONNECTION_RESET at {url}")
+                await super().goto(url, timeout_ms)
+
+        class FlakySession(FakeSession):
+            async def new_page(self):
+                page = FlakyPage(self)
+                self.pages.append(page)
+                return page
+
+        return FlakySession(self.site, storage_state)
+
+def test_navigate_tool_retries():
+    """navigate_to_url recovers from a dropped connection without the model seeing it"""
+    async def run():
+        from tools.browser_tools import navigate_to_url
+
+        get_settings().tool_policy_overrides["navigate_to_url"] = {"backoff_seconds": 0.01}
+        try:
+            register_backend("flaky-network", FlakyNetworkBackend())
+            configure_session("flaky", backend="flaky-network")
+            result = await navigate_to_url.ainvoke({"url": "https://flaky.test/", "session_id": "flaky"})
+            assert result.startswith("✅"), result
+            assert tool_outcomes["navigate_to_url"]["success_after_retry"] >= 1
+            await close_browser_session("flaky")
+        finally:
+            del get_settings().tool_policy_overrides["navigate_to_url"]
+
+    asyncio.run(run())
@@ -0,0 +1,90 @@
+import os
+import asyncio
+import io
+
+from PIL import Image
+from backends.base import register_backend
+from backends.fake_backend import FakeBackend, FakeSession, FakePage
+from config.settings import get_settings
+from tools.sessions import configure_session, close_browser_session
+from tools.vision import (
+    image_tokens, target_size, prepare_image, take_pending_images, image_message_content, pending_images
+)
+
+def make_png(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGBA", (width, height), (30, 120, 200, 255)).save(out, "PNG")
+    return out.getvalue()
+
+def test_image_tokens():
+    """Token costs follow the high-detail tiling rules"""
+    assert image_tokens(1024, 1024) == 765  # scaled to 768x768: 2x2 tiles
+    assert image_tokens(1280, 720) == 85 + 170 * 6
+    assert image_tokens(4000, 400) == image_tokens(2048, 205)
+    assert image_tokens(100, 100) == 255
+
+def test_target_size_fits_budget():
+    """Downscaling keeps the aspect ratio and lands within the budget"""
+    for budget in (255, 425, 765, 1105):
+        width, height = target_size(1280, 720, budget)
+        assert image_tokens(width, height) <= budget
+        assert abs(width / height - 1280 / 720) < 0.02
+    assert target_size(1280, 720, 10000) == (1280, 720)
+
+def test_prepare_image():
+    """Screenshots are downscaled and re-encoded in memory"""
+    image = prepare_image(make_png(1920, 1080), max_tokens=765, image_format="jpeg", quality=60)
+    assert image["data"][:2] == b"\xff\xd8" and image["mime"] == "image/jpeg"
+    assert image["tokens"] <= 765 and image["width"] < 1920
+    assert (image["original_width"], image["original_height"]) == (1920, 1080)
+
+    webp = prepare_image(make_png(800, 600), max_tokens=765, image_format="webp")
+    assert webp["data"][8:12] == b"WEBP"
+
+class ViewportBackend(FakeBackend):
+    """Fake backend whose screenshots are viewport-sized"""
+
+    name = "viewport-shots"
+
+    async def launch(self, session_id, storage_state=None):
+        class ViewportPage(FakePage):
+            async def screenshot(self, path=None, full_page=False, selector=None):
+                await super().screenshot(path, full_page, selector)
+                return make_png(1280, 720 if not selector else 200)
+
+        class ViewportSession(FakeSession):
+            async def new_page(self):
+                page = ViewportPage(self)
+                self.pages.append(page)
+                return page
+
+        return ViewportSession(self.site, storage_state)
+
+def test_screenshot_tool_attaches_image():
+    """view=True queues a model-ready image only when vision is enabled"""
+    async def run():
+        from tools.browser_tools import navigate_to_url, take_screenshot
+
+        settings = get_settings()
+        register_backend("viewport-shots", ViewportBackend())
+        configure_session("vision", backend="viewport-shots")
+        await navigate_to_url.ainvoke({"url": "https://example.test/", "session_id": "vision"})
+
+        settings.vision_enabled = True
+        try:
+            result = await take_screenshot.ainvoke({"session_id": "vision", "view": True})
+            assert result.startswith("📸 Screenshot attached"), result
+            images = take_pending_images(["vision"])
+            assert len(images) == 1 and images[0]["tokens"] <= settings.vision_image_max_tokens
+            content = image_message_content(images)
+            assert content[1]["image_url"]["url"].startswith("data:image/jpeg;base64,")
+
+            settings.vision_enabled = False
+            result = await take_screenshot.ainvoke({"session_id": "vision", "view": True})
+            assert "cannot view images" in result and "vision" not in pending_images
+            os.remove(result.split("Image URL: ")[1].split(" ")[0])
+        finally:
+            settings.vision_enabled = None
+            await close_browser_session("vision")
+
+    asyncio.run(run())